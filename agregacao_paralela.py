@@ -0,0 +1,141 @@
+# Importa o módulo os para obter o número de processadores.
+import os
+
+# Importa o executor de threads, usado para agregar as partes em paralelo.
+from concurrent.futures import ThreadPoolExecutor
+
+# Importa o módulo numpy e o renomeia para np, usado para repartir as
+        # linhas entre as partes.
+import numpy as np
+
+# Importa o módulo pandas e o renomeia para pd, usado
+        # para manipulação de dados.
+import pandas as pd
+
+
+# Este módulo agrega uma coluna de valores por grupo dividindo os grupos em
+        # partes e agregando as partes em paralelo, para planilhas muito
+        # grandes (dezenas de milhões de linhas), em que o groupby ocupa
+        # quase todo o tempo dos comandos de ranking.
+# A coluna de grupo é trocada por códigos inteiros (os códigos da coluna
+        # categórica, sem custo, ou os do 'factorize'), e os códigos são
+        # repartidos em partes com quantidades parecidas de linhas. Cada
+        # thread lê dos mesmos buffers das colunas as linhas dos grupos da
+        # sua parte e as agrega; como cada grupo fica inteiro em uma única
+        # parte, os resultados das partes são apenas concatenados.
+# Dividir por grupos, e não por linhas, mantém o resultado idêntico ao do
+        # groupby direto: as linhas de cada grupo são somadas na mesma ordem,
+        # com a mesma soma compensada do pandas, então até as somas de
+        # números com casas decimais coincidem no último bit.
+# As agregações do pandas liberam o GIL durante o laço sobre as linhas,
+        # então as threads rodam ao mesmo tempo em processadores diferentes,
+        # como a leitura em paralelo do catálogo (ver 'catalogo.py').
+
+
+# Quantidade mínima de linhas para agregar em paralelo. Abaixo dela, dividir
+        # e combinar as partes custa mais do que o groupby direto.
+LIMITE_LINHAS = 1_000_000
+
+
+# Quantidade de partes usada para um DataFrame de 'linhas' linhas: uma por
+        # processador, ou 1 (sem paralelismo) para DataFrames pequenos ou
+        # com um único processador.
+def quantidade_partes(linhas):
+
+    if linhas < LIMITE_LINHAS:
+        return 1
+    return min(os.cpu_count() or 1, linhas // (LIMITE_LINHAS // 4))
+
+
+# Indica se os valores podem ser agregados em partes. Tipos de extensão
+        # (inteiros anuláveis, textos, datas com fuso) continuam no
+        # groupby direto, pois as suas agregações não liberam o GIL.
+def aceita_valores(valores):
+
+    tipo = valores.dtype
+    return isinstance(tipo, np.dtype) and tipo.kind in "iuf"
+
+
+# Troca a coluna de grupo por códigos inteiros de 0 a k-1 (-1 nos valores
+        # nulos) e devolve também uma Series com o valor de cada código, no
+        # mesmo tipo da coluna.
+def _codificar(grupos):
+
+    if isinstance(grupos.dtype, pd.CategoricalDtype):
+        codigos = grupos.cat.codes.to_numpy()
+        chaves = pd.Categorical.from_codes(np.arange(len(grupos.cat.categories)), dtype=grupos.dtype)
+    else:
+        codigos, chaves = pd.factorize(grupos)
+
+    return codigos, pd.Series(chaves, name=grupos.name)
+
+
+# Agrega uma parte das linhas pelos códigos. O agrupador categórico usa os
+        # códigos diretamente, sem calcular hashes, e ignora os códigos -1.
+def _agregar_parte(codigos, valores, quantidade_grupos, funcoes):
+
+    agrupador = pd.Categorical.from_codes(codigos, categories=pd.RangeIndex(quantidade_grupos))
+    grupos = pd.Series(valores, copy=False).groupby(agrupador, observed=True)
+    return pd.DataFrame({nome: grupos.agg(funcao) for nome, funcao in funcoes.items()})
+
+
+# Reparte os códigos de 0 a k-1 em 'partes' partes com quantidades
+        # parecidas de linhas. Devolve as posições das linhas de cada parte,
+        # na ordem original; as linhas sem grupo (código -1) são ignoradas.
+def _repartir(codigos, quantidade_grupos, partes):
+
+    linhas = np.bincount(codigos + 1, minlength=quantidade_grupos + 1)
+    anteriores = np.cumsum(linhas[1:]) - linhas[1:]
+    total = max(1, len(codigos) - linhas[0])
+
+    # Códigos em sequência formam cada parte. A última posição da tabela
+            # recebe o código -1 (índice negativo do numpy).
+    tabela = np.empty(quantidade_grupos + 1, dtype=np.uint16)
+    tabela[:-1] = np.minimum(anteriores * partes // total, partes - 1)
+    tabela[-1] = partes
+    rotulos = tabela[codigos]
+
+    # A ordenação estável de rótulos pequenos é uma ordenação por contagem
+            # (radix), linear no número de linhas, e mantém a ordem original
+            # das linhas dentro de cada parte.
+    ordem = np.argsort(rotulos, kind="stable")
+    limites = np.concatenate(([0], np.cumsum(np.bincount(rotulos, minlength=partes + 1))))
+    return [ordem[limites[parte]:limites[parte + 1]] for parte in range(partes)]
+
+
+# Agrega 'valores' por 'grupos' (duas Series com as mesmas linhas) com as
+        # funções de 'funcoes' ({nome da coluna: "sum", "count", "size",
+        # "min" ou "max"}), dividindo os grupos em 'partes' partes.
+# Devolve o mesmo DataFrame que 'valores.groupby(grupos, observed=True)'
+        # com essas funções: um grupo por linha, na ordem do groupby, com
+        # os mesmos tipos e os mesmos valores.
+def agregar(grupos, valores, funcoes, partes=None):
+
+    partes = partes or quantidade_partes(len(valores))
+    codigos, chaves = _codificar(grupos)
+    dados = valores.to_numpy()
+    quantidade_grupos = len(chaves)
+
+    if partes == 1:
+        parciais = [_agregar_parte(codigos, dados, quantidade_grupos, funcoes)]
+
+    # Cada thread copia as linhas da sua parte ('take' também libera o GIL)
+            # e as agrega.
+    else:
+        def agregar_parte(posicoes):
+            return _agregar_parte(codigos.take(posicoes), dados.take(posicoes), quantidade_grupos, funcoes)
+
+        with ThreadPoolExecutor(max_workers=partes) as executor:
+            parciais = list(executor.map(agregar_parte, _repartir(codigos, quantidade_grupos, partes)))
+
+    combinado = pd.concat(parciais)
+
+    # Coloca os grupos na ordem e com o índice do groupby direto. O groupby
+            # é feito sobre os valores distintos da coluna de grupo (um por
+            # código), que são poucos, e devolve a posição de cada código.
+    presentes = np.asarray(combinado.index, dtype=np.int64)
+    ordem = pd.Series(np.arange(len(presentes)), copy=False).groupby(chaves.iloc[presentes].reset_index(drop=True), observed=True).first()
+
+    resultado = combinado.iloc[ordem.to_numpy()]
+    resultado.index = ordem.index
+    return resultado
@@ -0,0 +1,300 @@
+# Importa o OrderedDict, usado para descartar as agregações menos usadas.
+from collections import OrderedDict
+
+# Importa o módulo numpy e o renomeia para np, usado para combinar os
+        # mínimos e máximos dos grupos.
+import numpy as np
+
+# Importa o módulo pandas e o renomeia para pd, usado
+        # para manipulação de dados.
+import pandas as pd
+
+# Importa a agregação em partes paralelas, usada nos DataFrames grandes.
+from agregacao_paralela import aceita_valores, agregar, quantidade_partes
+
+
+# Este módulo calcula e memoriza as agregações por grupo usadas pelos
+        # comandos de ranking ("mostrar o Vendedor que mais vendeu ...",
+        # "mostrar Produto ordenados por vendas ...").
+# Pedir "mais vendeu", depois "menos vendeu" e depois "ordenados por" nas
+        # mesmas colunas calcula o groupby uma única vez.
+# Depois de comandos que removem linhas ("mostrar as primeiras N linhas")
+        # ou alteram valores ("preencher valores nulos"), as agregações não
+        # são recalculadas: o estado de cada grupo é atualizado apenas com
+        # as linhas que mudaram.
+
+
+# Quantidade máxima de agregações guardadas ao mesmo tempo.
+LIMITE_PADRAO = 32
+
+
+# Converte a coluna de valores para números. Os valores que não são
+        # números são tratados como nulos ('errors="coerce"') e ignorados
+        # pela soma. A conversão é feita em uma Series à parte: a coluna do
+        # DataFrame não é alterada.
+def _numeros(df, coluna_valores):
+    return pd.to_numeric(df[coluna_valores], errors="coerce")
+
+
+# Agregações que formam o estado de cada grupo: soma, quantidade de valores
+        # numéricos, quantidade de linhas, mínimo e máximo.
+ESTADO = {"soma": "sum", "contagem": "count", "linhas": "size", "minimo": "min", "maximo": "max"}
+
+
+# Função que agrega os valores de uma coluna para cada grupo de outra com
+        # as funções de 'funcoes' ({nome: função do groupby}).
+# Em DataFrames grandes, os grupos são divididos em partes agregadas em
+        # paralelo (ver 'agregacao_paralela.py'), com o mesmo resultado.
+def _agregar(df, coluna_grupo, coluna_valores, funcoes):
+
+    valores = _numeros(df, coluna_valores)
+    partes = quantidade_partes(len(df))
+    if partes > 1 and aceita_valores(valores):
+        return agregar(df[coluna_grupo], valores, funcoes, partes)
+
+    # 'observed=True' considera apenas os grupos que aparecem nas linhas,
+            # também em colunas categóricas (ver 'compactacao.py').
+    grupos = valores.groupby(df[coluna_grupo], observed=True)
+    return pd.DataFrame({nome: grupos.agg(funcao) for nome, funcao in funcoes.items()})
+
+
+# Função que soma os valores de uma coluna para cada grupo de outra.
+def somar_por_grupo(df, coluna_grupo, coluna_valores):
+    return _agregar(df, coluna_grupo, coluna_valores, {coluna_valores: "sum"})[coluna_valores]
+
+
+# Função que calcula o estado de cada grupo das linhas de 'df' (ver 'ESTADO').
+def _estado(df, coluna_grupo, coluna_valores):
+    return _agregar(df, coluna_grupo, coluna_valores, ESTADO)
+
+
+# Agregações de um par (coluna de grupo, coluna de valores), mantidas
+        # incrementalmente.
+# A soma, a quantidade de valores e a quantidade de linhas são atualizadas
+        # somando as linhas novas e subtraindo as removidas. O mínimo e o
+        # máximo não podem ser "subtraídos": quando uma linha com o mínimo
+        # ou o máximo de um grupo sai, o grupo é marcado e o valor é
+        # recalculado só para ele, quando for pedido.
+# Somas com casas decimais também não: somar e subtrair acumula erros de
+        # arredondamento, e a soma deixaria de coincidir no último bit com
+        # a do groupby, o que muda empates nos rankings. Os grupos
+        # alterados são marcados e as suas somas recalculadas a partir das
+        # linhas deles; as somas inteiras e as quantidades são exatas.
+class AgregacaoGrupos:
+
+    def __init__(self, df, coluna_grupo, coluna_valores):
+
+        self.coluna_grupo = coluna_grupo
+        self.coluna_valores = coluna_valores
+        self.estado = _estado(df, coluna_grupo, coluna_valores)
+
+        # Grupos cujo mínimo ou máximo precisa ser recalculado.
+        self.extremos_invalidos = set()
+
+        # Grupos cuja soma com casas decimais precisa ser recalculada.
+        self.somas_invalidas = set()
+
+
+    # Soma dos valores de cada grupo, como 'somar_por_grupo'. 'df' é o
+            # DataFrame atual.
+    def somas(self, df):
+
+        if self.somas_invalidas:
+            grupos = list(self.somas_invalidas)
+            recalculado = somar_por_grupo(self._linhas(df, grupos), self.coluna_grupo, self.coluna_valores)
+            self.estado.loc[grupos, "soma"] = recalculado.reindex(grupos, fill_value=0).to_numpy()
+            self.somas_invalidas.clear()
+
+        return self.estado["soma"].rename(self.coluna_valores)
+
+
+    # Estado completo dos grupos, com o mínimo, o máximo e as somas
+            # recalculados para os grupos marcados. 'df' é o DataFrame atual.
+    def estatisticas(self, df):
+
+        self.somas(df)
+
+        if self.extremos_invalidos:
+            grupos = list(self.extremos_invalidos)
+            recalculado = _estado(self._linhas(df, grupos), self.coluna_grupo, self.coluna_valores)
+            self.estado.loc[grupos, ["minimo", "maximo"]] = recalculado.loc[grupos, ["minimo", "maximo"]]
+            self.extremos_invalidos.clear()
+
+        return self.estado
+
+
+    # Linhas de 'df' que pertencem aos grupos dados, na ordem original: a
+            # soma de cada grupo é feita na mesma ordem que no groupby do
+            # DataFrame inteiro.
+    def _linhas(self, df, grupos):
+        return df[df[self.coluna_grupo].isin(grupos).to_numpy()]
+
+
+    # Atualiza o estado trocando as linhas 'antigas' pelas linhas 'novas'.
+    # Linhas removidas aparecem só em 'antigas'; linhas alteradas aparecem
+            # nas duas, com os valores de antes e de depois.
+    def aplicar(self, antigas, novas):
+
+        if len(antigas):
+            self._subtrair(self._delta(antigas))
+        if len(novas):
+            self._somar(self._delta(novas))
+
+        # As somas com casas decimais dos grupos alterados são recalculadas
+                # no próximo uso. Grupos que deixaram de existir não precisam.
+        if self.estado["soma"].dtype.kind == "f":
+            alterados = pd.Index(antigas[self.coluna_grupo]).append(pd.Index(novas[self.coluna_grupo])).unique()
+            self.somas_invalidas.update(self.estado.index.intersection(alterados))
+
+
+    # Calcula o estado das linhas dadas, com os mesmos tipos do estado
+            # guardado. Se os tipos diferem (por exemplo, uma soma inteira e
+            # valores novos com casas decimais), os dois passam a usar o tipo
+            # mais amplo.
+    def _delta(self, linhas):
+
+        delta = _estado(linhas, self.coluna_grupo, self.coluna_valores)
+        for coluna in ("soma", "minimo", "maximo"):
+            tipo = np.result_type(self.estado[coluna].dtype, delta[coluna].dtype)
+            self.estado[coluna] = self.estado[coluna].astype(tipo)
+            delta[coluna] = delta[coluna].astype(tipo)
+        return delta
+
+
+    def _subtrair(self, delta):
+
+        grupos = delta.index
+        estado = self.estado
+        colunas = ["soma", "contagem", "linhas"]
+        estado.loc[grupos, colunas] = estado.loc[grupos, colunas] - delta[colunas]
+
+        # Grupos que perderam a linha com o mínimo ou o máximo.
+        atingidos = (delta["minimo"] <= estado.loc[grupos, "minimo"]) | (delta["maximo"] >= estado.loc[grupos, "maximo"])
+        self.extremos_invalidos.update(grupos[atingidos.to_numpy()])
+
+        # Grupos sem nenhuma linha deixam de existir. Sem valores numéricos,
+                # a soma volta a ser exatamente zero, como no groupby.
+        vazios = grupos[(estado.loc[grupos, "linhas"] == 0).to_numpy()]
+        if len(vazios):
+            self.estado = estado = estado.drop(index=vazios)
+            self.extremos_invalidos.difference_update(vazios)
+            self.somas_invalidas.difference_update(vazios)
+        sem_valores = estado.index.intersection(grupos)
+        sem_valores = sem_valores[(estado.loc[sem_valores, "contagem"] == 0).to_numpy()]
+        estado.loc[sem_valores, "soma"] = 0
+
+
+    def _somar(self, delta):
+
+        # Grupos que ainda não existiam entram no estado, mantendo os grupos
+                # em ordem, como no groupby.
+        novos = delta.index.difference(self.estado.index)
+        if len(novos):
+            vazios = pd.DataFrame({"soma": 0, "contagem": 0, "linhas": 0, "minimo": np.nan, "maximo": np.nan}, index=novos)
+            self.estado = pd.concat([self.estado, vazios.astype({"soma": self.estado["soma"].dtype})]).sort_index()
+            self.estado.index.name = self.coluna_grupo
+
+        grupos = delta.index
+        estado = self.estado
+        colunas = ["soma", "contagem", "linhas"]
+        estado.loc[grupos, colunas] = estado.loc[grupos, colunas] + delta[colunas]
+        estado.loc[grupos, "minimo"] = np.fmin(estado.loc[grupos, "minimo"], delta["minimo"])
+        estado.loc[grupos, "maximo"] = np.fmax(estado.loc[grupos, "maximo"], delta["maximo"])
+
+
+# Cache das agregações por grupo da sessão.
+# As agregações valem para uma versão dos dados: a sessão incrementa a
+        # versão sempre que o DataFrame atual muda. Quando a mudança pode ser
+        # aplicada incrementalmente, a sessão atualiza as agregações e
+        # confirma a nova versão com 'confirmar'; caso contrário, elas são
+        # descartadas no próximo uso.
+class CacheAgregacoes:
+
+    def __init__(self, limite=LIMITE_PADRAO):
+
+        self.limite = limite
+
+        # Versão dos dados à qual as agregações guardadas correspondem.
+        self.versao = None
+
+        # Agregações guardadas, por (coluna de grupo, coluna de valores), da
+                # menos para a mais recentemente usada.
+        self._agregacoes = OrderedDict()
+
+
+    # Devolve a agregação das colunas, calculando-a apenas se ainda não
+            # está no cache para esta versão dos dados.
+    def agregacao(self, df, coluna_grupo, coluna_valores, versao):
+
+        if versao != self.versao:
+            self.limpar()
+            self.versao = versao
+
+        chave = (coluna_grupo, coluna_valores)
+
+        if chave in self._agregacoes:
+            self._agregacoes.move_to_end(chave)
+            return self._agregacoes[chave]
+
+        agregacao = self._agregacoes[chave] = AgregacaoGrupos(df, coluna_grupo, coluna_valores)
+
+        # Descarta as agregações usadas há mais tempo.
+        while len(self._agregacoes) > self.limite:
+            self._agregacoes.popitem(last=False)
+
+        return agregacao
+
+
+    # Devolve a soma por grupo, como 'somar_por_grupo'.
+    def somas(self, df, coluna_grupo, coluna_valores, versao):
+        return self.agregacao(df, coluna_grupo, coluna_valores, versao).somas(df)
+
+
+    # Atualiza as agregações trocando as linhas 'antigas' pelas 'novas'
+            # (ver 'AgregacaoGrupos.aplicar'). Com 'coluna', só as agregações
+            # que usam essa coluna são atualizadas, pois as linhas diferem
+            # apenas nela.
+    def aplicar(self, antigas, novas, coluna=None):
+
+        for chave, agregacao in self._agregacoes.items():
+            if coluna is None or coluna in chave:
+                agregacao.aplicar(antigas, novas)
+
+
+    # Move as agregações de uma coluna renomeada para o novo nome.
+    def renomear(self, antigo, novo):
+
+        self.remover(novo)
+        for chave in list(self._agregacoes):
+            if antigo in chave:
+                agregacao = self._agregacoes.pop(chave)
+                if agregacao.coluna_grupo == antigo:
+                    agregacao.coluna_grupo = novo
+                    agregacao.estado.index.name = novo
+                if agregacao.coluna_valores == antigo:
+                    agregacao.coluna_valores = novo
+                self._agregacoes[(agregacao.coluna_grupo, agregacao.coluna_valores)] = agregacao
+
+
+    # Descarta as agregações que usam uma coluna removida.
+    def remover(self, coluna):
+
+        for chave in list(self._agregacoes):
+            if coluna in chave:
+                del self._agregacoes[chave]
+
+
+    # Indica que as agregações guardadas continuam valendo para a nova
+            # versão dos dados.
+    def confirmar(self, versao):
+        self.versao = versao
+
+
+    # Descarta todas as agregações.
+    def limpar(self):
+        self._agregacoes.clear()
+
+
+    # Quantidade de agregações guardadas.
+    def __len__(self):
+        return len(self._agregacoes)
@@ -0,0 +1,461 @@
+# Importa o módulo argparse, usado para ler os argumentos da linha de comando.
+import argparse
+
+# Importa o módulo json, usado para gravar e comparar os resultados.
+import json
+
+# Importa o módulo os para manipular caminhos e diretórios.
+import os
+
+# Importa o módulo platform, usado para registrar em que máquina os
+        # tempos foram medidos.
+import platform
+
+# Importa o módulo shutil, usado para apagar os diretórios temporários.
+import shutil
+
+# Importa o módulo statistics, usado para calcular a mediana dos tempos.
+import statistics
+
+# Importa o módulo subprocess, usado para obter a versão do código no git.
+import subprocess
+
+# Importa o módulo sys para definir o código de saída do programa.
+import sys
+
+# Importa o módulo tempfile, usado para criar os diretórios de trabalho.
+import tempfile
+
+# Importa o módulo time, usado para medir os tempos.
+import time
+
+# Importa o 'datetime' para registrar quando a medição foi feita.
+from datetime import datetime
+
+# Importa o módulo numpy e o renomeia para np, usado para gerar os dados.
+import numpy as np
+
+# Importa o módulo pandas e o renomeia para pd, usado
+        # para manipulação de dados.
+import pandas as pd
+
+# Importa o cache das planilhas, usado pelo carregamento da janela principal.
+from cache_planilhas import CachePlanilhas
+
+# Importa a compactação das colunas, aplicada à planilha logo após a leitura.
+from compactacao import compactar
+
+# Importa a exportação em blocos e o limite de linhas do Excel.
+from exportacao import MAXIMO_LINHAS_XLSX, exportar_csv, exportar_parquet, exportar_xlsx, gravar_xlsx, pq
+
+# Importa a leitura progressiva, usada pelo carregamento progressivo.
+from leitura_streaming import ler_acumulado
+
+# Importa a sessão de comandos, a mesma usada pela janela principal.
+from motor import Sessao
+
+
+# Benchmark: mede quanto tempo o carregamento, os comandos, a exibição na
+        # grade e a exportação levam em planilhas de vendas sintéticas de
+        # tamanhos crescentes, e grava os tempos em JSON para comparar versões.
+# Exemplo:
+#     python benchmark.py --linhas 10000 100000 1000000 --saida atual.json
+#     python benchmark.py --linhas 10000 100000 --saida nova.json --comparar atual.json
+# As planilhas geradas têm as mesmas colunas de 'vendas.xlsx' e são sempre
+        # iguais para a mesma quantidade de linhas e a mesma semente, então os
+        # tempos de versões diferentes do código são comparáveis. Os arquivos
+        # xlsx gerados ficam guardados em '--dados' e são reaproveitados.
+
+
+# Versão do gerador de dados. Muda quando os dados gerados mudam, para que
+        # planilhas antigas guardadas em '--dados' não sejam reaproveitadas.
+VERSAO_GERADOR = 1
+
+# Quantidades de linhas medidas por padrão.
+LINHAS_PADRAO = [10_000, 100_000, 1_000_000]
+
+# Semente padrão do gerador de números aleatórios.
+SEMENTE_PADRAO = 42
+
+# Diretório padrão das planilhas geradas.
+DADOS_PADRAO = os.path.join(tempfile.gettempdir(), "list_command_benchmark")
+
+# Aumento de tempo (em fração) acima do qual a comparação aponta uma regressão.
+TOLERANCIA_PADRAO = 0.2
+
+# Diferença mínima (em segundos) para apontar uma regressão. Medições muito
+        # curtas variam bastante entre execuções sem que nada tenha mudado.
+DIFERENCA_MINIMA = 0.005
+
+# Quantidade de valores diferentes de cada coluna de texto gerada.
+QUANTIDADE_CIDADES = 30
+QUANTIDADE_VENDEDORES = 200
+QUANTIDADE_PRODUTOS = 1_000
+QUANTIDADE_CLIENTES = 5_000
+
+# Fração das vendas sem valor, para o comando de preencher nulos.
+FRACAO_NULOS = 0.01
+
+# Quantidade de linhas do cadastro de produtos usado pelo comando "juntar".
+LINHAS_CADASTRO = QUANTIDADE_PRODUTOS
+
+# Etapas que podem ser medidas.
+ETAPAS = ("carregar", "comandos", "exibir", "exportar")
+
+
+# Comandos medidos, um de cada tipo. Cada cenário é (preparação, comandos):
+        # os comandos de preparação são executados antes da medição, sobre
+        # uma sessão nova, e apenas os comandos seguintes são medidos.
+CENARIOS = {
+    "remover_coluna": ([], ["delete a coluna meta"]),
+    "renomear_coluna": ([], ["renomear a coluna vendedor para vendedor_principal"]),
+    "filtrar": ([], ["filtrar na coluna cidade pelo valor cidade 07"]),
+    "filtrar_composto": ([], ["filtrar na coluna meta maior que 40000 e na coluna cidade em lista cidade 01, cidade 02 ou na coluna total de vendas menor que 100"]),
+    "filtrar_indexado": (["indexar a coluna cidade", "filtrar na coluna cidade pelo valor cidade 01"], ["filtrar na coluna cidade pelo valor cidade 07"]),
+    "ordenar": ([], ["ordenar o dataframe pela coluna total de vendas"]),
+    "preencher_nulos": ([], ["preencher valores nulos na coluna total de vendas com 0"]),
+    "primeiras": ([], ["mostrar as primeiras 10 linhas"]),
+    "ultimas": ([], ["mostrar as últimas 10 linhas"]),
+    "quem_mais_vendeu": ([], ["mostrar o vendedor que mais vendeu na coluna de total de vendas"]),
+    "quem_menos_vendeu": ([], ["mostrar o produto que menos vendeu na coluna de total de vendas"]),
+    "ordenados_por_vendas": ([], ["mostrar produto ordenados por vendas na coluna de total de vendas"]),
+    "melhores_grupos": ([], ["mostrar os 10 cliente que mais venderam na coluna de total de vendas"]),
+    "ranking_em_cache": (["mostrar o vendedor que mais vendeu na coluna de total de vendas"], ["mostrar vendedor ordenados por vendas na coluna de total de vendas"]),
+    "juntar": ([], ["juntar com a tabela produtos pela coluna produto"]),
+    "plano_lazy": (["ativar modo lazy", "ordenar o dataframe pela coluna meta", "filtrar na coluna cidade pelo valor cidade 07", "delete a coluna cliente"], ["executar plano"]),
+    "desfazer": (["ordenar o dataframe pela coluna meta"], ["desfazer"]),
+}
+
+
+# Gera o DataFrame de vendas sintético com 'linhas' linhas, com as mesmas
+        # colunas de 'vendas.xlsx'.
+def gerar_vendas(linhas, semente=SEMENTE_PADRAO):
+
+    aleatorio = np.random.default_rng(semente)
+
+    def textos(prefixo, quantidade):
+        valores = np.array([f"{prefixo} {i:0{len(str(quantidade))}d}" for i in range(1, quantidade + 1)], dtype=object)
+        return valores[aleatorio.integers(0, quantidade, linhas)]
+
+    total = np.round(aleatorio.gamma(2.0, 15_000.0, linhas), 2)
+    total[aleatorio.random(linhas) < FRACAO_NULOS] = np.nan
+
+    return pd.DataFrame({
+        "Cidade": textos("Cidade", QUANTIDADE_CIDADES),
+        "Vendedor": textos("Vendedor", QUANTIDADE_VENDEDORES),
+        "Meta": aleatorio.integers(4, 21, linhas) * 5_000,
+        "Produto": textos("Produto", QUANTIDADE_PRODUTOS),
+        "Total de Vendas": total,
+        "Data da Venda": pd.Timestamp("2023-01-01") + pd.to_timedelta(aleatorio.integers(0, 365, linhas), unit="D"),
+        "Cliente": textos("Cliente", QUANTIDADE_CLIENTES),
+    })
+
+
+# Gera o cadastro de produtos usado pelo comando "juntar".
+def gerar_cadastro(semente=SEMENTE_PADRAO):
+
+    aleatorio = np.random.default_rng(semente + 1)
+    largura = len(str(QUANTIDADE_PRODUTOS))
+
+    return pd.DataFrame({
+        "Produto": [f"Produto {i:0{largura}d}" for i in range(1, LINHAS_CADASTRO + 1)],
+        "Categoria": [f"Categoria {i % 12 + 1:02d}" for i in range(LINHAS_CADASTRO)],
+        "Preço": np.round(aleatorio.uniform(10, 5_000, LINHAS_CADASTRO), 2),
+    })
+
+
+# Devolve o caminho da planilha sintética com 'linhas' linhas, gerando-a se
+        # ainda não existe. Devolve None se a quantidade de linhas passa do
+        # limite de uma planilha do Excel.
+def planilha_sintetica(diretorio, linhas, semente=SEMENTE_PADRAO):
+
+    if linhas >= MAXIMO_LINHAS_XLSX:
+        return None
+
+    caminho = os.path.join(diretorio, f"vendas_v{VERSAO_GERADOR}_s{semente}_{linhas}.xlsx")
+    if not os.path.exists(caminho):
+        print(f"Gerando {caminho}...", file=sys.stderr)
+        gravar_xlsx([("Vendas", gerar_vendas(linhas, semente))], caminho)
+    return caminho
+
+
+# Devolve o caminho do cadastro de produtos, gerando-o se ainda não existe.
+def cadastro_sintetico(diretorio, semente=SEMENTE_PADRAO):
+
+    caminho = os.path.join(diretorio, f"produtos_v{VERSAO_GERADOR}_s{semente}.xlsx")
+    if not os.path.exists(caminho):
+        gravar_xlsx([("Produtos", gerar_cadastro(semente))], caminho)
+    return caminho
+
+
+# Executa 'funcao' 'repeticoes' vezes e devolve os tempos, em segundos.
+# 'preparar', se informado, é executado antes de cada repetição, fora da
+        # medição, e o seu resultado é passado para 'funcao'.
+def medir(funcao, repeticoes, preparar=None):
+
+    tempos = []
+    for _ in range(repeticoes):
+        argumento = preparar() if preparar else None
+        inicio = time.perf_counter()
+        funcao(argumento) if preparar else funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return tempos
+
+
+# Monta o registro de uma medição para o JSON.
+def registro(linhas, etapa, nome, tempos, **extras):
+
+    return {"linhas": linhas, "etapa": etapa, "nome": nome,
+            "minimo": min(tempos), "mediana": statistics.median(tempos),
+            "tempos": tempos, **extras}
+
+
+# Mede o carregamento do arquivo: lendo o xlsx (cache vazio), lendo do cache
+        # (segunda vez) e de forma progressiva (tempo até o primeiro bloco).
+def medir_carregamento(caminho, linhas, repeticoes):
+
+    resultados = []
+    temporario = tempfile.mkdtemp(prefix="list_command_cache_")
+
+    def preparar(df):
+        return compactar(df)[0]
+
+    try:
+
+        # Cada repetição usa um diretório de cache novo, para que o xlsx seja
+                # de fato interpretado.
+        def cache_vazio():
+            diretorio = tempfile.mkdtemp(dir=temporario)
+            return CachePlanilhas(diretorio=diretorio)
+
+        resultados.append(registro(linhas, "carregar", "xlsx_sem_cache",
+                                   medir(lambda cache: cache.ler(caminho, preparar=preparar), repeticoes, cache_vazio)))
+
+        cache = CachePlanilhas(diretorio=os.path.join(temporario, "quente"))
+        cache.ler(caminho, preparar=preparar)
+        resultados.append(registro(linhas, "carregar", "cache",
+                                   medir(lambda: cache.ler(caminho, preparar=preparar), repeticoes)))
+
+        # Carregamento progressivo: tempo até o primeiro bloco aparecer.
+        def primeiro_bloco():
+            leitura = ler_acumulado(caminho)
+            next(leitura)
+            leitura.close()
+
+        resultados.append(registro(linhas, "carregar", "progressivo_primeiro_bloco", medir(primeiro_bloco, repeticoes)))
+
+    finally:
+        shutil.rmtree(temporario, ignore_errors=True)
+
+    return resultados
+
+
+# Mede cada cenário de comandos, sempre sobre uma sessão nova com o
+        # DataFrame compactado, como depois do carregamento.
+def medir_comandos(df, linhas, repeticoes, cadastro):
+
+    resultados = []
+
+    for nome, (preparacao, comandos) in CENARIOS.items():
+
+        def nova_sessao():
+            sessao = Sessao(df)
+            sessao.catalogo.registrar(cadastro)
+            for comando in preparacao:
+                sessao.executar(comando)
+            return sessao
+
+        def executar(sessao):
+            for comando in comandos:
+                sessao.executar(comando)
+
+        resultados.append(registro(linhas, "comandos", nome, medir(executar, repeticoes, nova_sessao)))
+
+    return resultados
+
+
+# Mede a exibição do DataFrame na grade virtual: criar a grade e saltar
+        # para o meio e para o fim, como o usuário faria com a barra de
+        # rolagem.
+# Sem uma tela disponível (por exemplo, em um servidor), mede apenas a
+        # leitura das fatias de linhas que a grade faria ('ler_fatia').
+def medir_exibicao(df, linhas, repeticoes):
+
+    # O Tkinter é importado apenas aqui, para que o benchmark funcione em
+            # máquinas sem interface gráfica.
+    import tkinter as tk
+    from grade_virtual import ALTURA_PADRAO, MARGEM_PADRAO, GradeVirtual, ler_fatia
+
+    try:
+        raiz = tk.Tk()
+        raiz.withdraw()
+    except tk.TclError:
+        raiz = None
+
+    if raiz is None:
+
+        def fatias():
+            for inicio in (0, len(df) // 2, max(0, len(df) - ALTURA_PADRAO)):
+                ler_fatia(df, max(0, inicio - MARGEM_PADRAO), inicio + ALTURA_PADRAO + MARGEM_PADRAO)
+
+        return [registro(linhas, "exibir", "fatias_sem_tela", medir(fatias, repeticoes))]
+
+    try:
+
+        def grade():
+            grade = GradeVirtual(raiz, df)
+            grade.pack()
+            raiz.update_idletasks()
+            grade._ir_para(len(df) // 2)
+            grade._ir_para(len(df))
+            raiz.update_idletasks()
+            grade.destroy()
+
+        return [registro(linhas, "exibir", "grade_virtual", medir(grade, repeticoes))]
+
+    finally:
+        raiz.destroy()
+
+
+# Mede a exportação do DataFrame para cada formato disponível.
+def medir_exportacao(df, linhas, repeticoes):
+
+    formatos = [("csv", exportar_csv)]
+    if pq is not None:
+        formatos.append(("parquet", exportar_parquet))
+    if linhas < MAXIMO_LINHAS_XLSX:
+        formatos.insert(0, ("xlsx", exportar_xlsx))
+
+    resultados = []
+    temporario = tempfile.mkdtemp(prefix="list_command_exportacao_")
+
+    try:
+        for extensao, exportador in formatos:
+            caminho = os.path.join(temporario, f"resultado.{extensao}")
+            tempos = medir(lambda: exportador(df, caminho), repeticoes)
+            resultados.append(registro(linhas, "exportar", extensao, tempos, bytes=os.path.getsize(caminho)))
+    finally:
+        shutil.rmtree(temporario, ignore_errors=True)
+
+    return resultados
+
+
+# Executa todas as etapas pedidas para uma quantidade de linhas.
+def medir_tamanho(linhas, etapas, repeticoes, dados, semente):
+
+    print(f"Medindo {linhas} linhas...", file=sys.stderr)
+    resultados = []
+
+    # O carregamento só pode ser medido em planilhas que cabem no Excel;
+            # acima disso, os comandos usam o DataFrame gerado diretamente.
+    caminho = planilha_sintetica(dados, linhas, semente) if "carregar" in etapas else None
+    if caminho:
+        resultados += medir_carregamento(caminho, linhas, repeticoes)
+
+    df = compactar(gerar_vendas(linhas, semente))[0]
+
+    if "comandos" in etapas:
+        resultados += medir_comandos(df, linhas, repeticoes, cadastro_sintetico(dados, semente))
+    if "exibir" in etapas:
+        resultados += medir_exibicao(df, linhas, repeticoes)
+    if "exportar" in etapas:
+        resultados += medir_exportacao(df, linhas, repeticoes)
+
+    return resultados
+
+
+# Devolve o commit atual do git, ou None fora de um repositório.
+def versao_do_codigo():
+
+    try:
+        saida = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                               cwd=os.path.dirname(os.path.abspath(__file__)), check=True)
+        return saida.stdout.strip() or None
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# Compara os resultados com os de uma execução anterior e devolve as linhas
+        # do relatório e a quantidade de regressões (medições que ficaram
+        # mais lentas que a tolerância). Compara o tempo mínimo, que é o
+        # menos afetado por outros programas rodando na máquina.
+def comparar(resultados, anteriores, tolerancia):
+
+    antes = {(r["linhas"], r["etapa"], r["nome"]): r["minimo"] for r in anteriores}
+    relatorio, regressoes = [], 0
+
+    for r in resultados:
+        chave = (r["linhas"], r["etapa"], r["nome"])
+        if chave not in antes or antes[chave] <= 0:
+            continue
+        razao = r["minimo"] / antes[chave]
+        marca = ""
+        if razao > 1 + tolerancia and r["minimo"] - antes[chave] > DIFERENCA_MINIMA:
+            marca = "  <- regressão"
+            regressoes += 1
+        relatorio.append(f"{r['linhas']:>10} {r['etapa']:<10} {r['nome']:<28} {antes[chave]:10.4f}s {r['minimo']:10.4f}s {razao:6.2f}x{marca}")
+
+    return relatorio, regressoes
+
+
+# Função que lê os argumentos da linha de comando.
+def ler_argumentos(argumentos=None):
+
+    parser = argparse.ArgumentParser(description="Mede o tempo do carregamento, dos comandos, da exibição e da exportação em planilhas sintéticas.")
+    parser.add_argument("--linhas", type=int, nargs="+", default=LINHAS_PADRAO, help="quantidades de linhas das planilhas (padrão: 10000 100000 1000000)")
+    parser.add_argument("--etapas", nargs="+", choices=ETAPAS, default=list(ETAPAS), help="etapas medidas (padrão: todas)")
+    parser.add_argument("--repeticoes", type=int, default=3, help="repetições de cada medição (padrão: 3)")
+    parser.add_argument("--semente", type=int, default=SEMENTE_PADRAO, help="semente do gerador de dados")
+    parser.add_argument("--dados", default=DADOS_PADRAO, help="diretório onde as planilhas geradas são guardadas")
+    parser.add_argument("--saida", help="arquivo JSON onde os resultados são gravados (padrão: a saída padrão)")
+    parser.add_argument("--comparar", help="arquivo JSON de uma execução anterior, para apontar regressões")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA_PADRAO, help="aumento de tempo tolerado na comparação (padrão: 0.2 = 20%%)")
+    return parser.parse_args(argumentos)
+
+
+# Função principal do benchmark. Devolve o código de saída do programa:
+        # 1 se a comparação encontrou regressões, 0 caso contrário.
+def main(argumentos=None):
+
+    args = ler_argumentos(argumentos)
+    os.makedirs(args.dados, exist_ok=True)
+
+    resultados = []
+    for linhas in args.linhas:
+        resultados += medir_tamanho(linhas, args.etapas, max(1, args.repeticoes), args.dados, args.semente)
+
+    saida = {
+        "versao": versao_do_codigo(),
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "plataforma": platform.platform(),
+        "processadores": os.cpu_count(),
+        "semente": args.semente,
+        "versao_gerador": VERSAO_GERADOR,
+        "resultados": resultados,
+    }
+
+    texto = json.dumps(saida, indent=2, ensure_ascii=False)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            arquivo.write(texto)
+    else:
+        print(texto)
+
+    if not args.comparar:
+        return 0
+
+    with open(args.comparar, encoding="utf-8") as arquivo:
+        anteriores = json.load(arquivo)["resultados"]
+
+    relatorio, regressoes = comparar(resultados, anteriores, args.tolerancia)
+    for linha in relatorio:
+        print(linha, file=sys.stderr)
+    print(f"{regressoes} regressões encontradas.", file=sys.stderr)
+
+    return 1 if regressoes else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,283 @@
+# Importa o módulo hashlib, usado para calcular o hash do conteúdo dos arquivos.
+import hashlib
+
+# Importa o módulo json, usado para gravar o índice do cache.
+import json
+
+# Importa o módulo os para manipular caminhos e arquivos.
+import os
+
+# Importa o módulo threading, usado para proteger o índice do cache
+        # quando várias tarefas leem arquivos ao mesmo tempo.
+import threading
+
+# Importa o módulo time para registrar quando cada entrada foi usada.
+import time
+
+# Importa o módulo pandas e o renomeia para pd, usado
+        # para manipulação de dados.
+import pandas as pd
+
+# O pyarrow é opcional: sem ele o cache fica desativado e os arquivos
+        # são sempre lidos com 'pd.read_excel'.
+try:
+    import pyarrow as pa
+    from pyarrow import feather
+except ImportError:
+    pa = None
+    feather = None
+
+
+# Diretório padrão do cache. Pode ser alterado pela variável de ambiente
+        # 'LIST_COMMAND_CACHE'.
+DIRETORIO_PADRAO = os.environ.get("LIST_COMMAND_CACHE",
+                                  os.path.join(os.path.expanduser("~"), ".cache", "list_command"))
+
+# Tamanho máximo padrão do cache em bytes (2 GB). Quando o limite é
+        # ultrapassado, as entradas usadas há mais tempo são removidas.
+LIMITE_PADRAO = 2 * 1024 ** 3
+
+# Tamanho dos blocos lidos ao calcular o hash de um arquivo.
+TAMANHO_BLOCO_HASH = 1024 * 1024
+
+
+# Função que calcula o hash do conteúdo de um arquivo, lendo-o em blocos
+        # para não carregar o arquivo inteiro na memória.
+def hash_arquivo(caminho):
+
+    h = hashlib.blake2b(digest_size=20)
+    with open(caminho, "rb") as arquivo:
+        for bloco in iter(lambda: arquivo.read(TAMANHO_BLOCO_HASH), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+# Função que devolve um nome de arquivo temporário exclusivo do processo e
+        # da thread atuais, para que processos que compartilham o cache (como
+        # no modo de lote) não gravem no mesmo arquivo temporário.
+def _temporario(caminho):
+    return f"{caminho}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+# Cache em disco de planilhas já lidas.
+# Na primeira leitura de um arquivo, o DataFrame é gravado em formato
+        # Feather (colunar, sem compressão); nas leituras seguintes do mesmo
+        # conteúdo, o snapshot é mapeado na memória em vez de o XML do xlsx
+        # ser interpretado novamente.
+# As entradas são identificadas pelo hash do conteúdo do arquivo. Para não
+        # recalcular o hash a cada leitura, o índice guarda o tamanho e a data
+        # de modificação de cada caminho: o hash só é recalculado quando eles mudam.
+class CachePlanilhas:
+
+    def __init__(self, diretorio=DIRETORIO_PADRAO, limite_bytes=LIMITE_PADRAO):
+
+        self.diretorio = diretorio
+        self.limite_bytes = limite_bytes
+        self.caminho_indice = os.path.join(diretorio, "indice.json")
+
+        # Trava que protege o índice contra acessos simultâneos.
+        self._trava = threading.Lock()
+
+
+    # Indica se o cache pode ser usado (depende do pyarrow).
+    @property
+    def disponivel(self):
+        return feather is not None
+
+
+    # Lê o índice do cache. O índice tem duas partes:
+            # 'arquivos': caminho do xlsx -> tamanho, data de modificação e hash;
+            # 'entradas': nome do snapshot -> tamanho em bytes e último uso.
+    def _ler_indice(self):
+
+        try:
+            with open(self.caminho_indice, encoding="utf-8") as arquivo:
+                return json.load(arquivo)
+        except (OSError, ValueError):
+            return {"arquivos": {}, "entradas": {}}
+
+
+    # Grava o índice de forma atômica (arquivo temporário + 'os.replace'),
+            # para que uma falha no meio da gravação não corrompa o índice.
+    def _gravar_indice(self, indice):
+
+        temporario = _temporario(self.caminho_indice)
+        with open(temporario, "w", encoding="utf-8") as arquivo:
+            json.dump(indice, arquivo)
+        os.replace(temporario, self.caminho_indice)
+
+
+    # Devolve o hash do conteúdo do arquivo, reaproveitando o hash guardado no
+            # índice quando o tamanho e a data de modificação não mudaram.
+    def _hash(self, indice, caminho):
+
+        info = os.stat(caminho)
+        registro = indice["arquivos"].get(caminho)
+
+        if registro and registro["tamanho"] == info.st_size and registro["mtime"] == info.st_mtime:
+            return registro["hash"]
+
+        # O arquivo mudou (ou nunca foi lido): recalcula o hash.
+        valor = hash_arquivo(caminho)
+        indice["arquivos"][caminho] = {"tamanho": info.st_size, "mtime": info.st_mtime, "hash": valor}
+        return valor
+
+
+    # Monta o nome do snapshot a partir do hash do conteúdo e da planilha lida.
+    def _nome_entrada(self, valor_hash, planilha):
+        return f"{valor_hash}-{planilha}.feather"
+
+
+    # Devolve o nome do snapshot correspondente ao conteúdo atual do arquivo.
+    def _entrada_do_arquivo(self, caminho, planilha):
+
+        os.makedirs(self.diretorio, exist_ok=True)
+
+        with self._trava:
+            indice = self._ler_indice()
+            nome = self._nome_entrada(self._hash(indice, os.path.abspath(caminho)), planilha)
+            self._gravar_indice(indice)
+
+        return nome
+
+
+    # Devolve o DataFrame guardado no cache para a planilha do arquivo, ou
+            # None se o conteúdo atual do arquivo ainda não está no cache.
+    def obter(self, caminho, planilha=0):
+
+        if not self.disponivel:
+            return None
+
+        nome = self._entrada_do_arquivo(caminho, planilha)
+        caminho_entrada = os.path.join(self.diretorio, nome)
+
+        if not os.path.exists(caminho_entrada):
+            return None
+
+        # Mapeia o arquivo Feather na memória.
+        try:
+            df = feather.read_table(caminho_entrada, memory_map=True).to_pandas()
+
+        # Um snapshot corrompido é descartado e o arquivo será lido novamente.
+        except (OSError, pa.ArrowException):
+            self._remover(nome)
+            return None
+
+        self._registrar_uso(nome, os.path.getsize(caminho_entrada))
+        return df
+
+
+    # Guarda no cache o DataFrame lido da planilha do arquivo.
+    def guardar(self, caminho, planilha, df):
+
+        if self.disponivel:
+            self._gravar(df, self._entrada_do_arquivo(caminho, planilha))
+
+
+    # Lê a planilha do arquivo, usando o snapshot do cache quando existir.
+    # 'progresso' é uma função opcional que recebe mensagens de andamento.
+    # 'preparar', se informado, é aplicado à planilha lida do xlsx antes de
+            # gravá-la no cache (por exemplo, a compactação das colunas), para
+            # que as próximas leituras já recebam o DataFrame preparado.
+    def ler(self, caminho, planilha=0, progresso=None, preparar=None):
+
+        # Sem o pyarrow, lê o arquivo diretamente.
+        if not self.disponivel:
+            df = pd.read_excel(caminho, sheet_name=planilha)
+            return df if preparar is None else preparar(df)
+
+        if progresso:
+            progresso("Procurando no cache...")
+
+        df = self.obter(caminho, planilha)
+        if df is not None:
+            return df
+
+        if progresso:
+            progresso("Lendo o arquivo Excel...")
+
+        df = pd.read_excel(caminho, sheet_name=planilha)
+        if preparar is not None:
+            df = preparar(df)
+
+        if progresso:
+            progresso("Gravando no cache...")
+
+        self.guardar(caminho, planilha, df)
+        return df
+
+
+    # Grava o DataFrame como snapshot Feather sem compressão, o que permite
+            # mapeá-lo na memória nas próximas leituras.
+    def _gravar(self, df, nome):
+
+        caminho_entrada = os.path.join(self.diretorio, nome)
+        temporario = _temporario(caminho_entrada)
+
+        try:
+
+            # O Feather exige nomes de coluna em texto e índice padrão.
+            tabela = pa.Table.from_pandas(df.rename(columns=str), preserve_index=False)
+            feather.write_feather(tabela, temporario, compression="uncompressed")
+            os.replace(temporario, caminho_entrada)
+
+        # Colunas com tipos misturados (por exemplo, números e textos na mesma
+                # coluna) não podem ser convertidas: nesse caso o arquivo
+                # simplesmente não é guardado no cache.
+        except (OSError, pa.ArrowException, TypeError, ValueError):
+            if os.path.exists(temporario):
+                os.remove(temporario)
+            return
+
+        self._registrar_uso(nome, os.path.getsize(caminho_entrada))
+
+
+    # Registra o uso de uma entrada e remove as entradas usadas há mais
+            # tempo enquanto o cache estiver acima do limite.
+    def _registrar_uso(self, nome, tamanho):
+
+        with self._trava:
+
+            indice = self._ler_indice()
+            indice["entradas"][nome] = {"tamanho": tamanho, "uso": time.time()}
+
+            total = sum(entrada["tamanho"] for entrada in indice["entradas"].values())
+
+            # Percorre as entradas da menos recente para a mais recente, sem
+                    # nunca remover a entrada que acabou de ser usada.
+            for antiga in sorted(indice["entradas"], key=lambda n: indice["entradas"][n]["uso"]):
+                if total <= self.limite_bytes or antiga == nome:
+                    break
+                total -= indice["entradas"].pop(antiga)["tamanho"]
+                self._apagar_arquivo(antiga)
+
+            self._gravar_indice(indice)
+
+
+    # Remove uma entrada do índice e o seu arquivo.
+    def _remover(self, nome):
+
+        with self._trava:
+            indice = self._ler_indice()
+            indice["entradas"].pop(nome, None)
+            self._apagar_arquivo(nome)
+            self._gravar_indice(indice)
+
+
+    # Apaga o arquivo de um snapshot, ignorando o erro se ele já não existir.
+    def _apagar_arquivo(self, nome):
+
+        try:
+            os.remove(os.path.join(self.diretorio, nome))
+        except FileNotFoundError:
+            pass
+
+
+    # Remove todas as entradas do cache.
+    def limpar(self):
+
+        with self._trava:
+            indice = self._ler_indice()
+            for nome in indice["entradas"]:
+                self._apagar_arquivo(nome)
+            self._gravar_indice({"arquivos": {}, "entradas": {}})
@@ -0,0 +1,225 @@
+# Importa o módulo os para obter o nome dos arquivos e o número de processadores.
+import os
+
+# Importa o módulo threading, usado para que duas tarefas não leiam a
+        # mesma planilha ao mesmo tempo.
+import threading
+
+# Importa o executor de threads, usado para ler várias planilhas em paralelo.
+from concurrent.futures import ThreadPoolExecutor
+
+# Importa o módulo pandas e o renomeia para pd, usado
+        # para manipulação de dados.
+import pandas as pd
+
+# Importa o 'load_workbook' do openpyxl. No modo 'read_only', abrir o
+        # arquivo lê apenas a lista de planilhas, sem interpretar as células.
+from openpyxl import load_workbook
+
+# Importa o cache em disco das planilhas já lidas.
+from cache_planilhas import CachePlanilhas
+
+# Importa a normalização usada para comparar nomes digitados pelo usuário.
+from chaves import normalizar_valor
+
+# Importa a compactação das colunas, aplicada a cada planilha lida.
+from compactacao import compactar
+
+
+# Este módulo mantém o catálogo das planilhas disponíveis na sessão.
+# Ao carregar vários arquivos (por exemplo, um arquivo por região, com uma
+        # planilha por mês), todas as planilhas são registradas, mas nenhuma
+        # é lida: registrar um arquivo apenas lista as suas planilhas. Cada
+        # planilha só é lida (do cache ou do xlsx) na primeira vez que um
+        # comando a usa, e as que um comando usa juntas são lidas em paralelo.
+# Uma tabela pode ser indicada pelo nome completo ("arquivo/planilha"),
+        # pelo nome do arquivo (todas as planilhas dele) ou pelo nome da
+        # planilha (essa planilha em todos os arquivos).
+
+
+# Nome da coluna acrescentada ao combinar várias tabelas, com a tabela de
+        # origem de cada linha.
+COLUNA_ORIGEM = "Tabela"
+
+
+# Função padrão de leitura de uma planilha: usa o cache em disco e compacta
+        # as colunas antes de guardá-las, como o carregamento da janela principal.
+def ler_planilha(caminho, planilha):
+    return CachePlanilhas().ler(caminho, planilha, preparar=lambda df: compactar(df)[0])
+
+
+# Função que lista os nomes das planilhas de um arquivo xlsx sem ler as células.
+def listar_planilhas(caminho):
+
+    livro = load_workbook(caminho, read_only=True)
+    try:
+        return list(livro.sheetnames)
+    finally:
+        livro.close()
+
+
+# Uma planilha registrada no catálogo.
+class Tabela:
+
+    def __init__(self, arquivo, caminho, planilha, posicao):
+
+        # Nome do arquivo (sem a extensão) e nome da planilha.
+        self.arquivo = arquivo
+        self.planilha = planilha
+        self.nome = f"{arquivo}/{planilha}"
+
+        # Caminho do arquivo e posição da planilha dentro dele. A leitura usa
+                # a posição, a mesma usada pelo carregamento da janela
+                # principal, para reaproveitar o mesmo snapshot do cache.
+        self.caminho = caminho
+        self.posicao = posicao
+
+        # DataFrame lido; None enquanto a planilha não foi usada.
+        self.df = None
+        self._trava = threading.Lock()
+
+
+    # Indica se a planilha já foi lida.
+    @property
+    def carregada(self):
+        return self.df is not None
+
+
+    # Lê a planilha, se ainda não foi lida, e devolve o DataFrame.
+    def carregar(self, leitor):
+
+        with self._trava:
+            if self.df is None:
+                self.df = leitor(self.caminho, self.posicao)
+        return self.df
+
+
+# Catálogo das planilhas da sessão.
+# 'leitor(caminho, posicao)' lê uma planilha e devolve o DataFrame; por
+        # padrão, 'ler_planilha'.
+class Catalogo:
+
+    def __init__(self, leitor=ler_planilha):
+
+        self.leitor = leitor
+
+        # Tabelas registradas, na ordem dos arquivos e das planilhas.
+        self.tabelas = []
+
+        # Trava que protege a lista de tabelas, alterada pela tarefa de
+                # carregamento enquanto comandos podem estar consultando-a.
+        self._trava = threading.Lock()
+
+
+    # Registra as planilhas de um arquivo e devolve as tabelas criadas.
+    # Registrar de novo o mesmo arquivo substitui as tabelas dele, pois as
+            # planilhas podem ter mudado.
+    def registrar(self, caminho):
+
+        caminho = os.path.abspath(caminho)
+        planilhas = listar_planilhas(caminho)
+
+        with self._trava:
+
+            restantes = [t for t in self.tabelas if t.caminho != caminho]
+
+            # Arquivos diferentes com o mesmo nome (em pastas diferentes)
+                    # recebem um número: "vendas (2)".
+            base = os.path.splitext(os.path.basename(caminho))[0]
+            usados = {normalizar_valor(t.arquivo) for t in restantes}
+            arquivo, numero = base, 1
+            while normalizar_valor(arquivo) in usados:
+                numero += 1
+                arquivo = f"{base} ({numero})"
+
+            novas = [Tabela(arquivo, caminho, planilha, posicao) for posicao, planilha in enumerate(planilhas)]
+            self.tabelas = restantes + novas
+
+        return novas
+
+
+    # Guarda o DataFrame já lido de uma planilha registrada (por exemplo, a
+            # planilha carregada pela janela principal), para que ela não
+            # seja lida de novo quando um comando a usar.
+    def guardar(self, caminho, posicao, df):
+
+        caminho = os.path.abspath(caminho)
+        for tabela in self.tabelas:
+            if tabela.caminho == caminho and tabela.posicao == posicao:
+                tabela.df = df
+
+
+    # Devolve as tabelas indicadas por um nome: o nome completo
+            # ("arquivo/planilha"), o nome de um arquivo ou o nome de uma
+            # planilha, nessa ordem de prioridade. Lança KeyError se nenhuma
+            # tabela corresponde ao nome.
+    def resolver(self, nome):
+
+        procurado = normalizar_valor(nome)
+        tabelas = list(self.tabelas)
+
+        for atributo in ("nome", "arquivo", "planilha"):
+            encontradas = [t for t in tabelas if normalizar_valor(getattr(t, atributo)) == procurado]
+            if encontradas:
+                return encontradas
+
+        raise KeyError(nome)
+
+
+    # Lê as tabelas que ainda não foram lidas, em paralelo quando são várias.
+    # A leitura do cache (pyarrow) e a descompactação do xlsx liberam o GIL
+            # durante boa parte do trabalho, então as threads se sobrepõem.
+    def carregar(self, tabelas):
+
+        pendentes = [t for t in tabelas if not t.carregada]
+
+        if len(pendentes) == 1:
+            pendentes[0].carregar(self.leitor)
+
+        elif pendentes:
+            with ThreadPoolExecutor(max_workers=min(len(pendentes), os.cpu_count() or 1)) as executor:
+                list(executor.map(lambda t: t.carregar(self.leitor), pendentes))
+
+        return [t.df for t in tabelas]
+
+
+    # Devolve um único DataFrame com as tabelas indicadas pelos nomes, ou
+            # com todas as tabelas se 'nomes' é vazio.
+    # Uma única tabela é devolvida como está. Várias tabelas são empilhadas
+            # e ganham a coluna 'COLUNA_ORIGEM', com o nome da tabela de
+            # cada linha; colunas que não existem em alguma tabela ficam
+            # vazias nas linhas dela.
+    def combinar(self, nomes=()):
+
+        if nomes:
+            tabelas = []
+            for nome in nomes:
+                tabelas += [t for t in self.resolver(nome) if t not in tabelas]
+        else:
+            tabelas = list(self.tabelas)
+
+        if not tabelas:
+            raise KeyError("")
+
+        partes = self.carregar(tabelas)
+        if len(partes) == 1:
+            return partes[0]
+
+        if COLUNA_ORIGEM not in set().union(*(parte.columns for parte in partes)):
+            partes = [parte.assign(**{COLUNA_ORIGEM: tabela.nome}) for tabela, parte in zip(tabelas, partes)]
+
+        # Colunas categóricas com categorias diferentes em cada tabela viram
+                # texto ao serem empilhadas; a compactação as converte de novo.
+        return compactar(pd.concat(partes, ignore_index=True))[0]
+
+
+    # Descreve as tabelas registradas, para exibição na Treeview.
+    def descrever(self):
+
+        return pd.DataFrame({
+            "Tabela": [t.nome for t in self.tabelas],
+            "Arquivo": [t.arquivo for t in self.tabelas],
+            "Planilha": [t.planilha for t in self.tabelas],
+            "Carregada": ["sim" if t.carregada else "não" for t in self.tabelas],
+            "Linhas": [len(t.df) if t.carregada else None for t in self.tabelas],
+        })
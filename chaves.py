@@ -0,0 +1,88 @@
+# Este módulo guarda as versões normalizadas (texto sem espaços nas pontas
+        # e em minúsculas) das colunas usadas nos filtros.
+# O filtro compara o valor digitado com o texto normalizado de cada
+        # célula. Em vez de sobrescrever a coluna com esse texto (o que
+        # destruiria o tipo numérico ou de data da coluna), a versão
+        # normalizada fica em um cache ao lado do DataFrame e é reaproveitada
+        # pelos próximos filtros na mesma coluna.
+
+
+# Normaliza o valor digitado pelo usuário da mesma forma que as células.
+# 'casefold' é uma versão mais agressiva de 'lower', que também iguala
+        # letras como "ß" e "ss".
+def normalizar_valor(valor):
+    return str(valor).strip().casefold()
+
+
+# Normaliza todas as células de uma coluna: converte para texto, remove os
+        # espaços no começo e no fim e converte para minúsculas.
+def normalizar_coluna(serie):
+    return serie.astype(str).str.strip().str.casefold()
+
+
+# Cache das colunas normalizadas de um DataFrame.
+# Cada entrada é uma Series alinhada, linha a linha, com a coluna original.
+# Quem altera o DataFrame avisa o cache: colunas removidas ou preenchidas
+        # saem do cache, colunas renomeadas mudam de chave e comandos que
+        # reordenam ou recortam as linhas realinham as entradas.
+class ChavesNormalizadas:
+
+    def __init__(self):
+
+        # Dicionário: nome da coluna -> Series normalizada.
+        self._chaves = {}
+
+
+    # Devolve a coluna normalizada, calculando-a apenas na primeira vez.
+    def obter(self, df, coluna):
+
+        chave = self._chaves.get(coluna)
+
+        # O tamanho é conferido como proteção extra: uma entrada com outro
+                # número de linhas certamente pertence a outro DataFrame.
+        if chave is None or len(chave) != len(df):
+            chave = normalizar_coluna(df[coluna])
+            self._chaves[coluna] = chave
+
+        return chave
+
+
+    # Remove a entrada de uma coluna que deixou de existir ou teve os
+            # valores alterados.
+    def remover(self, coluna):
+        self._chaves.pop(coluna, None)
+
+
+    # Move a entrada de uma coluna renomeada para o novo nome.
+    def renomear(self, antigo, novo):
+
+        # Uma coluna que já existia com o novo nome é substituída.
+        self._chaves.pop(novo, None)
+        if antigo in self._chaves:
+            self._chaves[novo] = self._chaves.pop(antigo)
+
+
+    # Realinha as entradas com as linhas de um DataFrame ordenado ou
+            # recortado a partir do DataFrame anterior. Selecionar as linhas
+            # pelo índice é muito mais barato que normalizar o texto de novo.
+    def realinhar(self, indice):
+
+        # Com rótulos repetidos no índice não há como saber qual linha é
+                # qual; nesse caso o cache é descartado.
+        if not indice.is_unique:
+            self.limpar()
+            return
+
+        self._chaves = {coluna: chave.loc[indice]
+                        for coluna, chave in self._chaves.items()
+                        if chave.index.is_unique}
+
+
+    # Descarta todas as entradas (por exemplo, ao carregar outro arquivo).
+    def limpar(self):
+        self._chaves.clear()
+
+
+    # Quantidade de colunas normalizadas em memória.
+    def __len__(self):
+        return len(self._chaves)
@@ -0,0 +1,171 @@
+# Importa o lru_cache, usado para guardar um resolvedor por conjunto de colunas.
+from functools import lru_cache
+
+# Importa o módulo unicodedata, usado para remover os acentos dos nomes.
+import unicodedata
+
+# Importa o módulo numpy e o renomeia para np, usado para calcular as
+        # distâncias de edição de todas as colunas de uma vez.
+import numpy as np
+
+
+# Este módulo encontra a coluna do DataFrame a que um comando se refere.
+# O nome digitado é comparado sem diferenciar maiúsculas/minúsculas,
+        # acentos e espaços repetidos: "ultimas", "Últimas" e " ÚLTIMAS "
+        # encontram a mesma coluna.
+# Quando nenhuma coluna corresponde, o erro sugere as colunas de nome mais
+        # parecido, pela distância de edição (Levenshtein), calculada com
+        # numpy para todas as colunas ao mesmo tempo. Em planilhas com
+        # centenas de colunas, as sugestões continuam instantâneas.
+# O resolvedor é montado uma única vez para cada conjunto de colunas (o
+        # esquema do DataFrame) e memoriza os nomes já procurados; enquanto
+        # os comandos não mudam as colunas, o mesmo resolvedor é usado.
+
+
+# Quantidade máxima de sugestões mostradas no erro.
+QUANTIDADE_SUGESTOES = 3
+
+# Quantidade máxima de colunas listadas no erro quando não há sugestões.
+MAXIMO_LISTADAS = 20
+
+# Quantidade de esquemas cujos resolvedores ficam guardados.
+LIMITE_ESQUEMAS = 32
+
+
+# Normaliza um nome de coluna: remove os acentos, converte para minúsculas
+        # ('casefold') e troca qualquer sequência de espaços por um espaço,
+        # sem espaços nas pontas.
+def normalizar_nome(nome):
+
+    decomposto = unicodedata.normalize("NFKD", str(nome))
+    sem_acentos = "".join(letra for letra in decomposto if not unicodedata.combining(letra))
+    return " ".join(sem_acentos.casefold().split())
+
+
+# Resolvedor dos nomes de um conjunto de colunas.
+class ResolvedorColunas:
+
+    def __init__(self, colunas):
+
+        self.colunas = list(colunas)
+
+        # Nome exato -> coluna, e nome em minúsculas, sem espaços nas pontas
+                # -> coluna, como a comparação usada antes. Se duas colunas
+                # diferem só nas maiúsculas, vale a primeira.
+        self._exatos = {}
+        self._minusculas = {}
+        for coluna in self.colunas:
+            self._exatos.setdefault(coluna, coluna)
+            self._minusculas.setdefault(str(coluna).strip().lower(), coluna)
+
+        # Nome normalizado -> colunas. Colunas que só diferem nos acentos
+                # ou nos espaços têm o mesmo nome normalizado; nesse caso o
+                # nome é ambíguo e as colunas aparecem como sugestões.
+        self._normalizados = {}
+        for coluna in self.colunas:
+            self._normalizados.setdefault(normalizar_nome(coluna), []).append(coluna)
+
+        # Nomes já procurados -> coluna encontrada (ou None).
+        self._procurados = {}
+
+        # Índice das distâncias de edição: os nomes normalizados viram uma
+                # matriz de códigos de caracteres, uma linha por coluna,
+                # completada com -1 (que não coincide com nenhum caractere).
+        self._nomes = [normalizar_nome(coluna) for coluna in self.colunas]
+        self._tamanhos = np.array([len(nome) for nome in self._nomes], dtype=np.int64)
+        largura = int(self._tamanhos.max()) if self.colunas else 0
+        self._codigos = np.full((len(self.colunas), largura), -1, dtype=np.int32)
+        for linha, nome in enumerate(self._nomes):
+            self._codigos[linha, :len(nome)] = [ord(letra) for letra in nome]
+
+
+    # Devolve o nome real da coluna a que 'nome' se refere, ou None se
+            # nenhuma coluna corresponde (ou se o nome é ambíguo).
+    def encontrar(self, nome):
+
+        if nome in self._procurados:
+            return self._procurados[nome]
+
+        coluna = self._exatos.get(nome)
+        if coluna is None:
+            coluna = self._minusculas.get(str(nome).strip().lower())
+        if coluna is None:
+            candidatas = self._normalizados.get(normalizar_nome(nome), [])
+            if len(candidatas) == 1:
+                coluna = candidatas[0]
+
+        self._procurados[nome] = coluna
+        return coluna
+
+
+    # Distância de edição entre 'nome' (já normalizado) e o nome normalizado
+            # de cada coluna.
+    # A matriz da programação dinâmica é calculada uma linha (um caractere
+            # de 'nome') por vez, para todas as colunas juntas. Dentro da
+            # linha, a dependência de cada posição com a anterior
+            # (d[j] = min(a[j], d[j - 1] + 1)) é resolvida com um mínimo
+            # acumulado: d[j] = j + min(a[k] - k para k <= j).
+    def distancias(self, nome):
+
+        largura = self._codigos.shape[1]
+        posicoes = np.arange(largura + 1, dtype=np.int64)
+        anterior = np.broadcast_to(posicoes, (len(self.colunas), largura + 1))
+
+        for i, letra in enumerate(nome, start=1):
+            custo = (self._codigos != ord(letra)).astype(np.int64)
+            atual = np.empty_like(anterior)
+            atual[:, 0] = i
+            atual[:, 1:] = np.minimum(anterior[:, 1:] + 1, anterior[:, :-1] + custo)
+            anterior = np.minimum.accumulate(atual - posicoes, axis=1) + posicoes
+
+        # A distância de cada coluna está na posição do tamanho do seu nome;
+                # as posições seguintes correspondem ao preenchimento.
+        return anterior[np.arange(len(self.colunas)), self._tamanhos]
+
+
+    # Devolve as colunas de nome mais parecido com 'nome', da mais para a
+            # menos parecida. São sugeridas as colunas a poucas edições de
+            # distância (até um terço do tamanho do nome) e as colunas cujo
+            # nome contém o nome digitado ou está contido nele.
+    def sugestoes(self, nome, quantidade=QUANTIDADE_SUGESTOES):
+
+        if not self.colunas:
+            return []
+
+        normalizado = normalizar_nome(nome)
+        distancias = self.distancias(normalizado)
+        limite = max(1, len(normalizado) // 3)
+        contem = np.array([bool(normalizado) and (normalizado in candidato or candidato in normalizado)
+                           for candidato in self._nomes])
+
+        # A ordenação estável desempata pela ordem das colunas.
+        escolhidas = np.flatnonzero((distancias <= limite) | contem)
+        escolhidas = escolhidas[np.argsort(distancias[escolhidas], kind="stable")]
+        return [self.colunas[posicao] for posicao in escolhidas[:quantidade]]
+
+
+    # Mensagem de erro para uma coluna que não existe, com as sugestões.
+            # 'onde' completa a frase (por exemplo, "no DataFrame").
+    def mensagem(self, nome, onde="no DataFrame"):
+
+        texto = f"A coluna '{nome}' não existe {onde}."
+        sugestoes = self.sugestoes(nome)
+        if sugestoes:
+            opcoes = [f"'{coluna}'" for coluna in sugestoes]
+            if len(opcoes) > 1:
+                opcoes = [", ".join(opcoes[:-1]) + " ou " + opcoes[-1]]
+            texto += f"\nVocê quis dizer {opcoes[0]}?"
+        elif 0 < len(self.colunas) <= MAXIMO_LISTADAS:
+            texto += "\nColunas disponíveis: " + ", ".join(str(coluna) for coluna in self.colunas)
+        return texto
+
+
+@lru_cache(maxsize=LIMITE_ESQUEMAS)
+def _resolvedor(colunas):
+    return ResolvedorColunas(colunas)
+
+
+# Devolve o resolvedor das colunas 'colunas' (por exemplo, 'df.columns'),
+        # reaproveitando o do mesmo esquema quando já foi montado.
+def resolvedor(colunas):
+    return _resolvedor(tuple(colunas))
@@ -0,0 +1,641 @@
+# Importa o módulo re para uso de expressões regulares.
+import re
+
+# Importa 'dataclass' para declarar os tipos de comando de forma compacta.
+from dataclasses import dataclass
+
+# Importa 'lru_cache' para memorizar o resultado da interpretação dos comandos.
+from functools import lru_cache
+
+
+# Este módulo interpreta o texto digitado pelo usuário e o transforma em um
+        # objeto de comando tipado. Não depende do Tkinter nem do pandas, então
+        # pode ser usado tanto pela interface quanto em scripts.
+
+
+# Expressões regulares compiladas uma única vez, na importação do módulo.
+# '\S+' corresponde a uma palavra (sequência sem espaços) e '\d+' a um número.
+_PALAVRA = re.compile(r"\S+")
+_NUMERO = re.compile(r"\d+")
+
+# Quantidade de textos diferentes cuja interpretação fica memorizada.
+TAMANHO_CACHE = 1024
+
+
+# Exceção lançada quando o texto não corresponde a nenhum comando
+        # conhecido ou está mal formatado. 'aviso=True' indica que a
+        # interface deve mostrar um aviso em vez de um erro.
+class ErroSintaxe(ValueError):
+
+    def __init__(self, mensagem, aviso=False):
+        super().__init__(mensagem)
+        self.mensagem = mensagem
+        self.aviso = aviso
+
+
+# Tipos de comando. São imutáveis ('frozen=True') porque o mesmo objeto é
+        # devolvido pelo cache sempre que o mesmo texto é interpretado.
+
+# delete a coluna Meta
+@dataclass(frozen=True)
+class RemoverColuna:
+    coluna: str
+
+
+# renomear a coluna Vendedor para Vendedor_Principal
+@dataclass(frozen=True)
+class RenomearColuna:
+    coluna: str
+    novo_nome: str
+
+
+# filtrar na coluna Meta pelo valor 50000
+@dataclass(frozen=True)
+class Filtrar:
+    coluna: str
+    valor: str
+
+
+# Uma condição de filtro: 'operador' é "igual", "maior", "menor", "entre"
+        # ou "lista", e 'valores' traz os valores digitados (dois para
+        # "entre", um ou mais para "lista" e um para os demais).
+@dataclass(frozen=True)
+class Condicao:
+    coluna: str
+    operador: str
+    valores: tuple
+
+
+# filtrar na coluna Meta maior que 40000 e na coluna Cidade em lista Recife, Salvador
+# 'grupos' é uma disjunção ("ou") de grupos, e cada grupo é uma conjunção
+        # ("e") de condições: o "e" tem precedência sobre o "ou".
+@dataclass(frozen=True)
+class FiltrarComposto:
+    grupos: tuple
+
+
+# ordenar o DataFrame pela coluna Meta
+@dataclass(frozen=True)
+class Ordenar:
+    coluna: str
+
+
+# preencher valores nulos na coluna Total de Vendas com 100
+# preencher valores nulos na coluna Total de Vendas com a média por Vendedor
+# 'estrategia' é "valor" (o valor digitado em 'valor'), "media", "mediana",
+        # "anterior" ou "seguinte"; 'grupo' é a coluna que divide as linhas
+        # em grupos preenchidos separadamente, ou None.
+@dataclass(frozen=True)
+class PreencherNulos:
+    coluna: str
+    valor: str
+    estrategia: str = "valor"
+    grupo: str = None
+
+
+# mostrar as primeiras 10 linhas
+@dataclass(frozen=True)
+class Primeiras:
+    n: int
+
+
+# mostrar as últimas 5 linhas
+@dataclass(frozen=True)
+class Ultimas:
+    n: int
+
+
+# mostrar o Vendedor que mais vendeu na coluna de Total de Vendas
+@dataclass(frozen=True)
+class QuemVendeu:
+    coluna_grupo: str
+    mais: bool
+    coluna_vendas: str
+
+
+# mostrar Vendedor ordenados por vendas na coluna de Total de Vendas
+@dataclass(frozen=True)
+class OrdenadosPorVendas:
+    coluna_grupo: str
+    coluna_vendas: str
+
+
+# mostrar os 20 Vendedor que mais venderam na coluna de Total de Vendas
+# mostrar os 20 primeiros Produto ordenados por vendas na coluna de Total de Vendas
+# 'maiores=True' pede os grupos com as maiores vendas ("mais venderam" ou
+        # "primeiros"); 'maiores=False', os com as menores.
+@dataclass(frozen=True)
+class MelhoresGrupos:
+    coluna_grupo: str
+    n: int
+    maiores: bool
+    coluna_vendas: str
+
+
+# ativar modo lazy / desativar modo lazy
+@dataclass(frozen=True)
+class ModoLazy:
+    ativo: bool
+
+
+# executar plano
+@dataclass(frozen=True)
+class ExecutarPlano:
+    pass
+
+
+# mostrar plano
+@dataclass(frozen=True)
+class MostrarPlano:
+    pass
+
+
+# indexar a coluna Vendedor
+@dataclass(frozen=True)
+class IndexarColuna:
+    coluna: str
+
+
+# remover o índice da coluna Vendedor
+@dataclass(frozen=True)
+class RemoverIndice:
+    coluna: str
+
+
+# desfazer
+@dataclass(frozen=True)
+class Desfazer:
+    pass
+
+
+# refazer
+@dataclass(frozen=True)
+class Refazer:
+    pass
+
+
+# usar a tabela Norte/Janeiro
+# usar as tabelas Janeiro, Fevereiro e Março
+# usar todas as tabelas
+# 'nomes' vazio indica todas as tabelas do catálogo.
+@dataclass(frozen=True)
+class UsarTabelas:
+    nomes: tuple
+
+
+# listar as tabelas
+@dataclass(frozen=True)
+class ListarTabelas:
+    pass
+
+
+# juntar com a tabela Produtos pela coluna Produto
+# juntar com a tabela Cadastro pela coluna Vendedor com a coluna Nome
+# 'coluna' é a chave no DataFrame atual e 'coluna_outra', a chave na outra
+        # tabela (a mesma coluna quando não informada). 'confirmado=True'
+        # ("... mesmo assim") executa a junção mesmo quando o resultado é
+        # grande.
+@dataclass(frozen=True)
+class Juntar:
+    tabela: str
+    coluna: str
+    coluna_outra: str
+    confirmado: bool = False
+
+
+# Palavra do comando com a sua posição no texto original. A posição permite
+        # recortar os argumentos (nomes de colunas e valores) exatamente
+        # como foram digitados, inclusive com espaços internos.
+@dataclass(frozen=True)
+class Token:
+    texto: str
+    inicio: int
+    fim: int
+
+
+# Divide o texto em tokens (palavras separadas por espaços).
+# O texto dos tokens fica em minúsculas, para que as palavras-chave sejam
+        # reconhecidas como antes ("ordenar o DataFrame pela coluna"); os
+        # argumentos são recortados do texto original e mantêm a grafia.
+def tokenizar(texto):
+    return [Token(m.group().lower(), m.start(), m.end()) for m in _PALAVRA.finditer(texto)]
+
+
+# Devolve o trecho do texto original coberto pelos tokens[inicio:fim].
+def recortar(texto, tokens, inicio=0, fim=None):
+
+    fim = len(tokens) if fim is None else fim
+    if inicio >= fim:
+        return ""
+    return texto[tokens[inicio].inicio:tokens[fim - 1].fim]
+
+
+# Procura a sequência de palavras 'procurada' em tokens[inicio:] e devolve a
+        # posição do primeiro token da primeira ocorrência, ou -1.
+def procurar(tokens, procurada, inicio=0):
+
+    procurada = procurada.split()
+    tamanho = len(procurada)
+    for i in range(inicio, len(tokens) - tamanho + 1):
+        if all(tokens[i + j].texto == procurada[j] for j in range(tamanho)):
+            return i
+    return -1
+
+
+# Divide tokens em duas partes na primeira ocorrência do separador e
+        # devolve os textos antes e depois dele, ou None se o separador não
+        # aparece ou uma das partes fica vazia.
+def dividir(texto, tokens, separador):
+
+    i = procurar(tokens, separador)
+    if i <= 0:
+        return None
+
+    depois = i + len(separador.split())
+    if depois >= len(tokens):
+        return None
+
+    return recortar(texto, tokens, 0, i), recortar(texto, tokens, depois)
+
+
+# Trie de prefixos: cada nó corresponde a uma palavra e pode ter uma função
+        # de interpretação associada ao prefixo que termina nele.
+# Percorrer a trie custa o tamanho do comando digitado, não importa
+        # quantos comandos estejam registrados.
+class Trie:
+
+    def __init__(self):
+        self.filhos = {}
+        self.funcao = None
+
+
+    # Registra a função de interpretação para o prefixo dado (palavras
+            # separadas por espaço).
+    def registrar(self, prefixo, funcao):
+
+        no = self
+        for palavra in prefixo.split():
+            no = no.filhos.setdefault(palavra, Trie())
+        no.funcao = funcao
+
+
+    # Percorre os tokens e devolve a lista de (função, posição do primeiro
+            # token depois do prefixo) de todos os prefixos encontrados,
+            # do mais longo para o mais curto.
+    def candidatos(self, tokens):
+
+        encontrados = []
+        no = self
+        for i, token in enumerate(tokens):
+            no = no.filhos.get(token.texto)
+            if no is None:
+                break
+            if no.funcao is not None:
+                encontrados.append((no.funcao, i + 1))
+        return encontrados[::-1]
+
+
+# Trie com todos os comandos conhecidos, preenchida pelo decorador 'comando'.
+_COMANDOS = Trie()
+
+
+# Decorador que registra uma função de interpretação para um prefixo.
+# A função recebe o texto original e os tokens que vêm depois do prefixo e
+        # devolve o objeto de comando, ou None se o restante do texto não
+        # tem o formato esperado (nesse caso, prefixos mais curtos são tentados).
+def comando(prefixo):
+
+    def registrar(funcao):
+        _COMANDOS.registrar(prefixo, funcao)
+        return funcao
+
+    return registrar
+
+
+@comando("delete a coluna")
+def _remover_coluna(texto, tokens):
+    return RemoverColuna(recortar(texto, tokens)) if tokens else None
+
+
+@comando("renomear a coluna")
+def _renomear_coluna(texto, tokens):
+    partes = dividir(texto, tokens, "para")
+    return RenomearColuna(*partes) if partes else None
+
+
+# Operadores de filtro, na forma como são escritos nos comandos.
+_OPERADORES = {"pelo valor": "igual", "maior que": "maior", "menor que": "menor",
+               "entre": "entre", "em lista": "lista"}
+
+
+# Interpreta uma condição ("Meta maior que 40000"), ou devolve None.
+def _condicao(texto, tokens):
+
+    # O operador é o primeiro que aparece depois do nome da coluna.
+    encontrados = [(procurar(tokens, escrito), escrito) for escrito in _OPERADORES]
+    encontrados = [(i, escrito) for i, escrito in encontrados if i > 0]
+    if not encontrados:
+        return None
+
+    i, escrito = min(encontrados)
+    depois = i + len(escrito.split())
+    if depois >= len(tokens):
+        return None
+
+    coluna = recortar(texto, tokens, 0, i)
+    operador = _OPERADORES[escrito]
+    resto = tokens[depois:]
+
+    # entre 10000 e 50000
+    if operador == "entre":
+        partes = dividir(texto, resto, "e")
+        return Condicao(coluna, operador, partes) if partes else None
+
+    # em lista Recife, Salvador, São Paulo
+    if operador == "lista":
+        valores = tuple(v.strip() for v in recortar(texto, resto).split(",") if v.strip())
+        return Condicao(coluna, operador, valores) if valores else None
+
+    return Condicao(coluna, operador, (recortar(texto, resto),))
+
+
+# Divide os tokens nos conectores "e na coluna" / "ou na coluna" e devolve
+        # a lista de (conector, tokens da condição). A primeira condição
+        # não tem conector.
+def _separar_condicoes(tokens):
+
+    partes, inicio, conector = [], 0, None
+    for i in range(1, len(tokens) - 2):
+        if tokens[i].texto in ("e", "ou") and tokens[i + 1].texto == "na" and tokens[i + 2].texto == "coluna":
+            partes.append((conector, tokens[inicio:i]))
+            conector, inicio = tokens[i].texto, i + 3
+    partes.append((conector, tokens[inicio:]))
+    return partes
+
+
+@comando("filtrar na coluna")
+def _filtrar(texto, tokens):
+
+    grupos, grupo = [], []
+    for conector, parte in _separar_condicoes(tokens):
+
+        condicao = _condicao(texto, parte)
+        if condicao is None:
+            return None
+
+        # "ou" fecha o grupo atual; "e" continua no mesmo grupo.
+        if conector == "ou":
+            grupos.append(tuple(grupo))
+            grupo = []
+        grupo.append(condicao)
+
+    grupos.append(tuple(grupo))
+
+    # Uma única igualdade continua sendo o filtro simples, que pode usar
+            # os índices e entrar no plano do modo lazy.
+    if len(grupos) == 1 and len(grupos[0]) == 1 and grupos[0][0].operador == "igual":
+        return Filtrar(grupos[0][0].coluna, grupos[0][0].valores[0])
+
+    return FiltrarComposto(tuple(grupos))
+
+
+@comando("ordenar o dataframe pela coluna")
+def _ordenar(texto, tokens):
+    return Ordenar(recortar(texto, tokens)) if tokens else None
+
+
+# Estratégias de preenchimento, na forma como são escritas nos comandos,
+        # com e sem acentos.
+_ESTRATEGIAS = {"a média": "media", "a media": "media", "média": "media", "media": "media",
+                "a mediana": "mediana", "mediana": "mediana",
+                "o valor anterior": "anterior", "valor anterior": "anterior",
+                "o próximo valor": "seguinte", "o proximo valor": "seguinte",
+                "próximo valor": "seguinte", "proximo valor": "seguinte",
+                "o valor seguinte": "seguinte", "valor seguinte": "seguinte"}
+
+
+@comando("preencher valores nulos na coluna")
+def _preencher_nulos(texto, tokens):
+
+    partes = dividir(texto, tokens, "com")
+    if not partes:
+        return None
+
+    # Depois de "com" vem uma estratégia, opcionalmente seguida de
+            # "por <coluna de grupo>", ou o valor fixo.
+    coluna, valor = partes
+    resto = tokens[procurar(tokens, "com") + 1:]
+    for escrito, estrategia in _ESTRATEGIAS.items():
+        tamanho = len(escrito.split())
+        if procurar(resto[:tamanho], escrito) != 0:
+            continue
+        if len(resto) == tamanho:
+            return PreencherNulos(coluna, valor, estrategia)
+        if resto[tamanho].texto == "por" and len(resto) > tamanho + 1:
+            return PreencherNulos(coluna, valor, estrategia, recortar(texto, resto, tamanho + 1))
+
+    return PreencherNulos(coluna, valor)
+
+
+# Extrai o primeiro número do restante do comando, como a versão original
+        # ("mostrar as primeiras 10 linhas").
+def _numero_de_linhas(texto, tokens):
+
+    numero = _NUMERO.search(recortar(texto, tokens))
+    if numero is None:
+        raise ErroSintaxe("Número de linhas não especificado ou inválido.")
+    return int(numero.group())
+
+
+@comando("mostrar as primeiras")
+def _primeiras(texto, tokens):
+    return Primeiras(_numero_de_linhas(texto, tokens))
+
+
+@comando("mostrar as últimas")
+def _ultimas(texto, tokens):
+    return Ultimas(_numero_de_linhas(texto, tokens))
+
+
+@comando("mostrar o")
+def _quem_vendeu(texto, tokens):
+
+    # Procura "que", seguido de "mais" ou "menos" e "vendeu na coluna de".
+    que = procurar(tokens, "que")
+    if que <= 0 or que + 1 >= len(tokens) or tokens[que + 1].texto not in ("mais", "menos"):
+        return None
+
+    vendeu = que + 2
+    if procurar(tokens, "vendeu na coluna de", vendeu) != vendeu or vendeu + 4 >= len(tokens):
+        return None
+
+    return QuemVendeu(recortar(texto, tokens, 0, que),
+                      tokens[que + 1].texto == "mais",
+                      recortar(texto, tokens, vendeu + 4))
+
+
+@comando("mostrar")
+def _ordenados_por_vendas(texto, tokens):
+
+    # Procura "ordenados por" e, depois dele, "na coluna de".
+    ordenados = procurar(tokens, "ordenados por")
+    if ordenados <= 0:
+        return None
+
+    coluna_de = procurar(tokens, "na coluna de", ordenados + 2)
+    if coluna_de < 0 or coluna_de + 3 >= len(tokens):
+        return None
+
+    return OrdenadosPorVendas(recortar(texto, tokens, 0, ordenados),
+                              recortar(texto, tokens, coluna_de + 3))
+
+
+@comando("mostrar os")
+def _melhores_grupos(texto, tokens):
+
+    # O número de grupos vem logo depois de "mostrar os".
+    if not tokens or not tokens[0].texto.isdigit():
+        return None
+    n = int(tokens[0].texto)
+    resto = tokens[1:]
+
+    # mostrar os 20 primeiros/últimos X ordenados por vendas na coluna de Y
+    if resto and resto[0].texto in ("primeiros", "últimos"):
+        maiores = resto[0].texto == "primeiros"
+        comando = _ordenados_por_vendas(texto, resto[1:])
+        if comando is None:
+            return None
+        return MelhoresGrupos(comando.coluna_grupo, n, maiores, comando.coluna_vendas)
+
+    # mostrar os 20 X que mais/menos venderam na coluna de Y
+    que = procurar(resto, "que")
+    if que <= 0 or que + 1 >= len(resto) or resto[que + 1].texto not in ("mais", "menos"):
+        return None
+
+    venderam = que + 2
+    if procurar(resto, "venderam na coluna de", venderam) != venderam or venderam + 4 >= len(resto):
+        return None
+
+    return MelhoresGrupos(recortar(texto, resto, 0, que), n,
+                          resto[que + 1].texto == "mais",
+                          recortar(texto, resto, venderam + 4))
+
+
+# Comandos sem argumentos: o restante do texto precisa estar vazio.
+@comando("ativar modo lazy")
+def _ativar_modo_lazy(texto, tokens):
+    return None if tokens else ModoLazy(True)
+
+
+@comando("desativar modo lazy")
+def _desativar_modo_lazy(texto, tokens):
+    return None if tokens else ModoLazy(False)
+
+
+@comando("executar plano")
+def _executar_plano(texto, tokens):
+    return None if tokens else ExecutarPlano()
+
+
+@comando("mostrar plano")
+def _mostrar_plano(texto, tokens):
+    return None if tokens else MostrarPlano()
+
+
+@comando("desfazer")
+def _desfazer(texto, tokens):
+    return None if tokens else Desfazer()
+
+
+@comando("refazer")
+def _refazer(texto, tokens):
+    return None if tokens else Refazer()
+
+
+@comando("indexar a coluna")
+def _indexar_coluna(texto, tokens):
+    return IndexarColuna(recortar(texto, tokens)) if tokens else None
+
+
+@comando("remover o índice da coluna")
+def _remover_indice(texto, tokens):
+    return RemoverIndice(recortar(texto, tokens)) if tokens else None
+
+
+@comando("usar a tabela")
+def _usar_tabela(texto, tokens):
+    return UsarTabelas((recortar(texto, tokens),)) if tokens else None
+
+
+# Os nomes são separados por vírgulas e o último pelo "e":
+        # "usar as tabelas Janeiro, Fevereiro e Março".
+@comando("usar as tabelas")
+def _usar_tabelas(texto, tokens):
+
+    if not tokens:
+        return None
+
+    nomes = []
+    for parte in recortar(texto, tokens).split(","):
+        separadas = dividir(parte, tokenizar(parte), "e")
+        while separadas:
+            nomes.append(separadas[0])
+            parte = separadas[1]
+            separadas = dividir(parte, tokenizar(parte), "e")
+        nomes.append(parte.strip())
+
+    nomes = tuple(nome for nome in nomes if nome)
+    return UsarTabelas(nomes) if nomes else None
+
+
+@comando("usar todas as tabelas")
+def _usar_todas_as_tabelas(texto, tokens):
+    return None if tokens else UsarTabelas(())
+
+
+@comando("listar as tabelas")
+def _listar_tabelas(texto, tokens):
+    return None if tokens else ListarTabelas()
+
+
+@comando("juntar com a tabela")
+def _juntar(texto, tokens):
+
+    confirmado = len(tokens) > 2 and [t.texto for t in tokens[-2:]] == ["mesmo", "assim"]
+    if confirmado:
+        tokens = tokens[:-2]
+
+    partes = dividir(texto, tokens, "pela coluna")
+    if not partes:
+        return None
+
+    tabela, colunas = partes
+    colunas_tokens = tokenizar(colunas)
+    duas = dividir(colunas, colunas_tokens, "com a coluna")
+    coluna, coluna_outra = duas if duas else (colunas, colunas)
+
+    return Juntar(tabela, coluna, coluna_outra, confirmado)
+
+
+# Interpreta o texto de um comando e devolve o objeto de comando.
+# O resultado é memorizado: interpretar novamente o mesmo texto não
+        # percorre a trie de novo. Textos inválidos lançam 'ErroSintaxe'.
+@lru_cache(maxsize=TAMANHO_CACHE)
+def interpretar(texto):
+
+    tokens = tokenizar(texto)
+    candidatos = _COMANDOS.candidatos(tokens)
+
+    # Nenhum prefixo conhecido: o comando não existe.
+    if not candidatos:
+        raise ErroSintaxe("Comando inválido...")
+
+    # Tenta os prefixos do mais longo para o mais curto. Por exemplo,
+            # "mostrar o X ordenados por ..." não é um "mostrar o X que mais
+            # vendeu", então é interpretado pelo prefixo "mostrar".
+    for funcao, posicao in candidatos:
+        resultado = funcao(texto, tokens[posicao:])
+        if resultado is not None:
+            return resultado
+
+    raise ErroSintaxe("Comando mal formatado. Tente novamente.", aviso=True)
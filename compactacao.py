@@ -0,0 +1,80 @@
+# Importa o módulo pandas e o renomeia para pd, usado
+        # para manipulação de dados.
+import pandas as pd
+
+
+# Este módulo reduz a memória ocupada pelo DataFrame logo depois da leitura
+        # da planilha.
+# Colunas de texto com poucos valores diferentes (vendedores, produtos,
+        # cidades) viram colunas categóricas: cada valor diferente é guardado
+        # uma única vez e as linhas guardam apenas um código inteiro. Colunas
+        # de números inteiros passam a usar o menor tipo inteiro que comporta
+        # os seus valores.
+# As conversões foram escolhidas para que os comandos se comportem
+        # exatamente como antes: números com casas decimais não são
+        # convertidos (perderiam precisão), e colunas que misturam texto e
+        # números continuam como estão (a ordenação de uma coluna categórica
+        # com tipos misturados seria diferente).
+
+
+# Fração máxima de valores diferentes para que uma coluna de texto vire
+        # categórica. Acima disso, os códigos não compensam.
+LIMITE_CARDINALIDADE = 0.5
+
+
+# Verifica se todos os valores não nulos da coluna são textos.
+def _somente_texto(serie):
+
+    if pd.api.types.is_string_dtype(serie.dtype) and not pd.api.types.is_object_dtype(serie.dtype):
+        return True
+    if not pd.api.types.is_object_dtype(serie.dtype):
+        return False
+    return serie.dropna().map(type).eq(str).all()
+
+
+# Devolve a versão compacta de uma coluna, ou a própria coluna se não há
+        # conversão que economize memória sem mudar o comportamento.
+def compactar_coluna(serie):
+
+    if isinstance(serie.dtype, pd.CategoricalDtype) or len(serie) == 0:
+        return serie
+
+    # Inteiros: 'downcast="integer"' escolhe o menor tipo (int8, int16, ...)
+            # que comporta todos os valores da coluna.
+    if pd.api.types.is_integer_dtype(serie.dtype) and not pd.api.types.is_bool_dtype(serie.dtype):
+        return pd.to_numeric(serie, downcast="integer")
+
+    # Texto com poucos valores diferentes: categórica, mas só se de fato
+            # ocupar menos memória (em planilhas pequenas, nem sempre ocupa).
+    if _somente_texto(serie) and serie.nunique() <= LIMITE_CARDINALIDADE * len(serie):
+        categorica = serie.astype("category")
+        if categorica.memory_usage(deep=True) < serie.memory_usage(deep=True):
+            return categorica
+
+    return serie
+
+
+# Função que compacta todas as colunas do DataFrame.
+# Devolve o DataFrame compacto e a memória ocupada antes e depois, em bytes.
+def compactar(df):
+
+    antes = int(df.memory_usage(deep=True).sum())
+
+    # As colunas são trocadas por posição ('isetitem'), o que também
+            # funciona com nomes de colunas repetidos. As colunas que não
+            # mudam continuam compartilhadas com o DataFrame original.
+    compacto = df.copy(deep=False)
+    for posicao in range(df.shape[1]):
+        compacto.isetitem(posicao, compactar_coluna(df.iloc[:, posicao]))
+
+    depois = int(compacto.memory_usage(deep=True).sum())
+
+    return compacto, antes, depois
+
+
+# Descreve a economia de memória em uma frase para o usuário.
+def descrever_economia(antes, depois):
+
+    mb = 1024 * 1024
+    economia = 0 if antes == 0 else 100 * (antes - depois) / antes
+    return f"Memória: {antes / mb:.1f} MB -> {depois / mb:.1f} MB ({economia:.0f}% menos)"
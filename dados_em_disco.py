@@ -0,0 +1,505 @@
+# Importa o módulo os para manipular caminhos e arquivos.
+import os
+
+# Importa o módulo shutil, usado para apagar os diretórios das partes.
+import shutil
+
+# Importa o módulo tempfile, usado para criar os diretórios das partes.
+import tempfile
+
+# Importa o módulo threading, usado para numerar os arquivos das partes
+        # quando várias tarefas gravam ao mesmo tempo.
+import threading
+
+# Importa o módulo weakref, usado para apagar o diretório de um conjunto de
+        # dados quando nenhum objeto o usa mais.
+import weakref
+
+# Importa o módulo numpy e o renomeia para np, usado para localizar as
+        # partes que contêm um intervalo de linhas.
+import numpy as np
+
+# Importa o módulo pandas e o renomeia para pd, usado
+        # para manipulação de dados.
+import pandas as pd
+
+# Importa a soma por grupo usada pelos comandos de ranking, aplicada a
+        # cada parte.
+from agregacoes import somar_por_grupo
+
+# Importa o ajuste de tipos da leitura em blocos, aplicado a cada bloco
+        # antes de gravá-lo.
+from leitura_streaming import ajustar_tipos
+
+# O pyarrow é opcional: sem ele, o modo de dados em disco fica indisponível.
+try:
+    import pyarrow as pa
+    from pyarrow import feather
+except ImportError:
+    pa = None
+    feather = None
+
+
+# Este módulo guarda conjuntos de dados maiores que a memória em disco,
+        # divididos em partes de até 'TAMANHO_PARTE' linhas, cada uma em um
+        # arquivo colunar (Feather, sem compressão, como o cache das
+        # planilhas). Só as partes em uso são lidas, mapeadas na memória.
+# 'DadosEmDisco' imita a parte da interface do DataFrame usada pelos
+        # comandos e pela grade virtual ('len', 'columns', 'iloc' com
+        # fatias, 'head', 'tail', 'drop', 'rename' e 'sort_values'), e
+        # oferece o filtro e a soma por grupo como operações que percorrem
+        # as partes uma a uma. As operações nunca alteram o conjunto: o
+        # resultado é gravado em novas partes, e o diretório de cada
+        # conjunto é apagado quando nenhum objeto o usa mais.
+
+
+# Quantidade máxima de linhas de cada parte. É o mesmo tamanho dos maiores
+        # blocos da leitura progressiva (ver 'leitura_streaming.py').
+TAMANHO_PARTE = 200_000
+
+# Diretório onde as partes são gravadas. Pode ser alterado pela variável de
+        # ambiente 'LIST_COMMAND_DISCO' (por exemplo, para um disco com mais
+        # espaço); por padrão, é o diretório temporário do sistema.
+DIRETORIO_PADRAO = os.environ.get("LIST_COMMAND_DISCO") or None
+
+
+# Indica se o modo de dados em disco pode ser usado.
+def disponivel():
+    return feather is not None
+
+
+# Diretório temporário com as partes de um ou mais conjuntos de dados.
+# O diretório é apagado quando o último objeto que o referencia deixa de
+        # existir (ou quando o programa termina).
+class _Diretorio:
+
+    def __init__(self):
+
+        if DIRETORIO_PADRAO:
+            os.makedirs(DIRETORIO_PADRAO, exist_ok=True)
+        self.caminho = tempfile.mkdtemp(prefix="list_command_disco_", dir=DIRETORIO_PADRAO)
+        self._contador = 0
+        self._trava = threading.Lock()
+        weakref.finalize(self, shutil.rmtree, self.caminho, True)
+
+
+    # Devolve o caminho de um novo arquivo dentro do diretório.
+    def novo_arquivo(self):
+
+        with self._trava:
+            self._contador += 1
+            return os.path.join(self.caminho, f"{self._contador}.feather")
+
+
+# Converte um bloco em tabela do Arrow. Colunas de texto com valores de
+        # outros tipos misturados (por exemplo, números e textos na mesma
+        # coluna), que o Arrow não aceita, são gravadas como texto.
+def _tabela(df):
+
+    try:
+        return pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowException, TypeError, ValueError):
+        df = df.copy(deep=False)
+        for coluna in df.columns[df.dtypes == object]:
+            df[coluna] = df[coluna].map(lambda valor: valor if valor is None or isinstance(valor, str) else str(valor))
+        return pa.Table.from_pandas(df, preserve_index=False)
+
+
+# Esquema comum às tabelas das partes, coluna a coluna. Os tipos são
+        # promovidos como em 'DadosEmDisco.esquema' (uma parte sem valores
+        # na coluna aceita o tipo das outras; inteiro e decimal viram
+        # decimal); tipos sem promoção (números em uma parte e textos em
+        # outra) viram texto, como as colunas misturadas de '_tabela'.
+        # Colunas de inteiros com nulos em alguma parte viram decimais, que
+        # é o tipo que o pandas dá a essas colunas ao ler a parte.
+def _esquema_comum(tabelas):
+
+    campos = []
+    for i, campo in enumerate(tabelas[0].schema):
+        esquemas = [pa.schema([campo.with_type(tabela.schema.field(i).type)]) for tabela in tabelas]
+        try:
+            tipo = pa.unify_schemas(esquemas, promote_options="permissive").field(0).type
+        except pa.ArrowException:
+            tipo = pa.large_string()
+        if pa.types.is_integer(tipo) and any(tabela.column(i).null_count for tabela in tabelas):
+            tipo = pa.float64()
+        campos.append(campo.with_type(tipo))
+    return pa.schema(campos)
+
+
+# Grava um bloco em um novo arquivo do diretório e devolve (caminho, linhas).
+def _gravar_arquivo(diretorio, df):
+
+    caminho = diretorio.novo_arquivo()
+    feather.write_feather(_tabela(df), caminho, compression="uncompressed")
+    return caminho, len(df)
+
+
+# Acumula blocos de linhas de qualquer tamanho e os grava em partes de
+        # 'TAMANHO_PARTE' linhas.
+class _Escritor:
+
+    def __init__(self, diretorio, colunas):
+
+        self.diretorio = diretorio
+        self.colunas = list(colunas)
+        self.partes = []
+        self._pendentes = []
+        self._linhas_pendentes = 0
+
+
+    def adicionar(self, df):
+
+        if len(df):
+            self._pendentes.append(df)
+            self._linhas_pendentes += len(df)
+        while self._linhas_pendentes >= TAMANHO_PARTE:
+            self._gravar(TAMANHO_PARTE)
+
+
+    # Grava as primeiras 'linhas' linhas pendentes como uma parte.
+    def _gravar(self, linhas):
+
+        pendentes = pd.concat(self._pendentes, ignore_index=True) if len(self._pendentes) > 1 else self._pendentes[0]
+        self.partes.append(_gravar_arquivo(self.diretorio, pendentes.iloc[:linhas]))
+        restante = pendentes.iloc[linhas:]
+        self._pendentes = [restante] if len(restante) else []
+        self._linhas_pendentes = len(restante)
+
+
+    # Grava as linhas restantes e devolve o conjunto de dados.
+    def concluir(self):
+
+        if self._linhas_pendentes:
+            self._gravar(self._linhas_pendentes)
+        self._uniformizar()
+        return DadosEmDisco(self.partes, self.colunas, [self.diretorio])
+
+
+    # Cada parte é gravada com os tipos adivinhados só pelas suas linhas:
+            # uma parte sem valores em uma coluna numérica a grava como
+            # nula, e uma parte com números e textos misturados, como texto.
+            # Depois de gravadas todas as partes, os tipos são escolhidos uma
+            # vez para o conjunto inteiro ('_esquema_comum'), e as partes com
+            # outros tipos são regravadas com eles. Assim os filtros e a
+            # intercalação da ordenação comparam sempre valores do mesmo tipo.
+    def _uniformizar(self):
+
+        if len(self.partes) < 2:
+            return
+
+        tabelas = [feather.read_table(caminho, memory_map=True) for caminho, _ in self.partes]
+        alvo = _esquema_comum(tabelas)
+
+        antigos = []
+        for i, tabela in enumerate(tabelas):
+            if not tabela.schema.equals(alvo):
+                caminho = self.diretorio.novo_arquivo()
+                feather.write_feather(tabela.cast(alvo), caminho, compression="uncompressed")
+                antigos.append(self.partes[i][0])
+                self.partes[i] = (caminho, self.partes[i][1])
+
+        # Os arquivos substituídos só são apagados depois de fechadas as
+                # tabelas mapeadas na memória.
+        del tabelas, tabela
+        for caminho in antigos:
+            os.remove(caminho)
+
+
+# Grava os blocos (DataFrames com as mesmas colunas) em disco e devolve o
+        # conjunto de dados. Os blocos são consumidos um a um: apenas uma
+        # parte fica na memória de cada vez. Os tipos de cada bloco são
+        # ajustados como os da leitura progressiva, e o escritor uniformiza
+        # os tipos das partes no fim.
+def gravar_em_disco(blocos):
+
+    diretorio = _Diretorio()
+    escritor = None
+    for bloco in blocos:
+        if escritor is None:
+            escritor = _Escritor(diretorio, [str(coluna) for coluna in bloco.columns])
+        escritor.adicionar(ajustar_tipos(bloco.rename(columns=str)))
+
+    if escritor is None:
+        escritor = _Escritor(diretorio, [])
+    return escritor.concluir()
+
+
+# Acesso às linhas por posição, como 'DataFrame.iloc', apenas com fatias.
+class _Posicoes:
+
+    def __init__(self, dados):
+        self.dados = dados
+
+    def __getitem__(self, fatia):
+
+        if not isinstance(fatia, slice):
+            raise TypeError("Os dados em disco só podem ser acessados por fatias de linhas.")
+        inicio, fim, passo = fatia.indices(len(self.dados))
+        if passo != 1:
+            raise TypeError("Os dados em disco só podem ser acessados por fatias contínuas.")
+        return self.dados._ler_intervalo(inicio, max(inicio, fim))
+
+
+# Leitor de uma parte ordenada, usado pela intercalação da ordenação
+        # externa: mantém na memória apenas um lote de linhas da parte.
+class _Corrida:
+
+    def __init__(self, caminho, linhas, lote):
+
+        self.tabela = feather.read_table(caminho, memory_map=True)
+        self.linhas = linhas
+        self.lote = lote
+        self.lidas = 0
+        self.bloco = None
+
+
+    # Lê o próximo lote, se o atual acabou. Devolve False quando a parte
+            # inteira já foi consumida.
+    def carregar(self):
+
+        if self.bloco is not None and len(self.bloco):
+            return True
+        if self.lidas >= self.linhas:
+            return False
+        self.bloco = self.tabela.slice(self.lidas, self.lote).to_pandas()
+        self.lidas += len(self.bloco)
+        return True
+
+
+    # Remove as primeiras 'quantidade' linhas do lote e as devolve.
+    def consumir(self, quantidade):
+
+        consumidas = self.bloco.iloc[:quantidade]
+        self.bloco = self.bloco.iloc[quantidade:]
+        return consumidas
+
+
+# Conjunto de dados guardado em disco, em partes.
+# 'partes' é a lista de (caminho, linhas) dos arquivos; 'colunas' são os
+        # nomes das colunas exibidos e 'origem', os nomes gravados nos
+        # arquivos (diferentes depois de uma renomeação, que não regrava as
+        # partes). 'diretorios' mantém vivos os diretórios das partes.
+class DadosEmDisco:
+
+    def __init__(self, partes, colunas, diretorios, origem=None):
+
+        self.partes = list(partes)
+        self.colunas = list(colunas)
+        self.origem = list(colunas if origem is None else origem)
+        self._diretorios = list(diretorios)
+
+        # Posição da primeira linha de cada parte; o último valor é o total.
+        self._inicios = np.concatenate(([0], np.cumsum([linhas for _, linhas in self.partes], dtype=np.int64)))
+
+        # Tabelas já abertas (mapeadas na memória), por parte.
+        self._tabelas = {}
+
+
+    @property
+    def columns(self):
+        return pd.Index(self.colunas, dtype=object)
+
+
+    def __len__(self):
+        return int(self._inicios[-1])
+
+
+    @property
+    def shape(self):
+        return len(self), len(self.colunas)
+
+
+    @property
+    def empty(self):
+        return len(self) == 0 or not self.colunas
+
+
+    @property
+    def iloc(self):
+        return _Posicoes(self)
+
+
+    # Abre a tabela de uma parte. Abrir um arquivo mapeado na memória não
+            # lê os dados: só as linhas convertidas depois são lidas do disco.
+    def _tabela(self, indice):
+
+        tabela = self._tabelas.get(indice)
+        if tabela is None:
+            tabela = feather.read_table(self.partes[indice][0], columns=self.origem, memory_map=True)
+            self._tabelas[indice] = tabela
+        return tabela
+
+
+    # Lê as linhas [inicio, inicio + quantidade) de uma parte.
+    def _ler(self, indice, inicio=0, quantidade=None):
+
+        tabela = self._tabela(indice)
+        if inicio or quantidade is not None:
+            tabela = tabela.slice(inicio, quantidade)
+        df = tabela.to_pandas()
+        df.columns = self.colunas
+        return df
+
+
+    # Lê as linhas [inicio, fim) do conjunto, das partes que as contêm.
+    def _ler_intervalo(self, inicio, fim):
+
+        blocos = []
+        primeira = max(0, int(np.searchsorted(self._inicios, inicio, side="right")) - 1)
+
+        for indice in range(primeira, len(self.partes)):
+            comeco = self._inicios[indice]
+            if comeco >= fim:
+                break
+            de = max(inicio, comeco) - comeco
+            ate = min(fim, self._inicios[indice + 1]) - comeco
+            blocos.append(self._ler(indice, int(de), int(ate - de)))
+
+        if not blocos:
+            return pd.DataFrame(columns=self.colunas)
+        return pd.concat(blocos, ignore_index=True) if len(blocos) > 1 else blocos[0]
+
+
+    # Percorre as partes, devolvendo cada uma como DataFrame.
+    def blocos(self):
+        for indice in range(len(self.partes)):
+            yield self._ler(indice)
+
+
+    # Conjunto com as mesmas partes e outras colunas (ou nomes), sem regravar nada.
+    def _projetar(self, colunas, origem):
+        return DadosEmDisco(self.partes, colunas, self._diretorios, origem)
+
+
+    # Primeiras 'n' linhas, como DataFrame na memória.
+    def head(self, n=5):
+        return self._ler_intervalo(0, min(n, len(self)))
+
+
+    # Últimas 'n' linhas, como DataFrame na memória.
+    def tail(self, n=5):
+        return self._ler_intervalo(max(0, len(self) - n), len(self))
+
+
+    # Remove colunas, como 'DataFrame.drop(columns=...)'.
+    def drop(self, columns):
+
+        remover = set(columns)
+        pares = [(coluna, origem) for coluna, origem in zip(self.colunas, self.origem) if coluna not in remover]
+        return self._projetar([coluna for coluna, _ in pares], [origem for _, origem in pares])
+
+
+    # Renomeia colunas, como 'DataFrame.rename(columns=...)'. 'columns' pode
+            # ser um dicionário ou uma função.
+    def rename(self, columns):
+
+        renomear = columns if callable(columns) else (lambda coluna: columns.get(coluna, coluna))
+        return self._projetar([renomear(coluna) for coluna in self.colunas], self.origem)
+
+
+    # Mantém as linhas em que 'mascara(bloco)' (um array de booleanos com
+            # uma posição por linha do bloco) é verdadeira. Cada parte é
+            # lida, filtrada e gravada no novo conjunto.
+    def filtrar(self, mascara):
+
+        escritor = _Escritor(_Diretorio(), self.colunas)
+        for bloco in self.blocos():
+            escritor.adicionar(bloco[mascara(bloco)])
+        return escritor.concluir()
+
+
+    # Soma os valores de uma coluna para cada grupo de outra, como
+            # 'somar_por_grupo' sobre o DataFrame inteiro.
+    # Cada parte é agregada separadamente e as somas parciais são somadas
+            # por grupo. As somas de números com casas decimais podem diferir
+            # das do DataFrame na memória nos últimos dígitos, pois as
+            # parcelas são somadas em outra ordem.
+    def somar_por_grupo(self, coluna_grupo, coluna_valores):
+
+        parciais = [somar_por_grupo(bloco, coluna_grupo, coluna_valores) for bloco in self.blocos()]
+        if not parciais:
+            return pd.Series(dtype=float, name=coluna_valores, index=pd.Index([], name=coluna_grupo))
+
+        somas = pd.concat(parciais).groupby(level=0, sort=True).sum()
+        somas.index.name = coluna_grupo
+        return somas.rename(coluna_valores)
+
+
+    # Ordena as linhas por uma coluna, em ordem crescente e estável, como
+            # 'DataFrame.sort_values(by=coluna, kind="stable")', com uma
+            # ordenação externa:
+    # 1. cada parte é ordenada na memória e gravada como uma "corrida";
+    # 2. as corridas são intercaladas lendo um lote de cada uma por vez, de
+            # modo que a memória usada não depende do total de linhas.
+    # Os valores nulos vão para o fim, na ordem original, como no pandas.
+    def sort_values(self, by, ascending=True, kind="stable"):
+
+        coluna = by[0] if isinstance(by, list) else by
+        if not ascending or (isinstance(by, list) and len(by) != 1):
+            raise ValueError("Os dados em disco só podem ser ordenados por uma coluna, em ordem crescente.")
+
+        diretorio = _Diretorio()
+        corridas = []
+        nulos = []
+
+        for bloco in self.blocos():
+            nulas = bloco[coluna].isna().to_numpy()
+            if nulas.any():
+                nulos.append(_gravar_arquivo(diretorio, bloco[nulas]))
+            ordenado = bloco[~nulas].sort_values(by=coluna, kind="stable")
+            if len(ordenado):
+                corridas.append(_gravar_arquivo(diretorio, ordenado))
+
+        escritor = _Escritor(diretorio, self.colunas)
+        _intercalar(corridas, coluna, escritor)
+
+        for caminho, _ in nulos:
+            escritor.adicionar(feather.read_table(caminho, memory_map=True).to_pandas())
+
+        return escritor.concluir()
+
+
+    # Esquema do Arrow comum a todas as partes (por exemplo, uma coluna
+            # inteira em uma parte e decimal em outra vira decimal), usado
+            # pela exportação para Parquet.
+    def esquema(self):
+
+        esquemas = []
+        for indice in range(len(self.partes)):
+            esquema = self._tabela(indice).schema
+            esquemas.append(pa.schema([campo.with_name(nome) for campo, nome in zip(esquema, self.colunas)]))
+        return pa.unify_schemas(esquemas, promote_options="permissive")
+
+
+# Intercala as corridas (partes já ordenadas pela coluna, sem nulos) e
+        # grava as linhas em ordem no escritor.
+# A cada passo, o limite é a menor "última chave" entre os lotes em
+        # memória (no empate, a da primeira corrida). Todas as linhas até o
+        # limite estão em memória e podem ser gravadas: linhas com chave
+        # menor que o limite, de qualquer corrida, e linhas com chave igual
+        # ao limite, das corridas até a do limite. As linhas com chave igual
+        # das corridas seguintes esperam, para que os empates mantenham a
+        # ordem original, como na ordenação estável.
+def _intercalar(corridas, coluna, escritor):
+
+    lote = max(1_000, TAMANHO_PARTE // max(1, len(corridas)))
+    ativas = [_Corrida(caminho, linhas, lote) for caminho, linhas in corridas]
+    ativas = [corrida for corrida in ativas if corrida.carregar()]
+
+    while ativas:
+
+        ultimas = [corrida.bloco[coluna].iloc[-1] for corrida in ativas]
+        limite = min(range(len(ativas)), key=lambda i: (ultimas[i], i))
+        chave = ultimas[limite]
+
+        partes = []
+        for i, corrida in enumerate(ativas):
+            quantidade = int(corrida.bloco[coluna].searchsorted(chave, side="right" if i <= limite else "left"))
+            if quantidade:
+                partes.append(corrida.consumir(quantidade))
+
+        # As partes estão na ordem das corridas; a ordenação estável mantém
+                # essa ordem nos empates.
+        escritor.adicionar(pd.concat(partes, ignore_index=True).sort_values(by=coluna, kind="stable"))
+        ativas = [corrida for corrida in ativas if corrida.carregar()]
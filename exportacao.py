@@ -0,0 +1,213 @@
+# Importa o módulo os para manipular caminhos e trocar o arquivo
+        # temporário pelo arquivo final.
+import os
+
+# Importa o Workbook do openpyxl, usado no modo de escrita contínua
+        # ('write_only'), que grava as linhas no disco conforme são
+        # adicionadas em vez de montar a planilha inteira na memória.
+from openpyxl import Workbook
+
+# O pyarrow é opcional: sem ele, a exportação para Parquet fica indisponível.
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+
+# Este módulo exporta DataFrames para xlsx, CSV e Parquet em blocos de
+        # linhas, com memória constante e informando o andamento.
+# Todas as funções de exportação recebem 'progresso(fracao, mensagem)' e
+        # 'verificar()' opcionais: o primeiro informa o andamento e o segundo
+        # é chamado entre os blocos e pode interromper a exportação (por
+        # exemplo, 'Tarefa.verificar_cancelamento'). O arquivo é gravado com
+        # um nome temporário e só recebe o nome final quando termina, para
+        # que uma exportação interrompida não deixe um arquivo pela metade.
+
+
+# Quantidade de linhas gravadas por bloco.
+LINHAS_POR_BLOCO = 10_000
+
+# Quantidade máxima de linhas de uma planilha do Excel, incluindo o cabeçalho.
+MAXIMO_LINHAS_XLSX = 1_048_576
+
+# Tamanho máximo do nome de uma planilha no Excel.
+MAXIMO_NOME_PLANILHA = 31
+
+# Nome da planilha usado por 'DataFrame.to_excel'.
+PLANILHA_PADRAO = "Sheet1"
+
+
+# Formatos disponíveis na janela de salvar: (descrição, extensão).
+def formatos_disponiveis():
+
+    formatos = [("Arquivos Excel", ".xlsx"), ("Arquivos CSV", ".csv")]
+    if pq is not None:
+        formatos.append(("Arquivos Parquet", ".parquet"))
+    return formatos
+
+
+# Divide o DataFrame em blocos de linhas.
+def _blocos(df, tamanho=LINHAS_POR_BLOCO):
+    for inicio in range(0, len(df), tamanho):
+        yield df.iloc[inicio:inicio + tamanho]
+
+
+# Converte um bloco em linhas de valores que o openpyxl aceita: valores
+        # nulos (NaN, NaT, pd.NA) viram células vazias.
+def _linhas_xlsx(bloco):
+
+    valores = bloco.astype(object)
+    valores = valores.where(bloco.notna(), None)
+    return valores.itertuples(index=False, name=None)
+
+
+# Grava o arquivo em um caminho temporário e, no fim, o renomeia para o
+        # caminho final. Se a gravação falha ou é interrompida, o arquivo
+        # temporário é apagado.
+def _gravar_com_temporario(caminho, gravar):
+
+    temporario = f"{caminho}.parcial"
+    try:
+        gravar(temporario)
+        os.replace(temporario, caminho)
+    finally:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+
+
+# Grava várias planilhas em um arquivo xlsx. 'planilhas' é uma lista de
+        # (nome da planilha, DataFrame).
+# Planilhas com mais linhas que o limite do Excel continuam em planilhas
+        # seguintes ("Nome (2)", "Nome (3)", ...), em vez de falhar.
+def gravar_xlsx(planilhas, caminho, progresso=None, verificar=None):
+
+    total = sum(len(df) for _, df in planilhas) or 1
+    gravadas = 0
+
+    def gravar(destino):
+
+        nonlocal gravadas
+        livro = Workbook(write_only=True)
+
+        try:
+            _preencher(livro)
+        except BaseException:
+
+            # Fecha as planilhas já começadas, cujos dados estão em arquivos
+                    # temporários do openpyxl, antes de repassar o erro.
+            for planilha in livro.worksheets:
+                planilha.close()
+            raise
+
+        if progresso:
+            progresso(None, "Finalizando o arquivo...")
+        livro.save(destino)
+
+    def _preencher(livro):
+
+        nonlocal gravadas
+
+        for nome, df in planilhas:
+
+            cabecalho = [str(coluna) for coluna in df.columns]
+            parte = 1
+            planilha = livro.create_sheet(nome)
+            planilha.append(cabecalho)
+            linhas_na_planilha = 1
+
+            for bloco in _blocos(df):
+
+                if verificar:
+                    verificar()
+
+                for linha in _linhas_xlsx(bloco):
+                    if linhas_na_planilha == MAXIMO_LINHAS_XLSX:
+                        parte += 1
+                        # O nome é cortado para que, com o sufixo da parte,
+                                # não passe do limite do Excel.
+                        sufixo = f" ({parte})"
+                        planilha = livro.create_sheet(nome[:MAXIMO_NOME_PLANILHA - len(sufixo)] + sufixo)
+                        planilha.append(cabecalho)
+                        linhas_na_planilha = 1
+                    planilha.append(linha)
+                    linhas_na_planilha += 1
+
+                gravadas += len(bloco)
+                if progresso:
+                    progresso(gravadas / total, f"Exportando... {gravadas} de {total} linhas")
+
+    _gravar_com_temporario(caminho, gravar)
+
+
+# Exporta um DataFrame para xlsx, em uma planilha com o mesmo nome usado
+        # por 'DataFrame.to_excel'.
+def exportar_xlsx(df, caminho, progresso=None, verificar=None):
+    gravar_xlsx([(PLANILHA_PADRAO, df)], caminho, progresso, verificar)
+
+
+# Exporta um DataFrame para CSV, bloco a bloco.
+# 'utf-8-sig' grava a marca BOM no início do arquivo, para que o Excel
+        # reconheça os acentos ao abrir o CSV.
+def exportar_csv(df, caminho, progresso=None, verificar=None):
+
+    total = len(df) or 1
+
+    def gravar(destino):
+
+        with open(destino, "w", encoding="utf-8-sig", newline="") as arquivo:
+            df.iloc[:0].to_csv(arquivo, index=False)
+            gravadas = 0
+            for bloco in _blocos(df):
+                if verificar:
+                    verificar()
+                bloco.to_csv(arquivo, index=False, header=False)
+                gravadas += len(bloco)
+                if progresso:
+                    progresso(gravadas / total, f"Exportando... {gravadas} de {total} linhas")
+
+    _gravar_com_temporario(caminho, gravar)
+
+
+# Exporta um DataFrame para Parquet, um grupo de linhas por bloco.
+def exportar_parquet(df, caminho, progresso=None, verificar=None):
+
+    if pq is None:
+        raise RuntimeError("A exportação para Parquet requer o pacote pyarrow.")
+
+    # O Parquet exige nomes de colunas em texto.
+    # Os dados em disco (ver 'dados_em_disco.py') informam o esquema comum
+            # às suas partes, sem serem lidos inteiros.
+    df = df.rename(columns=str)
+    total = len(df) or 1
+    esquema = df.esquema() if hasattr(df, "esquema") else pa.Schema.from_pandas(df, preserve_index=False)
+
+    def gravar(destino):
+
+        with pq.ParquetWriter(destino, esquema) as escritor:
+            gravadas = 0
+            for bloco in _blocos(df):
+                if verificar:
+                    verificar()
+                escritor.write_table(pa.Table.from_pandas(bloco, schema=esquema, preserve_index=False))
+                gravadas += len(bloco)
+                if progresso:
+                    progresso(gravadas / total, f"Exportando... {gravadas} de {total} linhas")
+
+    _gravar_com_temporario(caminho, gravar)
+
+
+# Funções de exportação por extensão do arquivo.
+EXPORTADORES = {
+    ".xlsx": exportar_xlsx,
+    ".csv": exportar_csv,
+    ".parquet": exportar_parquet,
+}
+
+
+# Exporta o DataFrame no formato indicado pela extensão do caminho.
+# Extensões desconhecidas são gravadas como xlsx, como antes.
+def exportar(df, caminho, progresso=None, verificar=None):
+
+    extensao = os.path.splitext(caminho)[1].lower()
+    EXPORTADORES.get(extensao, exportar_xlsx)(df, caminho, progresso, verificar)
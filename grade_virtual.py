@@ -0,0 +1,213 @@
+# Importa o módulo tkinter e o renomeia para tk, facilitando o
+        # acesso às suas funcionalidades.
+import tkinter as tk
+
+# Importa o submódulo ttk do tkinter, que fornece a Treeview.
+from tkinter import ttk
+
+
+# Quantidade padrão de linhas visíveis na grade. É o mesmo valor
+        # usado pela Treeview do Tkinter quando 'height' não é informado.
+ALTURA_PADRAO = 10
+
+# Quantidade de linhas extras lidas do DataFrame antes e depois da
+        # janela visível. Esse "buffer" evita reler o DataFrame a cada
+        # pequeno movimento da barra de rolagem.
+MARGEM_PADRAO = 50
+
+
+# Função que lê as linhas [inicio, fim) de uma fonte de dados e as
+        # devolve como uma lista de tuplas, prontas para a Treeview.
+# A fonte pode ser qualquer objeto que tenha 'iloc' com fatias, como
+        # um DataFrame do pandas.
+def ler_fatia(fonte, inicio, fim):
+
+    # 'itertuples(index=False, name=None)' devolve tuplas simples, que
+            # é a forma mais barata de percorrer linhas de um DataFrame.
+    return list(fonte.iloc[inicio:fim].itertuples(index=False, name=None))
+
+
+# Grade virtual: mostra um DataFrame de qualquer tamanho em uma Treeview
+        # criando apenas os itens da janela visível.
+# Em vez de inserir todas as linhas (o que trava a interface com
+        # centenas de milhares de linhas), a grade mantém sempre o mesmo
+        # número de itens e apenas troca os valores deles conforme o
+        # usuário rola. Assim, exibir 1 mil ou 5 milhões de linhas tem o
+        # mesmo custo.
+class GradeVirtual(tk.Frame):
+
+    def __init__(self, master, fonte, altura=ALTURA_PADRAO, margem=MARGEM_PADRAO, **kwargs):
+
+        super().__init__(master, **kwargs)
+
+        # Guarda a fonte de dados e as configurações da janela visível.
+        self.fonte = fonte
+        self.total = len(fonte)
+        self.altura = altura
+        self.margem = margem
+
+        # Índice (na fonte) da primeira linha mostrada na Treeview.
+        self.primeira = 0
+
+        # Bloco de linhas já lido da fonte: começa em 'bloco_inicio' e
+                # contém a janela visível mais a margem.
+        self.bloco_inicio = 0
+        self.bloco = []
+
+        # Identificadores dos itens da Treeview, que são reutilizados a
+                # cada rolagem em vez de apagados e criados novamente.
+        self.itens = []
+
+        # Converte os nomes das colunas para texto, pois a Treeview
+                # exige identificadores de coluna do tipo string.
+        colunas = [str(col) for col in fonte.columns]
+
+        # Cria a Treeview com a altura fixa da janela visível. 'show="headings"'
+                # oculta a coluna de índice padrão da Treeview.
+        self.tree = ttk.Treeview(self, columns=colunas, show="headings", height=altura)
+
+        # Configura o cabeçalho e a largura de cada coluna, como
+                # na Treeview original da aplicação.
+        for col in colunas:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=100)
+
+        # A barra de rolagem não é ligada à Treeview diretamente: ela
+                # representa o DataFrame inteiro e chama '_rolar', que decide
+                # quais linhas devem aparecer.
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self._rolar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.tree.pack(side="left", fill="x", expand=True)
+
+        # Rótulo que informa quais linhas estão visíveis e o total, já que a
+                # Treeview sozinha não mostra mais o tamanho real do resultado.
+        self.label_posicao = tk.Label(master,
+                                      font=("Arial", 9),
+                                      bg=kwargs.get("bg", "#f0f0f0"),
+                                      fg="#666")
+
+        # Eventos de roda do mouse: '<MouseWheel>' no Windows e macOS,
+                # '<Button-4>' e '<Button-5>' no Linux.
+        self.tree.bind("<MouseWheel>", self._roda_mouse)
+        self.tree.bind("<Button-4>", lambda evento: self._rolar_roda(-3))
+        self.tree.bind("<Button-5>", lambda evento: self._rolar_roda(3))
+
+        # Eventos de teclado para navegar além da janela visível.
+        self.tree.bind("<Prior>", lambda evento: self._deslocar(-self.altura))
+        self.tree.bind("<Next>", lambda evento: self._deslocar(self.altura))
+        self.tree.bind("<Home>", lambda evento: self._ir_para(0))
+        self.tree.bind("<End>", lambda evento: self._ir_para(self.total))
+
+        # Desenha a primeira janela de linhas.
+        self._desenhar()
+
+
+    # Empacota o rótulo de posição logo abaixo da grade. É separado
+            # do 'pack' da grade para que quem a cria decida o layout.
+    def mostrar_posicao(self, **opcoes_pack):
+        self.label_posicao.pack(**opcoes_pack)
+
+
+    # Troca a fonte de dados exibida, mantendo a posição atual da janela.
+    # Usada pela leitura progressiva, que entrega um DataFrame maior a cada
+            # bloco lido do arquivo.
+    def atualizar_fonte(self, fonte):
+
+        self.fonte = fonte
+        self.total = len(fonte)
+
+        # Descarta o bloco em memória, que pertence à fonte anterior.
+        self.bloco_inicio = 0
+        self.bloco = []
+
+        self.primeira = max(0, min(self.primeira, self.total - self.altura))
+        self._desenhar()
+
+
+    # Devolve as linhas [inicio, fim), lendo um novo bloco da fonte
+            # apenas quando a janela pedida sai do bloco em memória.
+    def _linhas(self, inicio, fim):
+
+        bloco_fim = self.bloco_inicio + len(self.bloco)
+
+        # Se a janela não está inteira no bloco atual, lê um novo bloco
+                # com a margem antes e depois da janela.
+        if inicio < self.bloco_inicio or fim > bloco_fim:
+            self.bloco_inicio = max(0, inicio - self.margem)
+            self.bloco = ler_fatia(self.fonte, self.bloco_inicio, min(self.total, fim + self.margem))
+
+        return self.bloco[inicio - self.bloco_inicio:fim - self.bloco_inicio]
+
+
+    # Preenche os itens da Treeview com as linhas da janela atual.
+    def _desenhar(self):
+
+        fim = min(self.total, self.primeira + self.altura)
+        linhas = self._linhas(self.primeira, fim)
+
+        # Ajusta a quantidade de itens para o número de linhas visíveis
+                # (menor que a altura quando o DataFrame é pequeno).
+        while len(self.itens) < len(linhas):
+            self.itens.append(self.tree.insert("", "end"))
+        while len(self.itens) > len(linhas):
+            self.tree.delete(self.itens.pop())
+
+        # Troca apenas os valores dos itens existentes.
+        for item, linha in zip(self.itens, linhas):
+            self.tree.item(item, values=list(linha))
+
+        # Atualiza a barra de rolagem com a fração visível do DataFrame inteiro.
+        if self.total:
+            self.scrollbar.set(self.primeira / self.total, fim / self.total)
+        else:
+            self.scrollbar.set(0, 1)
+
+        # Atualiza o rótulo de posição.
+        if self.total:
+            self.label_posicao.config(text=f"Linhas {self.primeira + 1}–{fim} de {self.total}")
+        else:
+            self.label_posicao.config(text="Nenhuma linha")
+
+
+    # Move a janela para que 'primeira' seja a linha do topo,
+            # respeitando os limites do DataFrame.
+    def _ir_para(self, primeira):
+
+        primeira = max(0, min(int(primeira), self.total - self.altura))
+
+        # Evita redesenhar quando a posição não mudou.
+        if primeira != self.primeira:
+            self.primeira = primeira
+            self._desenhar()
+
+
+    # Desloca a janela em 'quantidade' linhas (negativo sobe, positivo desce).
+    def _deslocar(self, quantidade):
+        self._ir_para(self.primeira + quantidade)
+
+
+    # Trata os comandos enviados pela barra de rolagem:
+            # ("moveto", fração) ao arrastar, ou ("scroll", n, "units"/"pages")
+            # ao clicar nas setas e na trilha.
+    def _rolar(self, acao, valor, unidade=None):
+
+        if acao == "moveto":
+            self._ir_para(float(valor) * self.total)
+
+        elif acao == "scroll":
+            passo = self.altura if unidade == "pages" else 1
+            self._deslocar(int(valor) * passo)
+
+
+    # Trata a roda do mouse no Windows e no macOS, onde 'event.delta'
+            # é positivo para cima e negativo para baixo.
+    def _roda_mouse(self, evento):
+        return self._rolar_roda(-3 if evento.delta > 0 else 3)
+
+
+    # Desloca a janela visível pela roda do mouse.
+    def _rolar_roda(self, linhas):
+        self._deslocar(linhas)
+
+        # Retorna "break" para que a Treeview não tente rolar sozinha.
+        return "break"
@@ -0,0 +1,89 @@
+# Importa o deque, uma fila com tamanho máximo que descarta
+        # automaticamente os itens mais antigos.
+from collections import deque
+
+
+# Este módulo guarda as versões anteriores do DataFrame da sessão, para os
+        # comandos "desfazer" e "refazer".
+# Cada versão guarda apenas referências aos DataFrames, não cópias. Como o
+        # pandas usa copy-on-write, os comandos criam DataFrames novos que
+        # compartilham as colunas não alteradas com o DataFrame anterior:
+        # remover, renomear ou preencher uma coluna não copia as demais, e
+        # as primeiras/últimas linhas são apenas uma visão das originais.
+        # Assim, voltar um passo não relê o arquivo e custa pouca memória.
+
+
+# Quantidade padrão de versões guardadas para desfazer.
+LIMITE_PADRAO = 20
+
+
+# Estado da sessão antes (ou depois) de um comando.
+class Versao:
+
+    def __init__(self, df, plano, comando):
+
+        # DataFrame atual e plano do modo lazy (None se desativado).
+        self.df = df
+        self.plano = plano
+
+        # Texto do comando que levou a sessão para fora deste estado.
+        self.comando = comando
+
+
+# Histórico limitado de versões, com pilhas de desfazer e refazer.
+class Historico:
+
+    def __init__(self, limite=LIMITE_PADRAO):
+
+        # Versões que podem ser restauradas com "desfazer". Quando o limite
+                # é atingido, a versão mais antiga é descartada.
+        self._desfazer = deque(maxlen=limite)
+
+        # Versões que podem ser restauradas com "refazer".
+        self._refazer = []
+
+
+    # Guarda o estado anterior a um comando. Um comando novo descarta as
+            # versões que poderiam ser refeitas, como em qualquer editor.
+    def registrar(self, versao):
+
+        self._desfazer.append(versao)
+        self._refazer.clear()
+
+
+    # Devolve a versão anterior e guarda 'atual' para o "refazer", ou None
+            # se não há o que desfazer.
+    def desfazer(self, atual):
+
+        if not self._desfazer:
+            return None
+
+        anterior = self._desfazer.pop()
+        atual.comando = anterior.comando
+        self._refazer.append(atual)
+        return anterior
+
+
+    # Devolve a versão desfeita mais recente e guarda 'atual' para o
+            # "desfazer", ou None se não há o que refazer.
+    def refazer(self, atual):
+
+        if not self._refazer:
+            return None
+
+        seguinte = self._refazer.pop()
+        atual.comando = seguinte.comando
+        self._desfazer.append(atual)
+        return seguinte
+
+
+    # Descarta todas as versões (por exemplo, ao carregar outro arquivo).
+    def limpar(self):
+
+        self._desfazer.clear()
+        self._refazer.clear()
+
+
+    # Quantidade de versões que podem ser desfeitas e refeitas.
+    def tamanho(self):
+        return len(self._desfazer), len(self._refazer)
@@ -0,0 +1,170 @@
+# Importa o módulo numpy e o renomeia para np, usado nas operações
+        # vetorizadas sobre as posições das linhas.
+import numpy as np
+
+# Importa o módulo pandas e o renomeia para pd, usado
+        # para manipulação de dados.
+import pandas as pd
+
+
+# Este módulo implementa índices sobre as colunas do DataFrame atual, para
+        # que filtros repetidos na mesma coluna não precisem percorrer todas
+        # as linhas a cada vez.
+# Os índices guardam posições de linhas (como 'iloc'), então valem apenas
+        # enquanto as linhas do DataFrame não mudam de lugar. São opcionais:
+        # o usuário escolhe quais colunas indexar com "indexar a coluna X", e
+        # o índice só é construído no primeiro filtro na coluna.
+
+
+# Índice de hash: para cada valor normalizado da coluna, guarda as posições
+        # das linhas que têm esse valor. Uma busca por igualdade custa um
+        # acesso ao dicionário mais o número de linhas encontradas.
+class IndiceHash:
+
+    # 'chaves' é a coluna normalizada (ver 'chaves.py'), alinhada linha a
+            # linha com o DataFrame.
+    def __init__(self, chaves):
+
+        # 'factorize' troca cada valor por um código inteiro; a ordenação
+                # estável dos códigos junta as posições de cada valor, já em
+                # ordem crescente de posição.
+        # Os valores nulos recebem o código -1 e ficam fora do índice, como
+                # no filtro sem índice, em que nunca são iguais ao valor
+                # procurado.
+        codigos, valores = pd.factorize(chaves.to_numpy())
+        validas = np.flatnonzero(codigos >= 0)
+        self.ordem = validas[np.argsort(codigos[validas], kind="stable")]
+
+        # Limites de cada valor dentro de 'ordem'.
+        limites = np.concatenate(([0], np.cumsum(np.bincount(codigos[validas], minlength=len(valores)))))
+        self.faixas = {valor: (limites[i], limites[i + 1]) for i, valor in enumerate(valores)}
+
+
+    # Devolve as posições das linhas com o valor normalizado dado.
+    def posicoes(self, valor):
+
+        inicio, fim = self.faixas.get(valor, (0, 0))
+        return self.ordem[inicio:fim]
+
+
+# Índice ordenado: guarda as posições das linhas na ordem dos valores da
+        # coluna, para buscas por faixa de valores com busca binária.
+# Só é criado para colunas numéricas ou de datas; os valores nulos ficam
+        # fora do índice, pois não pertencem a nenhuma faixa.
+class IndiceOrdenado:
+
+    def __init__(self, serie):
+
+        valores = serie.to_numpy()
+        validas = np.flatnonzero(serie.notna().to_numpy())
+
+        self.ordem = validas[np.argsort(valores[validas], kind="stable")]
+        self.valores = valores[self.ordem]
+
+
+    # Devolve as posições (em ordem crescente) das linhas com valores entre
+            # 'minimo' e 'maximo'. Um limite None não restringe a faixa.
+    def intervalo(self, minimo=None, maximo=None, incluir_minimo=True, incluir_maximo=True):
+
+        inicio = 0 if minimo is None else np.searchsorted(self.valores, minimo, side="left" if incluir_minimo else "right")
+        fim = len(self.valores) if maximo is None else np.searchsorted(self.valores, maximo, side="right" if incluir_maximo else "left")
+
+        # As posições voltam à ordem das linhas, para que o resultado do
+                # filtro mantenha a ordem do DataFrame.
+        return np.sort(self.ordem[inicio:max(inicio, fim)])
+
+
+# Função que verifica se uma coluna aceita um índice ordenado.
+def aceita_indice_ordenado(serie):
+
+    if pd.api.types.is_bool_dtype(serie):
+        return False
+    return pd.api.types.is_numeric_dtype(serie) or pd.api.types.is_datetime64_any_dtype(serie)
+
+
+# Conjunto de índices da sessão.
+# Guarda quais colunas o usuário pediu para indexar e os índices já
+        # construídos. Assim como o cache das colunas normalizadas, é avisado
+        # pela sessão quando o DataFrame muda.
+class Indices:
+
+    def __init__(self):
+
+        # Colunas marcadas para indexação, na ordem em que foram pedidas.
+        self.colunas = []
+
+        # Índices construídos: nome da coluna -> índice.
+        self._hash = {}
+        self._ordenados = {}
+
+
+    # Indica se a coluna foi marcada para indexação.
+    def indexada(self, coluna):
+        return coluna in self.colunas
+
+
+    # Marca uma coluna para indexação. O índice é construído no primeiro filtro.
+    def marcar(self, coluna):
+
+        if coluna not in self.colunas:
+            self.colunas.append(coluna)
+
+
+    # Desmarca a coluna e descarta os seus índices.
+    def desmarcar(self, coluna):
+
+        if coluna in self.colunas:
+            self.colunas.remove(coluna)
+        self.descartar(coluna)
+
+
+    # Devolve o índice de hash da coluna, construindo-o se necessário.
+    # 'chaves' é o cache das colunas normalizadas da sessão.
+    def hash(self, df, coluna, chaves):
+
+        indice = self._hash.get(coluna)
+        if indice is None:
+            indice = self._hash[coluna] = IndiceHash(chaves.obter(df, coluna))
+        return indice
+
+
+    # Devolve o índice ordenado da coluna, construindo-o se necessário, ou
+            # None se a coluna não é numérica nem de datas.
+    def ordenado(self, df, coluna):
+
+        if coluna not in self._ordenados:
+            self._ordenados[coluna] = IndiceOrdenado(df[coluna]) if aceita_indice_ordenado(df[coluna]) else None
+        return self._ordenados[coluna]
+
+
+    # Descarta os índices construídos de uma coluna cujos valores mudaram.
+            # A coluna continua marcada e o índice é reconstruído no próximo filtro.
+    def descartar(self, coluna):
+
+        self._hash.pop(coluna, None)
+        self._ordenados.pop(coluna, None)
+
+
+    # Descarta todos os índices construídos (por exemplo, quando as linhas
+            # foram reordenadas ou recortadas). As marcações continuam.
+    def descartar_todos(self):
+
+        self._hash.clear()
+        self._ordenados.clear()
+
+
+    # Uma coluna removida deixa de ser indexada.
+    def remover(self, coluna):
+        self.desmarcar(coluna)
+
+
+    # Uma coluna renomeada continua indexada com o novo nome, sem
+            # reconstruir os índices.
+    def renomear(self, antigo, novo):
+
+        self.desmarcar(novo)
+        if antigo in self.colunas:
+            self.colunas[self.colunas.index(antigo)] = novo
+        for indices in (self._hash, self._ordenados):
+            if antigo in indices:
+                indices[novo] = indices.pop(antigo)
@@ -0,0 +1,284 @@
+# Importa o módulo json, usado para gravar o registro das medições.
+import json
+
+# Importa o módulo os para manipular caminhos e arquivos.
+import os
+
+# Importa o módulo threading, usado para proteger o registro e a medição de
+        # memória quando várias tarefas executam ao mesmo tempo.
+import threading
+
+# Importa o módulo time, usado para medir os tempos.
+import time
+
+# Importa o módulo tracemalloc, que acompanha a memória alocada pelo Python
+        # e pelo numpy (e, portanto, pelo pandas), usado quando o sistema não
+        # informa o pico da memória do processo.
+import tracemalloc
+
+# Importa o 'contextmanager' para escrever as fases como blocos 'with'.
+from contextlib import contextmanager
+
+# Importa o 'datetime' para registrar quando cada comando foi executado.
+from datetime import datetime
+
+
+# Este módulo mede cada fase de um comando: a interpretação do texto, a
+        # execução no pandas e a exibição na grade. Para cada fase guarda
+        # o tempo e o pico de memória alocada; para o comando, as linhas
+        # antes e depois.
+# As medições aparecem ao lado do "Comando:" no resultado e são gravadas,
+        # uma por linha, em um registro JSON para análise posterior.
+
+
+# Caminho padrão do registro das medições. Pode ser alterado pela variável
+        # de ambiente 'LIST_COMMAND_LOG'.
+REGISTRO_PADRAO = os.environ.get("LIST_COMMAND_LOG",
+                                 os.path.join(os.path.expanduser("~"), ".cache", "list_command", "comandos.jsonl"))
+
+# Tamanho máximo do registro em bytes. Quando é ultrapassado, o registro
+        # atual passa a se chamar "<registro>.1" e um novo é começado.
+LIMITE_REGISTRO = 10 * 1024 * 1024
+
+
+# Arquivos do Linux com a memória residente do processo ('VmRSS') e o seu
+        # pico ('VmHWM'). Escrever "5" em 'clear_refs' zera o pico, o que
+        # permite medir o pico de cada fase sem custo nenhum durante a fase.
+_STATUS = "/proc/self/status"
+_CLEAR_REFS = "/proc/self/clear_refs"
+
+
+# Verifica se o pico da memória residente pode ser zerado (Linux).
+def _pico_residente_disponivel():
+
+    try:
+        with open(_CLEAR_REFS, "w") as arquivo:
+            arquivo.write("5")
+        return True
+    except OSError:
+        return False
+
+
+# Devolve a memória residente atual e o pico, em bytes.
+def _memoria_residente():
+
+    valores = {}
+    with open(_STATUS) as arquivo:
+        for linha in arquivo:
+            if linha.startswith(("VmRSS:", "VmHWM:")):
+                nome, valor = linha.split(":")
+                valores[nome] = int(valor.split()[0]) * 1024
+    return valores["VmRSS"], valores["VmHWM"]
+
+
+# Indica como o pico de memória é medido: pelo pico da memória residente
+        # (Linux) ou pelo tracemalloc (demais sistemas). O tracemalloc
+        # acompanha cada alocação e deixa comandos que criam muitos objetos
+        # (como os filtros em colunas de texto) várias vezes mais lentos,
+        # então só é usado quando não há alternativa.
+PICO_RESIDENTE = _pico_residente_disponivel()
+
+# Quantidade de fases medindo memória ao mesmo tempo. O pico é zerado (e o
+        # tracemalloc, ligado) apenas pela primeira fase, para não apagar
+        # o pico das outras; com várias tarefas ao mesmo tempo, o pico de
+        # uma fase inclui as alocações das demais.
+_fases_memoria = 0
+_trava_memoria = threading.Lock()
+
+
+# Começa a medição de memória e devolve a memória atual, que serve de base
+        # para o pico da fase.
+def _iniciar_memoria():
+
+    global _fases_memoria
+
+    with _trava_memoria:
+
+        primeira = _fases_memoria == 0
+        _fases_memoria += 1
+
+        if PICO_RESIDENTE:
+            if primeira:
+                with open(_CLEAR_REFS, "w") as arquivo:
+                    arquivo.write("5")
+            return _memoria_residente()[0]
+
+        if primeira and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        return tracemalloc.get_traced_memory()[0]
+
+
+# Devolve o pico de memória desde o início da fase, acima da base, e
+        # desliga o tracemalloc se nenhuma outra fase o usa.
+def _terminar_memoria(base):
+
+    global _fases_memoria
+
+    with _trava_memoria:
+
+        _fases_memoria -= 1
+
+        if PICO_RESIDENTE:
+            return max(0, _memoria_residente()[1] - base)
+
+        pico = tracemalloc.get_traced_memory()[1] - base
+        if _fases_memoria == 0:
+            tracemalloc.stop()
+        return max(0, pico)
+
+
+# Medição de uma fase de um comando.
+class Fase:
+
+    def __init__(self, nome, segundos, memoria):
+
+        self.nome = nome
+        self.segundos = segundos
+
+        # Pico de memória alocada durante a fase, em bytes (None se a
+                # memória não foi medida).
+        self.memoria = memoria
+
+
+# Medições de um comando.
+class Medicao:
+
+    def __init__(self, comando, medir_memoria=True):
+
+        self.comando = comando
+        self.medir_memoria = medir_memoria
+        self.data = datetime.now().isoformat(timespec="seconds")
+
+        # Tipo do comando interpretado (por exemplo, "Filtrar").
+        self.tipo = None
+
+        # Linhas do DataFrame antes do comando e linhas exibidas depois.
+        self.linhas_entrada = None
+        self.linhas_saida = None
+
+        # Fases concluídas, na ordem em que foram executadas.
+        self.fases = []
+
+        # Mensagem de erro, se o comando falhou.
+        self.erro = None
+
+        # Fase em andamento: (nome, início, base da memória).
+        self._atual = None
+
+
+    # Começa a medir uma fase.
+    def iniciar(self, nome):
+
+        base = _iniciar_memoria() if self.medir_memoria else None
+        self._atual = (nome, time.perf_counter(), base)
+
+
+    # Termina a fase em andamento e guarda a sua medição.
+    def terminar(self):
+
+        if self._atual is None:
+            return
+
+        nome, inicio, base = self._atual
+        segundos = time.perf_counter() - inicio
+        memoria = None if base is None else _terminar_memoria(base)
+        self.fases.append(Fase(nome, segundos, memoria))
+        self._atual = None
+
+
+    # Mede o bloco 'with' como uma fase. A fase é guardada mesmo que o
+            # bloco lance uma exceção.
+    @contextmanager
+    def fase(self, nome):
+
+        self.iniciar(nome)
+        try:
+            yield self
+        finally:
+            self.terminar()
+
+
+    # Tempo total das fases, em segundos.
+    @property
+    def total(self):
+        return sum(fase.segundos for fase in self.fases)
+
+
+    # Resumo curto das medições, para mostrar ao lado do comando.
+    def resumo(self):
+
+        partes = [f"{fase.nome} {_tempo(fase.segundos)}" for fase in self.fases]
+
+        if self.linhas_entrada is not None and self.linhas_saida is not None:
+            partes.append(f"{self.linhas_entrada} → {self.linhas_saida} linhas")
+
+        picos = [fase.memoria for fase in self.fases if fase.memoria is not None]
+        if picos:
+            partes.append(f"pico +{max(picos) / (1024 * 1024):.1f} MB")
+
+        return " · ".join(partes)
+
+
+    # Medições como dicionário, para o registro JSON.
+    def como_dicionario(self):
+
+        return {
+            "data": self.data,
+            "comando": self.comando,
+            "tipo": self.tipo,
+            "linhas_entrada": self.linhas_entrada,
+            "linhas_saida": self.linhas_saida,
+            "total_segundos": self.total,
+            "fases": [{"nome": fase.nome, "segundos": fase.segundos, "memoria_pico": fase.memoria} for fase in self.fases],
+            "erro": self.erro,
+        }
+
+
+# Contexto de uma fase que aceita 'medicao=None', para que o código
+        # medido não precise verificar se há medição.
+@contextmanager
+def fase(medicao, nome):
+
+    if medicao is None:
+        yield None
+    else:
+        with medicao.fase(nome):
+            yield medicao
+
+
+# Formata um tempo em segundos como milissegundos ou segundos.
+def _tempo(segundos):
+
+    if segundos < 1:
+        return f"{segundos * 1000:.1f} ms"
+    return f"{segundos:.2f} s"
+
+
+# Registro das medições em um arquivo JSON Lines: uma medição por linha,
+        # fácil de ler com 'pd.read_json(caminho, lines=True)'.
+class RegistroMedicoes:
+
+    def __init__(self, caminho=REGISTRO_PADRAO, limite_bytes=LIMITE_REGISTRO):
+
+        self.caminho = caminho
+        self.limite_bytes = limite_bytes
+        self._trava = threading.Lock()
+
+
+    # Acrescenta uma medição ao registro. Erros de gravação (disco cheio,
+            # sem permissão) são ignorados: o registro não deve impedir o
+            # comando de ser exibido.
+    def gravar(self, medicao):
+
+        linha = json.dumps(medicao.como_dicionario(), ensure_ascii=False)
+
+        with self._trava:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.caminho)), exist_ok=True)
+                if os.path.exists(self.caminho) and os.path.getsize(self.caminho) > self.limite_bytes:
+                    os.replace(self.caminho, f"{self.caminho}.1")
+                with open(self.caminho, "a", encoding="utf-8") as arquivo:
+                    arquivo.write(linha + "\n")
+            except OSError:
+                pass
@@ -0,0 +1,149 @@
+# Importa o módulo numpy e o renomeia para np, usado nas operações
+        # vetorizadas sobre as posições das linhas.
+import numpy as np
+
+# Importa o módulo pandas e o renomeia para pd, usado
+        # para manipulação de dados.
+import pandas as pd
+
+# Importa a normalização usada pelos filtros, para que as chaves de texto
+        # sejam comparadas da mesma forma ("São Paulo" = " são paulo").
+from chaves import normalizar_coluna
+
+
+# Este módulo junta o DataFrame atual com outra tabela pelo valor de uma
+        # coluna-chave (por exemplo, as vendas com o cadastro de produtos).
+# A junção é feita por hash: a tabela menor é transformada em uma tabela de
+        # hash (valor da chave -> posições das linhas) e cada linha da tabela
+        # maior procura a sua chave nela. Tudo é vetorizado com numpy, sem
+        # laços em Python sobre as linhas.
+# Todas as linhas do DataFrame atual são mantidas, na mesma ordem; as
+        # linhas sem correspondência ficam com as colunas da outra tabela
+        # vazias.
+
+
+# Tamanho estimado do resultado (em bytes) acima do qual a junção só é
+        # executada depois de confirmada pelo usuário.
+LIMITE_CONFIRMACAO = 256 * 1024 * 1024
+
+
+# Prepara as chaves dos dois lados para a comparação.
+# Se as duas colunas são numéricas (ou as duas são de datas), os valores são
+        # comparados diretamente; caso contrário, as duas são comparadas como
+        # texto normalizado. Valores nulos nunca correspondem a nada.
+def _chaves(esquerda, direita):
+
+    numericas = all(pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s) for s in (esquerda, direita))
+    datas = all(pd.api.types.is_datetime64_any_dtype(s) for s in (esquerda, direita))
+
+    if numericas or datas:
+        return esquerda.to_numpy(), direita.to_numpy()
+    return normalizar_coluna(esquerda).to_numpy(), normalizar_coluna(direita).to_numpy()
+
+
+# Calcula os pares (linha da tabela de construção, linha da tabela de busca)
+        # com a mesma chave. 'nulos_*' marcam as linhas sem chave.
+def _pares(construcao, nulos_construcao, busca, nulos_busca):
+
+    # Tabela de hash da tabela de construção: 'factorize' troca cada chave
+            # por um código, e a ordenação estável dos códigos junta as
+            # posições das linhas de cada chave, como no índice de hash dos
+            # filtros (ver 'indices.py').
+    codigos, valores = pd.factorize(construcao)
+    codigos[nulos_construcao] = -1
+    validas = np.flatnonzero(codigos >= 0)
+    ordem = validas[np.argsort(codigos[validas], kind="stable")]
+    quantidades = np.bincount(codigos[validas], minlength=len(valores))
+    inicios = np.cumsum(quantidades) - quantidades
+
+    # Busca: 'get_indexer' procura todas as chaves da outra tabela na
+            # tabela de hash de uma vez (-1 para as que não existem).
+    encontrados = pd.Index(valores).get_indexer(busca)
+    encontrados[nulos_busca] = -1
+    linhas_busca = np.flatnonzero(encontrados >= 0)
+    codigos_busca = encontrados[linhas_busca]
+    repeticoes = quantidades[codigos_busca]
+
+    # Cada linha da busca se repete uma vez para cada linha da construção
+            # com a mesma chave; o deslocamento percorre as posições da chave.
+    total = int(repeticoes.sum())
+    deslocamento = np.arange(total) - np.repeat(np.cumsum(repeticoes) - repeticoes, repeticoes)
+    pares_busca = np.repeat(linhas_busca, repeticoes)
+    pares_construcao = ordem[np.repeat(inicios[codigos_busca], repeticoes) + deslocamento]
+
+    return pares_construcao, pares_busca
+
+
+# Junção planejada entre 'esquerda' (o DataFrame atual) e 'direita' (a outra
+        # tabela). As correspondências são calculadas na criação, o que
+        # permite estimar o tamanho do resultado antes de montá-lo.
+class Juncao:
+
+    def __init__(self, esquerda, direita, coluna_esquerda, coluna_direita, nome_direita):
+
+        self.esquerda = esquerda
+        self.nome_direita = nome_direita
+
+        # Colunas trazidas da outra tabela: todas menos a chave. Nomes que
+                # já existem no DataFrame atual recebem o nome da tabela.
+        colunas = [c for c in direita.columns if c != coluna_direita]
+        self.direita = direita[colunas].reset_index(drop=True)
+        self.direita.columns = [f"{c} ({nome_direita})" if c in esquerda.columns else c for c in colunas]
+
+        chaves_esquerda, chaves_direita = _chaves(esquerda[coluna_esquerda], direita[coluna_direita])
+        nulos_esquerda = esquerda[coluna_esquerda].isna().to_numpy()
+        nulos_direita = direita[coluna_direita].isna().to_numpy()
+
+        # A tabela de hash é construída sobre a tabela menor.
+        if len(direita) <= len(esquerda):
+            linhas_direita, linhas_esquerda = _pares(chaves_direita, nulos_direita, chaves_esquerda, nulos_esquerda)
+        else:
+            linhas_esquerda, linhas_direita = _pares(chaves_esquerda, nulos_esquerda, chaves_direita, nulos_direita)
+
+        # Linhas do DataFrame atual sem correspondência entram uma vez, com
+                # a posição -1 na outra tabela.
+        sem_par = np.ones(len(esquerda), dtype=bool)
+        sem_par[linhas_esquerda] = False
+        sem_par = np.flatnonzero(sem_par)
+        linhas_esquerda = np.concatenate((linhas_esquerda, sem_par))
+        linhas_direita = np.concatenate((linhas_direita, np.full(len(sem_par), -1)))
+
+        # Mantém a ordem do DataFrame atual e, entre as linhas com a mesma
+                # chave, a ordem da outra tabela: os pares já saem em ordem
+                # crescente das linhas da outra tabela dentro de cada linha
+                # do DataFrame atual, e a ordenação estável a preserva.
+        ordem = np.argsort(linhas_esquerda, kind="stable")
+        self.linhas_esquerda = linhas_esquerda[ordem]
+        self.linhas_direita = linhas_direita[ordem]
+
+        self.correspondidas = len(esquerda) - len(sem_par)
+
+
+    # Quantidade de linhas do resultado.
+    @property
+    def linhas(self):
+        return len(self.linhas_esquerda)
+
+
+    # Estimativa da memória ocupada pelo resultado, em bytes.
+    # 'deep=False' conta os textos como referências: as linhas repetidas
+            # apontam para os mesmos textos das tabelas originais, sem copiá-los.
+    def estimar_bytes(self):
+
+        por_linha = 0
+        for tabela in (self.esquerda, self.direita):
+            if len(tabela):
+                por_linha += tabela.memory_usage(index=False, deep=False).sum() / len(tabela)
+        return int(por_linha * self.linhas)
+
+
+    # Monta o DataFrame resultante.
+    def executar(self):
+
+        esquerda = self.esquerda.iloc[self.linhas_esquerda].reset_index(drop=True)
+
+        # 'reindex' com a posição -1 (inexistente) deixa as colunas vazias
+                # nas linhas sem correspondência.
+        direita = self.direita.reindex(self.linhas_direita).reset_index(drop=True)
+
+        return pd.concat([esquerda, direita], axis=1)
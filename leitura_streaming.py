@@ -0,0 +1,138 @@
+# Importa o módulo pandas e o renomeia para pd, usado
+        # para manipulação de dados.
+import pandas as pd
+
+# Importa o openpyxl, que permite ler o xlsx linha a linha no modo
+        # somente leitura, sem montar a planilha inteira na memória.
+from openpyxl import load_workbook
+
+
+# Quantidade de linhas do primeiro bloco. É pequeno de propósito, para que
+        # a primeira tela da Treeview apareça quase imediatamente.
+PRIMEIRO_BLOCO = 500
+
+# Tamanho máximo dos blocos seguintes. Os blocos dobram de tamanho até
+        # esse limite, o que mantém baixo o número de concatenações.
+MAIOR_BLOCO = 200_000
+
+
+# Função que monta os nomes das colunas a partir da primeira linha da
+        # planilha, seguindo a mesma regra do 'pd.read_excel' para
+        # cabeçalhos vazios ("Unnamed: 0", "Unnamed: 1", ...).
+def nomes_colunas(cabecalho):
+
+    nomes = []
+    for i, valor in enumerate(cabecalho):
+        nomes.append(f"Unnamed: {i}" if valor is None else str(valor))
+    return nomes
+
+
+# Gerador que lê a planilha em blocos e devolve, a cada bloco, um
+        # DataFrame com as linhas novas e a fração lida do arquivo
+        # (ou None, quando a planilha não informa o número de linhas).
+def ler_em_blocos(caminho, planilha=0, primeiro_bloco=PRIMEIRO_BLOCO, maior_bloco=MAIOR_BLOCO):
+
+    # 'read_only=True' faz o openpyxl ler o XML sob demanda, e
+            # 'data_only=True' devolve o valor calculado das fórmulas.
+    livro = load_workbook(caminho, read_only=True, data_only=True)
+
+    try:
+
+        # Seleciona a planilha pelo índice ou pelo nome.
+        folha = livro.worksheets[planilha] if isinstance(planilha, int) else livro[planilha]
+
+        # 'max_row' vem da dimensão gravada no arquivo e pode não existir.
+        total = folha.max_row
+        linhas = folha.iter_rows(values_only=True)
+
+        # A primeira linha é o cabeçalho. Uma planilha vazia gera
+                # um único DataFrame vazio.
+        cabecalho = next(linhas, None)
+        if cabecalho is None:
+            yield pd.DataFrame(), 1.0
+            return
+
+        colunas = nomes_colunas(cabecalho)
+        lidas = 1
+        tamanho = primeiro_bloco
+        bloco = []
+
+        for linha in linhas:
+
+            bloco.append(linha)
+
+            if len(bloco) >= tamanho:
+                lidas += len(bloco)
+                yield pd.DataFrame(bloco, columns=colunas), (lidas / total if total else None)
+                bloco = []
+                tamanho = min(tamanho * 2, maior_bloco)
+
+        # Devolve o último bloco, mesmo que vazio, para que quem lê saiba
+                # que a leitura terminou com a fração 1.
+        yield pd.DataFrame(bloco, columns=colunas), 1.0
+
+    finally:
+
+        # No modo somente leitura o arquivo fica aberto até 'close()'.
+        livro.close()
+
+
+# Função que ajusta os tipos das colunas do DataFrame montado a partir dos
+        # blocos para os que o 'read_excel' daria à planilha inteira.
+# Cada bloco tem os tipos adivinhados só pelas suas linhas: um bloco sem
+        # valores em uma coluna numérica fica com a coluna 'object', e a
+        # concatenação também. Aqui os tipos são inferidos uma vez sobre a
+        # coluna completa e, como no 'read_excel', colunas de texto em que
+        # todos os valores são números (ou booleanos com nulos) viram
+        # colunas numéricas.
+def ajustar_tipos(df):
+
+    df = df.infer_objects()
+    for coluna in df.columns:
+        serie = df[coluna]
+        if serie.dtype == object or isinstance(serie.dtype, pd.StringDtype):
+            try:
+                df[coluna] = pd.to_numeric(serie)
+            except (ValueError, TypeError):
+                pass
+    return df
+
+
+# Função que junta os blocos lidos em um único DataFrame, com os tipos da
+        # planilha inteira. 'ignore_index=True' numera as linhas de 0 a n-1,
+        # como o 'read_excel'.
+def juntar_blocos(blocos):
+    return ajustar_tipos(pd.concat(blocos, ignore_index=True) if len(blocos) > 1 else blocos[0])
+
+
+# Gerador que devolve o DataFrame acumulado após cada bloco lido.
+# A concatenação é feita aqui, na thread de trabalho, para que a interface
+        # apenas troque a referência do DataFrame exibido.
+# Os blocos ficam em uma lista e só são concatenados quando as linhas
+        # lidas dobram desde a última concatenação: nos blocos do meio, a
+        # interface continua mostrando o acumulado anterior (o progresso é
+        # atualizado). Assim as cópias somam no máximo o dobro das linhas
+        # da planilha, em vez de copiar tudo o que já foi lido a cada bloco.
+        # O último DataFrame é montado uma única vez, com todos os blocos.
+def ler_acumulado(caminho, planilha=0, **opcoes):
+
+    blocos = []
+    lidas = exibidas = juntados = 0
+    acumulado = None
+
+    for bloco, fracao in ler_em_blocos(caminho, planilha, **opcoes):
+
+        # Blocos vazios (o último, quando o total é múltiplo do tamanho
+                # do bloco) não mudam o DataFrame acumulado.
+        if not blocos or not bloco.empty:
+            blocos.append(bloco)
+            lidas += len(bloco)
+
+        # O último bloco sempre tem a fração 1; os blocos que ainda não
+                # entraram no acumulado são juntados.
+        final = fracao == 1.0 and juntados < len(blocos)
+        if final or acumulado is None or lidas >= 2 * exibidas:
+            acumulado = juntar_blocos(blocos)
+            exibidas, juntados = lidas, len(blocos)
+
+        yield acumulado, fracao
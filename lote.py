@@ -0,0 +1,209 @@
+# Importa o módulo argparse, usado para ler os argumentos da linha de comando.
+import argparse
+
+# Importa o módulo os para manipular caminhos e diretórios.
+import os
+
+# Importa o módulo sys para escrever mensagens de erro e definir o
+        # código de saída do programa.
+import sys
+
+# Importa o ProcessPoolExecutor, que processa vários arquivos em paralelo,
+        # cada um em um processo separado.
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Importa o módulo pandas e o renomeia para pd, usado
+        # para manipulação de dados.
+import pandas as pd
+
+# Importa o cache das planilhas, para não interpretar novamente o xlsx
+        # de arquivos que já foram processados antes.
+from cache_planilhas import CachePlanilhas
+
+# Importa a compactação das colunas, aplicada à planilha logo após a leitura.
+from compactacao import compactar
+
+# Importa a sessão de comandos. Ela não depende do Tkinter, então os
+        # comandos rodam sem criar a janela principal.
+from motor import ConfirmacaoNecessaria, ErroComando, Sessao
+
+# Importa a gravação em blocos de arquivos xlsx com várias planilhas.
+from exportacao import gravar_xlsx
+
+# Importa a medição das fases dos comandos e o registro das medições.
+from instrumentacao import Medicao, RegistroMedicoes
+
+
+# Modo de lote: executa um script de comandos sobre várias planilhas, sem
+        # interface gráfica.
+# Exemplo:
+#     python lote.py comandos.txt vendas_jan.xlsx vendas_fev.xlsx --saida resultados
+# O script tem um comando por linha, escrito como na caixa de comandos da
+        # janela principal. Linhas vazias e linhas começando com '#' são ignoradas.
+
+
+# Tamanho máximo do nome de uma planilha no Excel.
+MAXIMO_NOME_PLANILHA = 31
+
+
+# Função que lê o script de comandos e devolve a lista de comandos.
+def ler_script(caminho):
+
+    with open(caminho, encoding="utf-8") as arquivo:
+        linhas = [linha.strip() for linha in arquivo]
+
+    # Os comandos são convertidos para minúsculas, como na janela principal.
+    return [linha.lower() for linha in linhas if linha and not linha.startswith("#")]
+
+
+# Função que monta o nome da planilha de saída de um comando, usando o
+        # número do comando e o início do seu texto.
+def nome_planilha(numero, comando):
+
+    # O Excel não aceita alguns caracteres em nomes de planilhas.
+    texto = "".join(" " if c in "[]:*?/\\" else c for c in comando)
+    return f"{numero:02d} {texto}"[:MAXIMO_NOME_PLANILHA]
+
+
+# Função que processa um arquivo: lê a planilha, executa os comandos em
+        # ordem e grava os resultados em um novo arquivo Excel.
+# Executada em um processo separado, devolve um resumo do processamento.
+def processar_arquivo(caminho, comandos, diretorio_saida, apenas_final=False, parar_no_erro=False, usar_cache=True, lazy=False, tabelas=(), log=None):
+
+    resumo = {"arquivo": caminho, "saida": None, "erros": []}
+
+    # Lê a planilha, usando o cache quando habilitado.
+    # A planilha é compactada (colunas categóricas e inteiros menores) antes
+            # de ir para o cache, como na janela principal.
+    def preparar(df):
+        return compactar(df)[0]
+
+    df = CachePlanilhas().ler(caminho, preparar=preparar) if usar_cache else preparar(pd.read_excel(caminho))
+    sessao = Sessao(df)
+
+    # Registra no catálogo as planilhas do arquivo e as tabelas auxiliares
+            # ('--tabelas'), para os comandos "usar a tabela" e "juntar". Elas
+            # só são lidas se algum comando as usar.
+    for registrar in (caminho, *tabelas):
+        sessao.catalogo.registrar(registrar)
+    sessao.catalogo.guardar(caminho, 0, df)
+
+    # No modo lazy, os comandos que podem ser adiados são juntados em um
+            # plano otimizado, executado antes do primeiro comando que precisa
+            # das linhas ou no fim do script.
+    if lazy:
+        sessao.executar("ativar modo lazy")
+
+    # Resultados exibidos por cada comando, na ordem de execução.
+    resultados = []
+
+    # Registro das medições dos comandos ('--log'), como na janela principal.
+    registro = RegistroMedicoes(log) if log else None
+
+    for numero, comando in enumerate(comandos, start=1):
+
+        medicao = Medicao(comando) if registro else None
+
+        try:
+            resultado = sessao.executar(comando, medicao)
+
+        # Erros previstos (coluna inexistente, filtro sem resultados, ...) são
+                # registrados e, por padrão, os próximos comandos continuam.
+        # Comandos que pediriam confirmação na janela principal não são
+                # executados: o script precisa pedir "... mesmo assim".
+        except ErroComando as e:
+            mensagem = e.mensagem
+            if isinstance(e, ConfirmacaoNecessaria):
+                mensagem += f" Para executar, use '{e.confirmacao}'."
+            resumo["erros"].append(f"comando {numero} ({comando}): {mensagem}")
+            if registro:
+                medicao.erro = mensagem
+                registro.gravar(medicao)
+            if parar_no_erro:
+                break
+            continue
+
+        resultados.append((nome_planilha(numero, comando), resultado.exibir))
+        if registro:
+            registro.gravar(medicao)
+
+    # Grava os resultados em "<nome do arquivo>_resultado.xlsx": uma planilha
+            # por comando e uma planilha "Final" com o DataFrame atual.
+    nome = os.path.splitext(os.path.basename(caminho))[0]
+    saida = os.path.join(diretorio_saida, f"{nome}_resultado.xlsx")
+
+    # Executa os comandos adiados que ainda estiverem no plano.
+    df = sessao.materializar()
+
+    # A gravação em modo contínuo ('gravar_xlsx') não monta a planilha
+            # inteira na memória antes de salvar.
+    planilhas = [] if apenas_final else list(resultados)
+    gravar_xlsx(planilhas + [("Final", df)], saida)
+
+    resumo["saida"] = saida
+    return resumo
+
+
+# Função que lê os argumentos da linha de comando.
+def ler_argumentos(argumentos=None):
+
+    parser = argparse.ArgumentParser(description="Executa um script de comandos sobre planilhas Excel, sem interface gráfica.")
+    parser.add_argument("script", help="arquivo de texto com um comando por linha")
+    parser.add_argument("planilhas", nargs="+", help="arquivos Excel (.xlsx) a processar")
+    parser.add_argument("--saida", default=".", help="diretório onde os resultados são gravados (padrão: diretório atual)")
+    parser.add_argument("--processos", type=int, default=os.cpu_count(), help="quantidade de arquivos processados em paralelo (padrão: número de CPUs)")
+    parser.add_argument("--apenas-final", action="store_true", help="grava apenas o DataFrame final, sem uma planilha por comando")
+    parser.add_argument("--parar-no-erro", action="store_true", help="interrompe o script de um arquivo no primeiro comando com erro")
+    parser.add_argument("--sem-cache", action="store_true", help="não usa o cache de planilhas já lidas")
+    parser.add_argument("--lazy", action="store_true", help="junta os comandos em um plano otimizado antes de executá-los")
+    parser.add_argument("--log", help="arquivo JSON Lines onde as medições de cada comando (tempo, linhas e memória) são gravadas")
+    parser.add_argument("--tabelas", nargs="+", default=[], help="arquivos Excel auxiliares (cadastros) disponíveis para 'usar a tabela' e 'juntar'")
+    return parser.parse_args(argumentos)
+
+
+# Função principal do modo de lote. Devolve o código de saída do programa:
+        # 0 se todos os comandos de todos os arquivos foram executados,
+        # 1 se houve algum erro.
+def main(argumentos=None):
+
+    args = ler_argumentos(argumentos)
+    comandos = ler_script(args.script)
+    os.makedirs(args.saida, exist_ok=True)
+
+    houve_erro = False
+
+    # Cada arquivo é processado em um processo separado. Os processos não
+            # compartilham o DataFrame: cada um lê e grava o seu arquivo.
+    with ProcessPoolExecutor(max_workers=max(1, args.processos)) as executor:
+
+        futuros = {executor.submit(processar_arquivo, caminho, comandos, args.saida,
+                                   args.apenas_final, args.parar_no_erro, not args.sem_cache,
+                                   args.lazy, args.tabelas, args.log): caminho
+                   for caminho in args.planilhas}
+
+        # Mostra o resultado de cada arquivo assim que ele termina.
+        for futuro in as_completed(futuros):
+
+            caminho = futuros[futuro]
+
+            try:
+                resumo = futuro.result()
+
+            # Erros inesperados (arquivo inexistente, corrompido, ...) não
+                    # interrompem o processamento dos outros arquivos.
+            except Exception as e:
+                houve_erro = True
+                print(f"{caminho}: erro ao processar o arquivo: {e}", file=sys.stderr)
+                continue
+
+            for erro in resumo["erros"]:
+                houve_erro = True
+                print(f"{caminho}: {erro}", file=sys.stderr)
+
+            print(f"{caminho} -> {resumo['saida']}")
+
+    return 1 if houve_erro else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,89 +5,431 @@ import tkinter as tk
 # Importa as submódulos filedialog, messagebox e ttk do tkinter.
 from tkinter import filedialog, messagebox, ttk
 
-# Importa o módulo pandas e o renomeia para pd, usado 
-        # para manipulação de dados.
-import pandas as pd
+# Importa a sessão de comandos, que faz o trabalho pesado do pandas
+        # sem depender do Tkinter e guarda o DataFrame atual.
+from motor import ConfirmacaoNecessaria, ErroComando, Sessao
 
-# Importa o módulo re para uso de expressões regulares.
-import re
+# Importa o gerenciador de tarefas, que executa o trabalho pesado em
+        # threads de trabalho para que a janela nunca trave.
+from tarefas import GerenciadorTarefas
 
+# Importa o cache em disco das planilhas já lidas, que evita interpretar 
+        # novamente o xlsx quando o mesmo arquivo é aberto outra vez.
+from cache_planilhas import CachePlanilhas
 
-# Função para exportar o DataFrame atual para Excel
+# Importa a leitura progressiva do xlsx, que entrega a planilha em blocos 
+        # para que os primeiros dados apareçam antes do fim da leitura.
+from leitura_streaming import ler_acumulado, ler_em_blocos
+
+# Importa a grade virtual, que exibe DataFrames grandes na Treeview
+        # sem inserir todas as linhas de uma vez.
+from grade_virtual import GradeVirtual
+
+# Importa a compactação das colunas, que reduz a memória ocupada pela 
+        # planilha carregada (colunas categóricas e inteiros menores).
+from compactacao import compactar, descrever_economia
+
+# Importa a exportação em blocos para xlsx, CSV e Parquet.
+from exportacao import exportar, formatos_disponiveis
+
+# Importa a medição das fases dos comandos e o registro das medições.
+from instrumentacao import Medicao, RegistroMedicoes
+
+# Importa o histórico de resultados, que mantém abertos apenas os 
+        # resultados mais recentes e libera a memória dos antigos.
+from resultados import HistoricoResultados
+
+# Importa o modo de dados em disco, usado para planilhas maiores que a memória.
+from dados_em_disco import TAMANHO_PARTE, DadosEmDisco, gravar_em_disco
+from dados_em_disco import disponivel as disco_disponivel
+
+
+# Função executada em uma thread de trabalho para salvar o DataFrame 
+        # no arquivo escolhido pelo usuário.
+def salvar_excel(tarefa, df, caminho_arquivo):
+
+    # Salva o DataFrame no caminho especificado, no formato indicado pela 
+            # extensão (xlsx, CSV ou Parquet).
+    # A exportação grava o arquivo em blocos de linhas, informando o 
+            # andamento na barra de progresso, e verifica entre os blocos se 
+            # o usuário cancelou a tarefa. Um arquivo cancelado não é criado.
+    exportar(df, caminho_arquivo, progresso=tarefa.progresso, verificar=tarefa.verificar_cancelamento)
+
+
+# Função para exportar o DataFrame atual para Excel, CSV ou Parquet
 def exportar_para_excel(df, comando):
     
     # Abre uma janela para o usuário escolher o local e o nome do 
             # arquivo onde o DataFrame será salvo.
     # 'defaultextension' adiciona automaticamente a extensão ".xlsx" 
             # se o usuário não especificar.
-    # 'filetypes' limita os tipos de arquivo que podem ser salvos para evitar erros.
-    caminho_arquivo = filedialog.asksaveasfilename(defaultextension=".xlsx", filetypes=[("Arquivos Excel", "*.xlsx")])
+    # 'filetypes' limita os tipos de arquivo aos formatos que podem ser 
+            # exportados, para evitar erros. O Parquet só aparece se o 
+            # pacote pyarrow estiver instalado.
+    tipos = [(descricao, f"*{extensao}") for descricao, extensao in formatos_disponiveis()]
+    caminho_arquivo = filedialog.asksaveasfilename(defaultextension=".xlsx", filetypes=tipos)
 
     # Verifica se um caminho foi selecionado (o usuário pode cancelar a operação).
     if caminho_arquivo:
         
-        try:
-            
-            # Tenta salvar o DataFrame no caminho especificado.
-            # 'index=False' não inclui o índice do DataFrame no arquivo Excel.
-            df.to_excel(caminho_arquivo, index=False)
+        # Salva o arquivo em segundo plano. A exportação não altera o 
+                # DataFrame, então não bloqueia os outros comandos.
+        # Se o arquivo for exportado com sucesso, mostra uma mensagem de sucesso;
+                # se ocorrer algum erro, mostra uma mensagem de erro com a descrição.
+        iniciar_tarefa("Exportando o arquivo",
+                       salvar_excel, df, caminho_arquivo,
+                       ao_concluir=lambda tarefa, _: messagebox.showinfo("Sucesso", f"Arquivo exportado com sucesso!\nComando: {comando}"),
+                       ao_falhar=lambda tarefa, e: messagebox.showerror("Erro", f"Erro ao exportar o arquivo: {e}"),
+                       bloquear=())
+
+
+
+# Função executada em uma thread de trabalho para ler o arquivo Excel.
+# Registra no catálogo as planilhas de todos os arquivos escolhidos, sem 
+        # lê-las, e lê apenas a primeira planilha do primeiro arquivo, que 
+        # passa a ser o DataFrame atual.
+def ler_excel(tarefa, caminhos):
+
+    registrar_no_catalogo(tarefa, caminhos)
+
+    # Carrega o DataFrame do arquivo Excel especificado pelo usuário.
+    # O cache devolve o snapshot colunar do arquivo quando ele já foi lido 
+            # antes com o mesmo conteúdo; caso contrário, lê o xlsx e grava 
+            # o snapshot para as próximas vezes.
+    # As mensagens de andamento (leitura do cache, do xlsx ou gravação) 
+            # aparecem na barra de status.
+    # A planilha lida do xlsx é compactada antes de ir para o cache.
+    data_frame = cache.ler(caminhos[0],
+                           progresso=lambda mensagem: tarefa.progresso(None, mensagem),
+                           preparar=lambda data_frame: compactar_planilha(tarefa, data_frame))
+
+    # O catálogo guarda a planilha lida, para que "usar a tabela" não a 
+            # leia de novo.
+    sessao.catalogo.guardar(caminhos[0], 0, data_frame)
+    return data_frame
+
+
+# Função executada na thread de trabalho que registra as planilhas dos 
+        # arquivos no catálogo da sessão e guarda na tarefa quantas foram 
+        # registradas, para a mensagem de sucesso.
+def registrar_no_catalogo(tarefa, caminhos):
+
+    tarefa.progresso(None, "Listando as planilhas...")
+    tarefa.tabelas = sum(len(sessao.catalogo.registrar(caminho)) for caminho in caminhos)
+
+
+# Função executada na thread de trabalho que compacta a planilha lida e 
+        # guarda na tarefa a memória ocupada antes e depois, para a 
+        # mensagem de sucesso.
+def compactar_planilha(tarefa, data_frame):
+
+    tarefa.progresso(None, "Compactando as colunas...")
+    data_frame, antes, depois = compactar(data_frame)
+    tarefa.economia = (antes, depois)
+    return data_frame
+
+
+# Função executada em uma thread de trabalho para ler o arquivo Excel 
+        # de forma progressiva.
+# Em vez de esperar a planilha inteira, entrega à interface o DataFrame 
+        # acumulado a cada bloco lido, para que a primeira tela apareça 
+        # logo e as consultas possam ser usadas sobre os dados parciais.
+def ler_excel_progressivo(tarefa, caminhos):
+
+    registrar_no_catalogo(tarefa, caminhos)
+    caminho_arquivo = caminhos[0]
+
+    # Se o arquivo já está no cache, a leitura é rápida e não precisa 
+            # ser progressiva.
+    tarefa.progresso(None, "Procurando no cache...")
+    data_frame = cache.obter(caminho_arquivo)
+    if data_frame is not None:
+        sessao.catalogo.guardar(caminho_arquivo, 0, data_frame)
+        return data_frame
+
+    # Lê a planilha em blocos, entregando cada DataFrame acumulado à interface.
+    for data_frame, fracao in ler_acumulado(caminho_arquivo):
+        tarefa.verificar_cancelamento()
+        tarefa.parcial(data_frame)
+        tarefa.progresso(fracao, f"Carregando... {len(data_frame)} linhas lidas")
+
+    # Compacta a planilha completa e a guarda no cache para as próximas leituras.
+    data_frame = compactar_planilha(tarefa, data_frame)
+    tarefa.progresso(None, "Gravando no cache...")
+    cache.guardar(caminho_arquivo, 0, data_frame)
+    sessao.catalogo.guardar(caminho_arquivo, 0, data_frame)
+    return data_frame
+
+
+# Função executada em uma thread de trabalho para ler o arquivo Excel no 
+        # modo de dados em disco.
+# A planilha é lida em blocos e cada bloco é gravado em disco assim que é 
+        # lido, de modo que a memória usada não depende do tamanho do 
+        # arquivo. As demais planilhas não entram no catálogo, pois seriam 
+        # lidas inteiras na memória.
+def ler_para_disco(tarefa, caminhos):
+
+    def blocos():
+        lidas = 0
+        for bloco, fracao in ler_em_blocos(caminhos[0], primeiro_bloco=TAMANHO_PARTE, maior_bloco=TAMANHO_PARTE):
+            tarefa.verificar_cancelamento()
+            yield bloco
+            lidas += len(bloco)
+            tarefa.progresso(fracao, f"Gravando em disco... {lidas} linhas lidas")
+
+    return gravar_em_disco(blocos())
+
+
+# Função chamada no mainloop a cada bloco entregue pela leitura progressiva.
+def bloco_carregado(tarefa, parcial):
+
+    tarefa.ultimo_bloco = parcial
+
+    # No primeiro bloco, cria o frame do arquivo carregado com a grade virtual.
+    if not hasattr(tarefa, "resultado"):
+        tarefa.completo = False
+        tarefa.agendada = False
+        tarefa.resultado = atualizar_treeview("Arquivo carregado", parcial)
+
+    # Nos blocos seguintes, o resultado do arquivo carregado passa a mostrar 
+            # as novas linhas (ou, se já foi recolhido, o seu resumo passa 
+            # a contá-las).
+    else:
+        tarefa.resultado.atualizar_fonte(parcial)
+
+    # Se uma troca já está agendada, ela usará este bloco.
+    if not tarefa.agendada:
+        trocar_dados_carregados(tarefa)
+
 
-            # Se o arquivo for exportado com sucesso, mostra uma mensagem de sucesso.
-            messagebox.showinfo("Sucesso", f"Arquivo exportado com sucesso!\nComando: {comando}")
-            
-        except Exception as e:
-            
-            # Se ocorrer algum erro durante a exportação, mostra 
-                    # uma mensagem de erro com a descrição.
-            messagebox.showerror("Erro", f"Erro ao exportar o arquivo: {e}")
+# Função que passa o último bloco lido para a sessão. Enquanto o arquivo 
+        # não termina de carregar, a sessão só aceita consultas, que não 
+        # se perdem quando o DataFrame é trocado pelo bloco seguinte.
+# Se um comando está executando, a troca esperaria o fim dele; em vez de 
+        # parar o mainloop, a troca é tentada de novo logo depois.
+def trocar_dados_carregados(tarefa):
 
+    tarefa.agendada = not sessao.tentar_carregar(tarefa.ultimo_bloco, parcial=not tarefa.completo)
+    if tarefa.agendada:
+        janela_principal.after(100, trocar_dados_carregados, tarefa)
+
+
+# Função chamada no mainloop quando a leitura do arquivo termina.
+def arquivo_carregado(tarefa, novo_df):
+
+    # Na leitura progressiva, o DataFrame completo é tratado como o último 
+            # bloco, e a sessão volta a aceitar todos os comandos.
+    if hasattr(tarefa, "resultado"):
+        tarefa.completo = True
+        bloco_carregado(tarefa, novo_df)
+
+    else:
+
+        sessao.carregar(novo_df)
+        
+        # Atualiza a visualização dos dados na interface gráfica para 
+                # mostrar os dados carregados.
+        atualizar_treeview("Arquivo carregado", novo_df)
+    
+    # Exibe uma mensagem de sucesso informando ao usuário que o 
+            # arquivo foi carregado corretamente e, se a planilha acabou de 
+            # ser compactada, quanta memória foi economizada.
+    mensagem = "Arquivo carregado com sucesso!"
+    if hasattr(tarefa, "economia"):
+        mensagem += "\n" + descrever_economia(*tarefa.economia)
+
+    # No modo de dados em disco, informa os comandos disponíveis.
+    if isinstance(novo_df, DadosEmDisco):
+        mensagem += (f"\n{len(novo_df)} linhas guardadas em disco. Filtros, ordenação, rankings e "
+                     "primeiras/últimas linhas estão disponíveis.")
+
+    # Com mais de uma planilha, informa como usar as demais.
+    if getattr(tarefa, "tabelas", 1) > 1:
+        mensagem += (f"\n{tarefa.tabelas} planilhas registradas. Use 'listar as tabelas' "
+                     "e 'usar a tabela ...' para trabalhar com as demais.")
+    messagebox.showinfo("Sucesso", mensagem)
 
 
 # Define a função que será chamada quando o usuário quiser 
         # carregar um arquivo Excel.
 def carregar_arquivo():
     
-    # Declara 'df' como uma variável global para que a alteração 
-            # feita na variável seja refletida fora da função.
-    global df
-    
-    # Abre uma janela para o usuário selecionar um arquivo, filtrando 
-            # para mostrar apenas arquivos Excel (.xlsx).
-    caminho_arquivo = filedialog.askopenfilename(filetypes=[("Arquivos Excel", "*.xlsx")])
+    # Abre uma janela para o usuário selecionar um ou mais arquivos, 
+            # filtrando para mostrar apenas arquivos Excel (.xlsx).
+    # Todas as planilhas dos arquivos escolhidos entram no catálogo, mas 
+            # só a primeira planilha do primeiro arquivo é lida agora; as 
+            # demais são lidas quando um comando as usar.
+    caminhos = filedialog.askopenfilenames(filetypes=[("Arquivos Excel", "*.xlsx")])
     
-    # Verifica se um caminho de arquivo foi selecionado (ou seja, o 
+    # Verifica se algum arquivo foi selecionado (ou seja, o 
             # usuário não cancelou a operação).
-    if caminho_arquivo:
+    if caminhos:
         
-        try:
-            
-            # Carrega o DataFrame do arquivo Excel especificado pelo usuário.
-            df = pd.read_excel(caminho_arquivo)
-            
-            # Atualiza a visualização dos dados na interface gráfica para 
-                    # mostrar os dados carregados.
-            # 'atualizar_treeview' é uma função definida anteriormente que toma 
-                    # um comando e um DataFrame como parâmetros,
-                    # e atualiza a Treeview correspondente.
-            atualizar_treeview("Arquivo carregado", df)
-            
-            # Exibe uma mensagem de sucesso informando ao usuário que o 
-                    # arquivo foi carregado corretamente.
-            messagebox.showinfo("Sucesso", "Arquivo carregado com sucesso!")
-            
-        except Exception as e:
-            
-            # Caso ocorra um erro durante a leitura do arquivo (por exemplo, 
-                    # arquivo corrompido ou formato inesperado),
-                    # captura a exceção e mostra uma mensagem de erro detalhando o 
-                    # problema encontrado.
-            messagebox.showerror("Erro", f"Erro ao carregar o arquivo: {e}")
+        # Lê o arquivo em segundo plano, para que a janela continue 
+                # respondendo enquanto arquivos grandes são carregados.
+        # Caso ocorra um erro durante a leitura do arquivo (por exemplo, 
+                # arquivo corrompido ou formato inesperado), mostra uma 
+                # mensagem de erro detalhando o problema encontrado.
+        ao_falhar = lambda tarefa, e: messagebox.showerror("Erro", f"Erro ao carregar o arquivo: {e}")
+
+        # No modo de dados em disco, a planilha é gravada em partes no disco 
+                # em vez de ficar na memória.
+        if dados_em_disco.get():
+            if not disco_disponivel():
+                messagebox.showerror("Erro", "O modo de dados em disco requer o pacote pyarrow.")
+                return
+            iniciar_tarefa("Carregando arquivo em disco",
+                           ler_para_disco, list(caminhos),
+                           ao_concluir=arquivo_carregado,
+                           ao_falhar=ao_falhar)
+
+        # No carregamento progressivo, os dados aparecem bloco a bloco e o 
+                # botão "Executar" continua disponível, permitindo executar 
+                # consultas sobre os dados já lidos. Os comandos que alteram 
+                # os dados esperam o fim do carregamento (ver 'Sessao.carregando').
+        elif carregamento_progressivo.get():
+            iniciar_tarefa("Carregando arquivo",
+                           ler_excel_progressivo, list(caminhos),
+                           ao_concluir=arquivo_carregado,
+                           ao_falhar=ao_falhar,
+                           ao_parcial=bloco_carregado,
+                           bloquear=(btn_carregar,))
+
+        else:
+            iniciar_tarefa("Carregando arquivo",
+                           ler_excel, list(caminhos),
+                           ao_concluir=arquivo_carregado,
+                           ao_falhar=ao_falhar)
+
+
+
+# Função que inicia uma tarefa em segundo plano e mostra o seu andamento 
+        # na barra de status.
+# 'bloquear' são os botões desabilitados enquanto a tarefa executa. Por 
+        # padrão, "Executar" e "Carregar" ficam desabilitados, pois a tarefa 
+        # vai substituir o DataFrame atual e os próximos comandos precisam 
+        # do resultado dela.
+def iniciar_tarefa(descricao, funcao, *args, ao_concluir=None, ao_falhar=None, ao_parcial=None, bloquear=None):
+
+    if bloquear is None:
+        bloquear = (btn_comando, btn_carregar)
+
+    # Desabilita os botões bloqueados pela tarefa.
+    for botao in bloquear:
+        botao.config(state="disabled")
+
+    # Mostra a descrição da tarefa, a barra de progresso e o botão de cancelar.
+    label_status.config(text=f"{descricao}...")
+    barra_progresso.config(mode="indeterminate")
+    barra_progresso.start(10)
+    btn_cancelar.pack(side="left", padx=5)
+
+    tarefa = gerenciador.submeter(descricao, funcao, *args,
+                                  ao_concluir=ao_concluir,
+                                  ao_falhar=ao_falhar,
+                                  ao_progresso=atualizar_status,
+                                  ao_parcial=ao_parcial,
+                                  ao_finalizar=tarefa_finalizada)
+    tarefa.bloqueados = bloquear
+    return tarefa
 
 
+# Função chamada no mainloop quando uma tarefa informa o seu progresso.
+def atualizar_status(tarefa, fracao, mensagem):
+
+    # Atualiza o texto da barra de status com a mensagem da tarefa.
+    label_status.config(text=mensagem or f"{tarefa.descricao}...")
+
+    # Sem fração conhecida, a barra fica no modo indeterminado (animação contínua).
+    if fracao is None:
+        if str(barra_progresso.cget("mode")) != "indeterminate":
+            barra_progresso.config(mode="indeterminate")
+            barra_progresso.start(10)
+
+    # Com fração conhecida, a barra mostra a porcentagem concluída.
+    else:
+        barra_progresso.stop()
+        barra_progresso.config(mode="determinate", value=fracao * 100)
+
+
+# Função chamada no mainloop quando uma tarefa termina, falha ou é cancelada.
+def tarefa_finalizada(tarefa):
+
+    # Reabilita os botões bloqueados pela tarefa, a menos que outra tarefa 
+            # em andamento também os bloqueie.
+    for botao in tarefa.bloqueados:
+        if not any(botao in outra.bloqueados for outra in gerenciador.ativas):
+            botao.config(state="normal")
+
+    # Uma leitura progressiva cancelada ou com erro deixa na sessão apenas 
+            # as linhas já lidas. A sessão volta a aceitar todos os comandos 
+            # sobre elas, e o usuário é avisado de que o arquivo está incompleto.
+    if hasattr(tarefa, "ultimo_bloco") and not tarefa.completo:
+        tarefa.completo = True
+        if not tarefa.agendada:
+            trocar_dados_carregados(tarefa)
+        messagebox.showwarning("Atenção", f"O carregamento do arquivo foi interrompido. Apenas as primeiras "
+                                          f"{len(tarefa.ultimo_bloco)} linhas foram carregadas.")
+
+    # Limpa a barra de status quando não há mais nenhuma tarefa em andamento.
+    if not gerenciador.ocupado():
+        barra_progresso.stop()
+        barra_progresso.config(mode="determinate", value=0)
+        label_status.config(text="")
+        btn_cancelar.pack_forget()
+
+
+
+# Função que monta a grade de um resultado e o botão de exportação dentro 
+        # do frame 'conteudo'. É chamada pelo histórico de resultados ao 
+        # mostrar um resultado novo e ao mostrar de novo um resultado recolhido.
+def montar_grade(conteudo, comando, data_frame):
+
+    # Cria uma grade virtual, que mostra os dados do DataFrame em uma Treeview
+            # dentro do frame do conteúdo.
+    # Diferente de inserir cada linha na Treeview, a grade virtual cria apenas
+            # os itens da janela visível e lê as demais linhas do DataFrame
+            # conforme o usuário rola. Assim, mostrar um resultado com milhões
+            # de linhas custa o mesmo que mostrar um com poucas linhas.
+    grade = GradeVirtual(conteudo, data_frame, bg="#f0f0f0")
+    
+    # Empacota a grade com um padding vertical de 5 pixels, 
+            # permitindo que ela se expanda e preencha o espaço 
+            # disponível no eixo X (horizontal).
+    grade.pack(pady=5, fill='x', expand=True)
+
+    # Mostra abaixo da grade quais linhas estão visíveis e o total de linhas.
+    grade.mostrar_posicao(anchor="w", padx=5)
+
+    # Cria um botão dentro do frame do conteúdo. Este botão é usado para 
+            # exportar os dados que estão sendo visualizados na 
+            # interface para um arquivo Excel.
+    btn_exportar = tk.Button(conteudo, 
+                             text="Exportar para Excel",  # Texto exibido no botão.
+                             command=lambda: exportar_para_excel(grade.fonte, comando),  # Função chamada ao clicar no botão (exporta o que a grade mostra).
+                             bg="#4CAF50",  # Cor de fundo do botão (verde).
+                             fg="white",  # Cor do texto do botão (branco).
+                             font=("Arial", 10))  # Fonte e tamanho do texto no botão.
+    
+    # Empacota o botão de exportação dentro do frame do conteúdo. 'pack' é 
+            # um método que organiza widgets em blocos antes de colocá-los na janela.
+    # 'pady=5' adiciona um espaço vertical de 5 pixels acima e abaixo do 
+            # botão, fazendo com que haja um espaço confortável em torno dele.
+    btn_exportar.pack(pady=5)
+
+    # Devolve a grade criada, para que o histórico possa atualizá-la 
+            # (na leitura progressiva) e recolhê-la depois.
+    return grade
+
 
 # Função definida para atualizar a exibição dos dados em uma Treeview 
         # com base no comando recebido e no DataFrame atualizado.
-def atualizar_treeview(comando, data_frame):
+# 'medicao', se informada, recebe o tempo da exibição, e o resumo das 
+        # medições do comando aparece ao lado do "Comando:".
+def atualizar_treeview(comando, data_frame, medicao=None):
+
+    if medicao is not None:
+        medicao.iniciar("exibição")
     
     # Cria um novo frame dentro do frame principal 'frame_chat'. 
             # Um 'frame' é um contêiner que agrupa outros widgets.
@@ -106,78 +448,33 @@ def atualizar_treeview(comando, data_frame):
             # comando que está sendo processado.
     # O rótulo é formatado com fonte Arial tamanho 12 e negrito. 
             # A cor de fundo é a mesma do frame e a cor da fonte é um cinza escuro.
-    label_comando = tk.Label(frame_interacao, 
+    # O rótulo fica em uma linha própria ('frame_titulo'), ao lado do 
+            # rótulo com as medições do comando.
+    frame_titulo = tk.Frame(frame_interacao, bg="#f0f0f0")
+    frame_titulo.pack(anchor="w", fill="x")
+
+    label_comando = tk.Label(frame_titulo, 
                              text=f"Comando: {comando}", 
                              font=("Arial", 12, "bold"), 
                              bg="#f0f0f0", 
                              fg="#333")
     
-    # Empacota o rótulo no frame de interação, ancorando-o à esquerda (anchor="w") e 
+    # Empacota o rótulo na linha do título, alinhado à esquerda e 
             # adicionando um padding horizontal de 5 pixels para melhor alinhamento.
-    label_comando.pack(anchor="w", padx=5)
+    label_comando.pack(side="left", padx=5)
 
-    # Cria uma Treeview, que é um widget para a exibição de dados em 
-            # forma de tabela dentro do frame de interação.
-    # A Treeview será usada para mostrar os dados do DataFrame de 
-            # uma forma estruturada e interativa.
-    tree = ttk.Treeview(frame_interacao)
-    
-    # Empacota a Treeview com um padding vertical de 5 pixels, 
-            # permitindo que ela se expanda e preencha o espaço 
-            # disponível no eixo X (horizontal).
-    # 'expand=True' garante que o widget se ajuste ao tamanho do 
-            # frame quando a janela é redimensionada.
-    tree.pack(pady=5, fill='x', expand=True)
-
-    # Configura as colunas da Treeview para corresponder exatamente às 
-            # colunas do DataFrame. 'list(data_frame.columns)' converte o índice de colunas
-            # do DataFrame em uma lista para que a Treeview possa 
-            # entender e criar as colunas correspondentes.
-    tree["columns"] = list(data_frame.columns)
-    
-    # Define que os cabeçalhos das colunas devem ser mostrados, usando a 
-            # opção 'headings'. Isso significa que apenas os cabeçalhos 
-            # das colunas serão visíveis, e a coluna de índice padrão 
-            # da Treeview (geralmente uma coluna vazia à esquerda) será ocultada. 
-    # Isso deixa a visualização mais limpa e focada nos dados.
-    tree["show"] = "headings"
-
-    # Itera sobre cada coluna no DataFrame para configurar os 
-            # cabeçalhos e a largura das colunas na Treeview.
-    for col in data_frame.columns:
-        
-        # Configura o texto do cabeçalho de cada coluna na Treeview 
-                # para corresponder ao nome da coluna no DataFrame.
-        tree.heading(col, text=col)
-        
-        # Define a largura inicial de cada coluna na Treeview para 100 pixels, 
-                # garantindo que todos os cabeçalhos sejam visíveis e uniformes.
-        tree.column(col, width=100)
-
-    # Itera sobre cada linha no DataFrame para inserir os valores nas 
-            # respectivas colunas da Treeview.
-    for indice, linha in data_frame.iterrows():
-        
-        # Insere uma nova linha na Treeview, adicionando os valores de 
-                # cada coluna. '""' indica que a linha é adicionada no 
-                # final da lista de itens.
-        tree.insert("", "end", values=list(linha))
+    # Rótulo com as medições do comando (tempo de cada fase, linhas e pico 
+            # de memória), preenchido depois que a grade é desenhada.
+    label_medicao = tk.Label(frame_titulo, 
+                             text="", 
+                             font=("Arial", 9), 
+                             bg="#f0f0f0", 
+                             fg="#666")
+    label_medicao.pack(side="left", padx=5)
 
-    # Cria um botão dentro do frame de interação. Este botão é usado para 
-            # exportar os dados que estão sendo visualizados na 
-            # interface para um arquivo Excel.
-    btn_exportar = tk.Button(frame_interacao, 
-                             text="Exportar para Excel",  # Texto exibido no botão.
-                             command=lambda: exportar_para_excel(data_frame, comando),  # Função chamada ao clicar no botão.
-                             bg="#4CAF50",  # Cor de fundo do botão (verde).
-                             fg="white",  # Cor do texto do botão (branco).
-                             font=("Arial", 10))  # Fonte e tamanho do texto no botão.
-    
-    # Empacota o botão de exportação dentro do frame de interação. 'pack' é 
-            # um método que organiza widgets em blocos antes de colocá-los na janela.
-    # 'pady=5' adiciona um espaço vertical de 5 pixels acima e abaixo do 
-            # botão, fazendo com que haja um espaço confortável em torno dele.
-    btn_exportar.pack(pady=5)
+    # Acrescenta o resultado ao histórico, que monta a grade (ver 
+            # 'montar_grade') e recolhe os resultados mais antigos.
+    resultado = resultados_exibidos.adicionar(frame_interacao, comando, data_frame)
 
     # Atualiza as tarefas pendentes no canvas, que é o contêiner onde os 
             # widgets são desenhados. Isso é necessário para recalcular a 
@@ -190,6 +487,12 @@ def atualizar_treeview(comando, data_frame):
             # que engloba todos os itens no canvas, garantindo que 
             # nada fique fora da área visível.
     canvas.configure(scrollregion=canvas.bbox("all"))
+
+    # A exibição termina quando o layout foi recalculado; as medições 
+            # completas aparecem ao lado do comando.
+    if medicao is not None:
+        medicao.terminar()
+        label_medicao.config(text=medicao.resumo())
     
     # Move a barra de rolagem vertical para a posição mais baixa (o final do conteúdo). 
     # Isso é útil quando itens são adicionados ao final da Treeview
@@ -197,698 +500,107 @@ def atualizar_treeview(comando, data_frame):
             # sem precisar rolar manualmente.
     canvas.yview_moveto(1)
 
+    # Devolve o resultado criado, para que a leitura progressiva possa 
+            # atualizá-lo conforme novos blocos são lidos.
+    return resultado
 
-# Função para processar o comando de entrada do usuário
-def processar_comando():
 
-    # Declara que a variável 'df' usada aqui refere-se à variável 
-            # global definida fora da função.
-    global df
+# Função executada em uma thread de trabalho para executar um comando 
+        # sobre o DataFrame atual da sessão.
+# 'medicao' recebe o tempo e a memória de cada fase do comando.
+def executar_em_segundo_plano(tarefa, comando, medicao):
 
-    # Obtém o texto inserido pelo usuário no campo de entrada 'entry_comando' e 
-            # converte para letras minúsculas para padronizar a comparação de comandos.
-    comando = entry_comando.get().lower()
-    
-    # Limpa o campo de entrada após obter o comando para que o usuário possa 
-            # inserir novos comandos sem a necessidade de apagar manualmente o anterior.
-    entry_comando.delete(0, 'end')
+    # Guarda a medição na tarefa, para que ela seja completada com a 
+            # exibição (ou com o erro) no mainloop.
+    tarefa.medicao = medicao
 
-    # Tratamento para o comando "delete a coluna". Verifica se o texto 
-            # inserido pelo usuário começa com essa string específica.
-    if comando.startswith("delete a coluna"):
-        
-        # Remove a parte "delete a coluna" do comando, deixando apenas o 
-                # nome da coluna a ser deletada e remove espaços em branco 
-                # que possam existir antes ou depois do nome.
-        coluna = comando.replace("delete a coluna", '').strip()
-        
-        # Cria um dicionário que mapeia os nomes das colunas do DataFrame 
-                # para suas versões em minúsculas, facilitando a comparação 
-                # insensível a maiúsculas/minúsculas.
-        colunas_lower = {col.lower(): col for col in df.columns}  
-        
-        # Verifica se o nome da coluna inserido pelo usuário, convertido para 
-                # minúsculas, está presente no dicionário de colunas.
-        if coluna.lower() in colunas_lower:
-            
-            # Se a coluna existe, obtém o nome real da coluna (respeitando 
-                    # maiúsculas/minúsculas) usando o dicionário criado.
-            coluna_real = colunas_lower[coluna.lower()]
-            
-            # Remove a coluna do DataFrame. 'inplace=True' modifica o DataFrame 
-                    # original sem a necessidade de criar uma cópia.
-            df.drop(columns=[coluna_real], inplace=True)
-            
-            # Atualiza a visualização na Treeview para refletir a mudança no 
-                    # DataFrame após a remoção da coluna.
-            atualizar_treeview(comando, df)
-            
-        else:
-            
-            # Se a coluna não existir no DataFrame, mostra uma mensagem de erro ao usuário.
-            messagebox.showerror("Erro", f"A coluna '{coluna}' não existe no DataFrame.")
+    # Informa qual comando está sendo executado.
+    tarefa.progresso(None, f"Executando: {comando}")
 
-    # renomear a coluna Vendedor para Vendedor_Principal
+    # Executa o comando. O DataFrame anterior não é alterado; a sessão 
+            # passa a guardar o novo DataFrame e o resultado traz o que 
+            # deve ser exibido. No modo lazy, os comandos que podem ser 
+            # adiados apenas entram no plano.
+    return sessao.executar(comando, medicao)
 
-    # Tratamento para o comando "renomear a coluna", que permite ao 
-            # usuário mudar o nome de uma coluna existente no DataFrame.
-    elif comando.startswith("renomear a coluna"):
-        
-        # Remove a parte "renomear a coluna" do comando e divide o restante 
-                # em duas partes com base na expressão " para ".
-        # Isso é esperado para extrair o nome atual da coluna e o novo 
-                # nome desejado pelo usuário.
-        partes = comando.replace("renomear a coluna", '').strip().split(" para ")
-        
-        # Verifica se o comando foi dividido em exatamente duas partes: 
-                # o nome atual da coluna e o novo nome.
-        if len(partes) == 2:
-            
-            # Extrai o nome atual da coluna e o novo nome, removendo espaços 
-                    # desnecessários antes e depois de cada parte.
-            coluna_atual, novo_nome = partes[0].strip(), partes[1].strip()
-            
-            # Cria um dicionário para mapear os nomes de colunas do DataFrame para suas versões em minúsculas,
-                    # facilitando a busca insensível a maiúsculas/minúsculas.
-            colunas_lower = {col.lower(): col for col in df.columns}
-            
-            # Verifica se o nome atual da coluna, convertido para 
-                    # minúsculas, existe no dicionário de colunas.
-            if coluna_atual.lower() in colunas_lower:
-                
-                # Se a coluna existe, obtém o nome real da coluna (respeitando 
-                        # maiúsculas/minúsculas) usando o dicionário criado.
-                coluna_real = colunas_lower[coluna_atual.lower()]
-                
-                # Renomeia a coluna no DataFrame. 'columns' recebe um dicionário 
-                        # onde a chave é o nome antigo da coluna e o valor é o novo nome.
-                # 'inplace=True' modifica o DataFrame original sem a 
-                        # necessidade de criar uma cópia.
-                df.rename(columns={coluna_real: novo_nome}, inplace=True)
-                
-                # Atualiza a visualização na Treeview para refletir a 
-                        # mudança no DataFrame após o renomeamento da coluna.
-                atualizar_treeview(comando, df)
-                
-            else:
-                
-                # Se a coluna não existir no DataFrame, mostra uma 
-                        # mensagem de erro ao usuário.
-                messagebox.showerror("Erro", f"A coluna '{coluna_atual}' não existe no DataFrame.")
-
-
-    # filtrar na coluna Meta pelo valor 50000
-
-    # Tratamento para o comando "filtrar na coluna", que permite ao 
-            # usuário filtrar dados em uma coluna específica do DataFrame.
-    elif comando.startswith("filtrar na coluna"):
-        
-        # Remove a parte "filtrar na coluna" do comando e divide o 
-                # restante em duas partes na frase " pelo valor ".
-        # Isso é usado para separar o nome da coluna e o valor pelo qual o 
-                # usuário deseja filtrar.
-        partes = comando.replace("filtrar na coluna", '').strip().split(" pelo valor ")
-        
-        # Verifica se o comando foi dividido em exatamente duas partes: 
-                # o nome da coluna e o valor de filtro.
-        if len(partes) == 2:
-            
-            # Extrai o nome da coluna e o valor do filtro, removendo espaços 
-                    # extras antes e depois de cada parte.
-            coluna, valor = partes[0].strip(), partes[1].strip()
-        
-            # Cria um dicionário que mapeia os nomes de colunas do 
-                    # DataFrame para versões em minúsculas.
-            # Isso ajuda a realizar uma comparação insensível a maiúsculas/minúsculas.
-            colunas_lower = {col.lower(): col for col in df.columns}
-        
-            # Verifica se a coluna mencionada pelo usuário, convertida 
-                    # para minúsculas, existe no DataFrame.
-            # Isso é crucial para evitar erros ao tentar acessar uma coluna 
-                    # que não existe, o que causaria uma exceção.
-            if coluna.lower() in colunas_lower:
-                
-                # Obtém o nome real da coluna respeitando as maiúsculas/minúsculas 
-                        # originais, usando o dicionário criado.
-                # O dicionário 'colunas_lower' mapeia nomes de colunas em 
-                        # minúsculas para seus nomes originais,
-                        # permitindo que a operação de renomeação ou manipulação 
-                        # respeite o nome exato da coluna no DataFrame original.
-                coluna_real = colunas_lower[coluna.lower()]
-                
-                # Converte todos os dados na coluna para string, remove espaços em 
-                        # branco no começo e no fim e converte para minúsculas.
-                # Essa padronização é vital para garantir que as comparações de 
-                        # valores sejam consistentes e precisas, independente
-                        # de como os dados foram originalmente formatados ou inseridos.
-                # 'astype(str)': Converte todos os valores da coluna para strings, 
-                        # garantindo que operações de texto possam ser realizadas.
-                # 'str.strip()': Remove espaços extras do começo e do fim de cada valor.
-                # 'str.lower()': Converte todas as strings para minúsculas para 
-                        # uniformizar os dados e facilitar comparações.
-                df[coluna_real] = df[coluna_real].astype(str).str.strip().str.lower()
-                
-                # Processa o valor de filtro da mesma maneira, garantindo que a 
-                        # comparação seja justa e funcional.
-                # O valor digitado pelo usuário também é convertido para string, 
-                        # espaços são removidos e tudo é convertido para minúsculas.
-                # Isso assegura que a comparação entre o valor de filtro e os 
-                        # dados na coluna seja realizada de maneira coerente.
-                valor = valor.strip().lower()
-                
-                # Filtra o DataFrame para incluir apenas as linhas onde o valor da 
-                        # coluna especificada corresponde ao valor de filtro.
-                # A comparação é feita após a padronização dos dados, o que 
-                        # aumenta a precisão do filtro.
-                df_filtrado = df[df[coluna_real] == valor]
-                
-                # Verifica se o DataFrame filtrado não está vazio (ou seja, 
-                        # se existem linhas que correspondem ao critério).
-                # Um DataFrame vazio indica que nenhum registro correspondente 
-                        # foi encontrado com o valor especificado.
-                if not df_filtrado.empty:
-                    
-                    # Se dados correspondentes foram encontrados, atualiza a 
-                            # Treeview para mostrar esses dados.
-                    # A Treeview é uma representação visual do DataFrame filtrado, 
-                            # permitindo ao usuário ver o resultado do filtro aplicado.
-                    atualizar_treeview(comando, df_filtrado)
-                    
-                else:
-                    
-                    # Se nenhum dado correspondente foi encontrado, exibe um aviso ao usuário.
-                    # Isso informa que, apesar do processo ter sido realizado 
-                            # corretamente, não existem dados que atendam ao critério de filtro.
-                    messagebox.showwarning("Atenção", f"Nenhum dado encontrado para '{valor}' na coluna '{coluna_real}'.")
-
-                    
-            else:
-                
-                # Se a coluna não existir no DataFrame, exibe uma mensagem de erro ao usuário.
-                messagebox.showerror("Erro", f"A coluna '{coluna}' não existe no DataFrame.")
-
-
-    # ordenar o DataFrame pela coluna Meta
-
-    # Tratamento para o comando que solicita a ordenação do DataFrame 
-            # por uma coluna específica.
-    elif comando.startswith("ordenar o dataframe pela coluna"):
-
-        # Extrai o nome da coluna do comando digitado pelo usuário. 
-                # Remove a parte inicial do comando e espaços extras.
-        # Isso permite isolar o nome da coluna que o usuário deseja 
-                # usar para ordenar os dados.
-        coluna = comando.replace("ordenar o dataframe pela coluna", '').strip()
-        
-        # Cria um dicionário que mapeia os nomes das colunas do DataFrame 
-                # para suas versões em minúsculas.
-        # Isso é útil para fazer comparações insensíveis a maiúsculas e 
-                # minúsculas, garantindo que o usuário
-                # possa digitar o nome da coluna em qualquer capitalização.
-        colunas_lower = {col.lower(): col for col in df.columns}
-        
-        # Verifica se o nome da coluna digitado pelo usuário, após ser 
-                # convertido para minúsculas, está presente no dicionário de colunas.
-        # Essa verificação é importante para assegurar que a coluna realmente 
-                # existe no DataFrame antes de tentar ordená-lo por essa coluna.
-        if coluna.lower() in colunas_lower:
-            
-            # Acessa o nome real da coluna usando o dicionário, o que permite obter o 
-                    # nome exato como está no DataFrame, respeitando maiúsculas e minúsculas.
-            coluna_real = colunas_lower[coluna.lower()]
-            
-            # Ordena o DataFrame pela coluna especificada. 'by=coluna_real' 
-                    # indica a coluna pela qual ordenar.
-            # 'ascending=True' significa que a ordenação será em ordem 
-                    # crescente. 'inplace=True' modifica o DataFrame original,
-                    # sem necessidade de criar um novo DataFrame ordenado.
-            df.sort_values(by=coluna_real, ascending=True, inplace=True)
-            
-            # Atualiza a visualização dos dados na Treeview para refletir a 
-                    # nova ordem dos dados após a ordenação.
-            # Isso permite que o usuário veja imediatamente o resultado 
-                    # da operação de ordenação.
-            atualizar_treeview(comando, df)
-            
-        else:
-            
-            # Se a coluna especificada não existir no DataFrame, uma 
-                    # mensagem de erro é exibida para o usuário.
-            # Isso informa que o nome da coluna fornecido não foi encontrado, 
-                    # ajudando o usuário a corrigir possíveis erros de digitação.
-            messagebox.showerror("Erro", f"A coluna '{coluna}' não existe no DataFrame.")
 
+# Função chamada no mainloop quando o comando termina de executar.
+def comando_concluido(tarefa, resultado):
 
-    # preencher valores nulos na coluna Total de Vendas com 100
+    # Mostra o resultado na Treeview. O DataFrame atual já foi 
+            # atualizado pela sessão.
+    atualizar_treeview(resultado.titulo, resultado.exibir, tarefa.medicao)
 
-    # Tratamento para o comando que solicita preenchimento de valores 
-            # nulos em uma coluna específica do DataFrame.
-    elif comando.startswith("preencher valores nulos na coluna"):
+    # Grava as medições do comando no registro.
+    registro_medicoes.gravar(tarefa.medicao)
 
-        # Remove a parte inicial do comando "preencher valores nulos na 
-                # coluna" e divide o restante em duas partes na frase " com ".
-        # Isso é usado para separar o nome da coluna da qual os valores nulos 
-                # devem ser preenchidos e o valor que deve ser usado para o preenchimento.
-        partes = comando.replace("preencher valores nulos na coluna", '').strip().split(" com ")
-        
-        # Verifica se o comando foi dividido corretamente em exatamente 
-                # duas partes: o nome da coluna e o valor de preenchimento.
-        if len(partes) == 2:
-            
-            # Extrai o nome da coluna e o valor de preenchimento, removendo 
-                    # espaços extras antes e depois de cada parte.
-            coluna, valor = partes[0].strip(), partes[1].strip()
-            
-            # Cria um dicionário que mapeia os nomes de colunas do DataFrame 
-                    # para suas versões em minúsculas.
-            # Isso permite fazer comparações insensíveis a maiúsculas e minúsculas, 
-                    # garantindo que o usuário possa digitar o nome da coluna
-                    # em qualquer capitalização sem causar erros.
-            colunas_lower = {col.lower(): col for col in df.columns}
-            
-            # Verifica se a coluna mencionada pelo usuário, convertida 
-                    # para minúsculas, existe no DataFrame.
-            if coluna.lower() in colunas_lower:
-                
-                # Acessa o nome real da coluna usando o dicionário, o que permite 
-                        # obter o nome exato como está no DataFrame,
-                        # respeitando maiúsculas e minúsculas originais.
-                coluna_real = colunas_lower[coluna.lower()]
-                
-                # Preenche os valores nulos na coluna especificada com o 
-                        # valor fornecido pelo usuário.
-                # 'fillna' é um método do pandas que substitui todos os valores 
-                        # NaN ou None na coluna especificada pelo 'value' fornecido.
-                # 'inplace=True' modifica o DataFrame original sem a necessidade 
-                        # de atribuir o resultado a uma nova variável.
-                df[coluna_real].fillna(value=valor, inplace=True)
-                
-                # Atualiza a visualização dos dados na Treeview para refletir a 
-                        # mudança no DataFrame após o preenchimento dos valores nulos.
-                atualizar_treeview(comando, df)
-                
-            else:
-                
-                # Se a coluna não existir no DataFrame, uma mensagem de 
-                        # erro é exibida para o usuário.
-                # Isso informa que o nome da coluna fornecido não foi encontrado, 
-                        # ajudando o usuário a corrigir possíveis erros de digitação.
-                messagebox.showerror("Erro", f"A coluna '{coluna}' não existe no DataFrame.")
-
-
-    # mostrar as primeiras 10 linhas
-
-    # Tratamento para o comando que solicita mostrar as primeiras 
-            # linhas do DataFrame.
-    elif comando.startswith("mostrar as primeiras"):
-        
-        try:
-            
-            # Usa uma expressão regular para encontrar todos os números no 
-                    # comando digitado pelo usuário.
-            # A expressão regular '\d+' corresponde a uma ou mais 
-                    # ocorrências de dígitos (0-9).
-            numeros = re.findall(r'\d+', comando)
-            
-            # Verifica se algum número foi encontrado no comando. O número 
-                    # esperado é o número de linhas que o usuário deseja visualizar.
-            if numeros:
-                
-                # Converte o primeiro número encontrado de string para inteiro, 
-                        # pois ele indica quantas das primeiras linhas devem ser mostradas.
-                n = int(numeros[0])
-                
-                # Utiliza o método 'head' do pandas para obter as primeiras 'n' linhas do DataFrame.
-                # O método 'head(n)' retorna um novo DataFrame que contém apenas 
-                        # as primeiras 'n' linhas do DataFrame original.
-                df = df.head(n)  # Atualiza o DataFrame global com apenas as primeiras 'n' linhas.
-                
-                # Atualiza a visualização na Treeview para mostrar apenas 
-                        # as primeiras 'n' linhas.
-                atualizar_treeview(comando, df)
-                
-            else:
-                
-                # Se nenhum número válido foi encontrado no comando, mostra 
-                        # uma mensagem de erro informando o problema.
-                messagebox.showerror("Erro", "Número de linhas não especificado ou inválido.")
-                
-        except Exception as e:
-            
-            # Captura qualquer outra exceção que possa ocorrer durante o 
-                    # processo de extrair o número ou mostrar as linhas.
-            # Isso é útil para tratar erros inesperados, como problemas com 
-                    # conversão de tipos ou com o método 'head'.
-            messagebox.showerror("Erro", f"Erro ao mostrar linhas: {e}")
-
-
-    # mostrar as últimas 5 linhas
-
-    # Tratamento para o comando que solicita mostrar as últimas linhas do DataFrame.
-    elif comando.startswith("mostrar as últimas"):
-        
-        try:
-        
-            # Utiliza uma expressão regular para encontrar todos os números no 
-                    # comando digitado pelo usuário.
-            # A expressão '\d+' busca por uma ou mais ocorrências de dígitos 
-                    # numéricos, ajudando a extrair o número de linhas que o usuário quer ver.
-            numeros = re.findall(r'\d+', comando)
-            
-            # Verifica se algum número foi encontrado na string do comando.
-            if numeros:
-                
-                # Converte o primeiro número encontrado de string para inteiro. 
-                # Este número indica quantas das últimas linhas devem ser mostradas.
-                n = int(numeros[0])
-                
-                # Utiliza o método 'tail' do pandas para obter as últimas 'n' linhas do DataFrame.
-                # O método 'tail(n)' retorna um novo DataFrame que contém 
-                        # apenas as últimas 'n' linhas do DataFrame original.
-                df = df.tail(n)  # Atualiza o DataFrame global para incluir apenas as últimas 'n' linhas.
-                
-                # Atualiza a visualização na Treeview para mostrar as 
-                        # últimas 'n' linhas do DataFrame.
-                atualizar_treeview(comando, df)
-                
-            else:
-                
-                # Se nenhum número válido foi encontrado no comando, 
-                        # mostra uma mensagem de erro.
-                # Isso informa ao usuário que o comando para mostrar as 
-                        # últimas linhas estava incompleto ou incorreto.
-                messagebox.showerror("Erro", "Número de linhas não especificado ou inválido.")
-                
-        except Exception as e:
-            
-            # Captura qualquer outra exceção que possa ocorrer durante o 
-                    # processo de extrair o número ou mostrar as linhas.
-            # Tratar exceções aqui é importante para lidar com erros 
-                    # inesperados que podem surgir, como erros de conversão 
-                    # de tipo ou problemas ao acessar o DataFrame.
-            messagebox.showerror("Erro", f"Erro ao mostrar linhas: {e}")
-
-    # mostrar o Vendedor que mais vendeu na coluna de Total de Vendas
-
-    # Tratamento para comandos que envolvem a exibição de quem mais ou 
-            # menos vendeu em determinada coluna de quantidade.
-    elif comando.startswith("mostrar o") and "que" in comando and "vendeu na coluna de" in comando:
-        
-        try:
-            
-            # Utiliza uma expressão regular para capturar a estrutura do 
-                    # comando e extrair as partes relevantes.
-            # A expressão regular é definida para captar três grupos de interesse:
-            # 1. O nome da coluna pela qual os dados serão agrupados (ex: Vendedor, Produto).
-            # 2. A palavra "mais" ou "menos" para determinar se estamos 
-                    # buscando o valor máximo ou mínimo.
-            # 3. O nome da coluna que contém os valores numéricos que 
-                    # desejamos comparar (ex: Total de Vendas).
-            padrao = r"mostrar o (.+) que (mais|menos) vendeu na coluna de (.+)"
-            match = re.match(padrao, comando)  # Aplica a expressão regular ao comando fornecido.
-    
-            # Verifica se o comando inserido pelo usuário corresponde ao 
-                    # padrão definido pela expressão regular.
-            if match:
-                
-                # Extrai o nome da coluna que agrupa os dados (ex: Vendedor, Produto) 
-                        # do primeiro grupo capturado pela expressão regular.
-                coluna_grupo = match.group(1).strip()
-                
-                # Determina se a solicitação é para o valor máximo ou mínimo com 
-                        # base no segundo grupo capturado ("mais" ou "menos").
-                mais_ou_menos = match.group(2).strip()
-                
-                # Identifica a coluna que contém os valores numéricos a serem 
-                        # analisados (ex: Total de Vendas) do terceiro grupo capturado.
-                coluna_vendas = match.group(3).strip()
-    
-                # Cria um dicionário mapeando os nomes das colunas 
-                        # do DataFrame para minúsculas.
-                # Isso facilita a verificação de existência das colunas 
-                        # independentemente de como foram digitadas no comando, 
-                        # pois a comparação será insensível a maiúsculas e minúsculas.
-                colunas_lower = {col.lower().strip(): col.strip() for col in df.columns}
-                
-                # Normaliza o nome da coluna de grupo e coluna de vendas 
-                        # extraídos para minúsculas para garantir uma comparação precisa.
-                coluna_grupo_key = coluna_grupo.lower().strip()
-                coluna_vendas_key = coluna_vendas.lower().strip()
 
-    
-                # Verifica se as colunas especificadas existem no DataFrame, 
-                        # usando as chaves mapeadas.
-                # Este passo é crucial para garantir que as operações subsequentes 
-                        # não falhem devido a referências a colunas inexistentes.
-                if coluna_grupo_key in colunas_lower and coluna_vendas_key in colunas_lower:
-                    
-                    # Acessa os nomes reais das colunas a partir do dicionário 
-                            # que mapeia nomes em minúsculas para seus equivalentes exatos no DataFrame.
-                    coluna_grupo_real = colunas_lower[coluna_grupo_key]
-                    coluna_vendas_real = colunas_lower[coluna_vendas_key]
-                
-                    # Converte os valores da coluna de vendas para numéricos, pois 
-                            # as operações de agregação requerem dados numéricos.
-                    # 'errors='coerce'' converte valores que não podem ser transformados 
-                            # em números para NaN (Not a Number), garantindo que a operação não falhe.
-                    df[coluna_vendas_real] = pd.to_numeric(df[coluna_vendas_real], errors='coerce')
-                
-                    # Agrupa o DataFrame pela coluna do grupo e soma os valores 
-                            # de vendas para cada grupo.
-                    # Esta operação é fundamental para determinar qual 
-                            # grupo vendeu mais ou menos.
-                    grupo_vendas = df.groupby(coluna_grupo_real)[coluna_vendas_real].sum()
-                
-                    # Decide se deve pegar o grupo com maior ou menor soma 
-                            # de vendas baseado no comando.
-                    # 'mais' indica a busca pelo máximo, 'menos' pelo mínimo.
-                    if mais_ou_menos == 'mais':
-                        
-                        # 'idxmax()' retorna o índice do maior valor na série, o 
-                                # que corresponde ao grupo com as maiores vendas.
-                        grupo_selecionado = grupo_vendas.idxmax()
-                        
-                        # 'max()' retorna o maior valor encontrado na série, 
-                                # que é o total de vendas desse grupo.
-                        vendas = grupo_vendas.max()
-                        
-                    else:
-                        
-                        # 'grupo_vendas == grupo_vendas.min()' encontra todos os 
-                                # índices onde o valor é igual ao menor valor na série,
-                                # que pode ser útil se múltiplos grupos tiverem vendas mínimas iguais.
-                        grupo_selecionado = grupo_vendas[grupo_vendas == grupo_vendas.min()]
-                        
-                        # 'min()' retorna o menor valor encontrado na série.
-                        vendas = grupo_vendas.min()
-                
-                    # Cria um DataFrame filtrado que inclui apenas os registros 
-                            # do grupo selecionado.
-                    # A condição ternária verifica se 'mais_ou_menos' é 'menos'; se 
-                            # sim, inclui todos os grupos com as menores vendas, 
-                            # caso contrário, apenas o com mais vendas.
-                    df_grupo = df[df[coluna_grupo_real].isin(grupo_selecionado.index)] if mais_ou_menos == 'menos' else df[df[coluna_grupo_real] == grupo_selecionado]
-                
-                    # Atualiza a visualização para mostrar os resultados. 
-                    # Monta uma string que descreve o resultado e atualiza a 
-                            # Treeview para refletir esses dados,
-                            # permitindo ao usuário visualizar facilmente qual 
-                            # grupo vendeu mais ou menos e qual foi o total de vendas.
-                    atualizar_treeview(f"{coluna_grupo_real} que {mais_ou_menos} vendeu: {', '.join(grupo_selecionado.index) if mais_ou_menos == 'menos' else grupo_selecionado} (Total de vendas: {vendas})", df_grupo)
-
-                else:
-                    
-                    # Se alguma das colunas especificadas não existir, mostra uma 
-                            # mensagem de erro com as colunas disponíveis.
-                    # Constrói uma string com os nomes de todas as colunas disponíveis no DataFrame.
-                    # A função 'join' é usada para concatenar todos os elementos de 
-                            # uma lista (neste caso, os nomes das colunas do DataFrame),
-                            # separando-os com uma vírgula e um espaço. 
-                    # Isso cria uma lista legível de colunas que o usuário pode referenciar.
-                    colunas_disponiveis = ', '.join(df.columns)
-                
-                    # Exibe uma mensagem de erro ao usuário utilizando uma 
-                            # caixa de diálogo de erro.
-                    # 'messagebox.showerror' é uma função do Tkinter que cria uma 
-                            # janela de mensagem de erro com um título e uma mensagem.
-                    # O título aqui é "Erro", e a mensagem informa ao usuário que uma 
-                            # das colunas especificadas não existe no DataFrame,
-                            # e também lista todas as colunas disponíveis para 
-                            # auxiliar na correção do comando.
-                    messagebox.showerror("Erro", f"Uma das colunas especificadas não existe no DataFrame.\nColunas disponíveis: {colunas_disponiveis}")
-                    
-            else:
-                
-                # Se o formato do comando não corresponder ao esperado, 
-                        # informa ao usuário sobre o erro de formatação.
-                messagebox.showwarning("Erro", "Comando mal formatado. Tente novamente.")
-                
-        except Exception as e:
-            
-            # Captura e reporta qualquer outro erro que ocorra 
-                    # durante a execução do comando.
-            messagebox.showerror("Erro", f"Erro ao mostrar o {coluna_grupo_real} que {mais_ou_menos} vendeu: {e}")                
+# Função chamada no mainloop quando o comando falha.
+def comando_falhou(tarefa, erro):
 
-    
-    # mostrar Vendedor ordenados por vendas na coluna de Total de Vendas
+    # Comandos que falharam também entram no registro das medições, com o 
+            # erro. A tarefa pode falhar antes de guardar a medição.
+    medicao = getattr(tarefa, "medicao", None)
+    if medicao is not None:
+        medicao.erro = erro.mensagem if isinstance(erro, ErroComando) else str(erro)
+        registro_medicoes.gravar(medicao)
 
-    # Tratamento para o comando que solicita exibir elementos de uma 
-        # coluna, ordenados por vendas em outra coluna.
-    elif comando.startswith("mostrar") and "ordenados por" in comando and "na coluna de" in comando:
+    # Erros previstos pelo comando trazem o título e a mensagem a serem 
+            # mostrados; avisos (como um filtro sem resultados) usam 
+            # uma janela de aviso em vez de uma janela de erro.
+    # Comandos que precisam de confirmação (como uma junção que ocuparia 
+            # muita memória) mostram a estimativa e, se o usuário confirmar, 
+            # são enviados de novo com "mesmo assim".
+    if isinstance(erro, ConfirmacaoNecessaria):
+        if messagebox.askyesno(erro.titulo, erro.mensagem):
+            enviar_comando(erro.confirmacao)
 
-        try:
-        
-            # Utiliza uma expressão regular para capturar a estrutura do 
-                    # comando e extrair as partes necessárias.
-            # A expressão regular é composta para corresponder a uma sequência 
-                    # específica que deve conter o nome de uma coluna a ser agrupada,
-                    # uma indicação de ordenação ("ordenados por"), e o nome da 
-                    # coluna de vendas que será usada para essa ordenação.
-            padrao = r"mostrar (.+) ordenados por (.+) na coluna de (.+)"
-            match = re.match(padrao, comando)  # Aplica a expressão regular ao comando dado pelo usuário.
-        
-            # Se o comando corresponder ao padrão esperado pela expressão regular, 
-                    # os grupos capturados representam as partes essenciais do comando.
-            if match:
-                
-                # Captura o nome da coluna pela qual os dados serão agrupados, 
-                        # como 'Vendedor' ou 'Produto'.
-                # Esta é a coluna que definirá os grupos de dados sobre os quais 
-                        # as vendas serão somadas e comparadas.
-                coluna_grupo = match.group(1).strip()  # Extrai e remove espaços extras ao redor do nome da coluna de grupo.
-                
-                # Captura o nome da coluna de vendas, que é onde os valores que 
-                        # indicam a quantidade de vendas estão armazenados.
-                # Esta coluna será usada para somar as vendas de cada grupo e 
-                        # determinar qual grupo vendeu mais ou menos, dependendo do comando.
-                coluna_vendas = match.group(3).strip()  # Extrai e remove espaços extras ao redor do nome da coluna de vendas.
-        
-                # Cria um dicionário que mapeia todos os nomes das colunas do 
-                        # DataFrame para versões em minúsculas.
-                # Isso é feito para facilitar a verificação da existência 
-                        # dessas colunas no DataFrame, independentemente de 
-                        # como foram digitadas no comando.
-                # A normalização para minúsculas ajuda a evitar problemas de 
-                        # correspondência devido a diferenças de maiúsculas/minúsculas.
-                colunas_lower = {col.lower().strip(): col.strip() for col in df.columns}
-                coluna_grupo_real = None  # Inicializa a variável que armazenará o nome real da coluna de grupo.
-                coluna_vendas_real = None  # Inicializa a variável que armazenará o nome real da coluna de vendas.
+    elif isinstance(erro, ErroComando):
+        if erro.aviso:
+            messagebox.showwarning(erro.titulo, erro.mensagem)
+        else:
+            messagebox.showerror(erro.titulo, erro.mensagem)
 
-    
-                # Verifica se a coluna do grupo existe no DataFrame.
-                # Percorre todas as colunas do DataFrame para encontrar uma 
-                        # correspondência exata com o nome da coluna do grupo 
-                        # especificado no comando.
-                for col in df.columns:
-                
-                    # Compara o nome de cada coluna no DataFrame, convertido para 
-                            # minúsculas e sem espaços adicionais, com o nome da 
-                            # coluna do grupo também normalizado.
-                    # Essa normalização garante que a comparação seja insensível a 
-                            # diferenças de maiúsculas/minúsculas e espaços acidentais 
-                            # antes ou depois do nome da coluna.
-                    if col.lower().strip() == coluna_grupo.lower().strip():
-                    
-                        # Se encontrar uma correspondência, atribui o nome exato da 
-                                # coluna (como aparece no DataFrame) à variável 'coluna_grupo_real'.
-                        # Isso é importante porque o nome exato é necessário para 
-                                # referenciar corretamente a coluna em operações futuras.
-                        coluna_grupo_real = col
-                        
-                        # Interrompe o loop uma vez que a coluna desejada foi encontrada, 
-                                # otimizando o desempenho ao evitar verificações 
-                                # desnecessárias após a descoberta.
-                        break
-                
-                # Verifica se a coluna de vendas existe no DataFrame.
-                # Assim como a verificação anterior, este loop percorre todas as 
-                        # colunas do DataFrame em busca de uma correspondência 
-                        # com o nome da coluna de vendas.
-                for col in df.columns:
-                    
-                    # Realiza a mesma normalização e comparação que o loop anterior, 
-                            # mas desta vez comparando com o nome da coluna de 
-                            # vendas especificada no comando.
-                    if col.lower().strip() == coluna_vendas.lower().strip():
-                        
-                        # Se a coluna de vendas for encontrada, armazena o nome exato 
-                                # da coluna no DataFrame na variável 'coluna_vendas_real'.
-                        # Ter o nome exato é crucial para acessar os dados corretamente nas 
-                                # operações de agregação e ordenação que seguirão.
-                        coluna_vendas_real = col
-                        
-                        # Encerra o loop, pois não é necessário continuar a busca uma 
-                                # vez que a coluna de vendas foi encontrada.
-                        break
+    # Qualquer outro erro inesperado é mostrado com a sua descrição.
+    else:
+        messagebox.showerror("Erro", f"Erro ao executar o comando: {erro}")
 
-    
-                # Se ambas as colunas forem encontradas no DataFrame.
-                if coluna_grupo_real and coluna_vendas_real:
-                    
-                    # Converte os valores da coluna de vendas para numérico, uma etapa 
-                            # crucial porque as operações de soma e ordenação
-                            # precisam ser realizadas em dados numéricos para 
-                            # obter resultados corretos.
-                    df[coluna_vendas_real] = pd.to_numeric(df[coluna_vendas_real], errors='coerce')
-                    
-                    # A opção 'errors='coerce'' converte valores que não podem ser 
-                            # transformados em números para NaN (Not a Number),
-                            # garantindo que a operação não falhe por dados inválidos.
-                
-                    # Agrupa o DataFrame pela coluna do grupo (ex: Vendedor, Produto) e 
-                            # calcula a soma dos valores de vendas para cada grupo.
-                    # 'groupby' é um método poderoso que agrupa dados baseados em uma ou 
-                            # mais colunas, e 'sum()' soma os valores para cada grupo.
-                    grupo_vendas = df.groupby(coluna_grupo_real)[coluna_vendas_real].sum().reset_index()
-                    # 'reset_index()' é usado para transformar o índice de agrupamento em 
-                            # uma coluna novamente, facilitando operações subsequentes.
-                
-                    # Ordena os grupos resultantes de acordo com o total de 
-                            # vendas em ordem decrescente.
-                    # 'sort_values' é o método utilizado para ordenar os dados. 
-                    # 'by=coluna_vendas_real' define a coluna de ordenação,
-                            # e 'ascending=False' especifica que a ordenação 
-                            # deve ser feita do maior para o menor (decrescente).
-                    grupo_vendas.sort_values(by=coluna_vendas_real, ascending=False, inplace=True)
-                
-                    # Atualiza a Treeview para exibir os grupos ordenados por vendas. 
-                    # Esta visualização ajuda o usuário a entender claramente
-                            # qual grupo teve o maior volume de vendas.
-                    # 'atualizar_treeview' é uma função definida para atualizar a 
-                            # interface gráfica com os dados processados, mostrando 
-                            # os resultados em uma tabela visual.
-                    atualizar_treeview(f"{coluna_grupo_real.capitalize()} ordenados por vendas na coluna {coluna_vendas_real}", grupo_vendas)
-                    
-                else:
-                    
-                    # Se alguma das colunas não existir, mesmo após a verificação 
-                            # inicial, exibe uma mensagem de erro ao usuário.
-                    # Isso pode ser útil se houver uma modificação inesperada no 
-                            # DataFrame ou um erro na lógica anterior.
-                    # Lista todas as colunas disponíveis no DataFrame para ajudar o 
-                            # usuário a corrigir o comando.
-                    colunas_disponiveis = ', '.join(df.columns)  
-                    messagebox.showerror("Erro", f"Uma das colunas especificadas não existe no DataFrame.\nColunas disponíveis: {colunas_disponiveis}")
-
-            else:
-                
-                # Se o formato do comando não for o esperado, informa o 
-                        # usuário sobre a má formatação e solicita correção.
-                messagebox.showerror("Erro", "Comando mal formatado. Tente novamente.")
-                
-        except Exception as e:
-            
-            # Captura qualquer outra exceção durante o processamento e 
-                    # exibe uma mensagem de erro, indicando a natureza do problema.
-            messagebox.showerror("Erro", f"Erro ao mostrar {coluna_grupo_real} ordenados por vendas: {e}")
 
-        
+# Função para processar o comando de entrada do usuário
+def processar_comando():
 
+    # Obtém o texto inserido pelo usuário no campo de entrada 'entry_comando' e 
+            # converte para letras minúsculas para padronizar a comparação de comandos.
+    comando = entry_comando.get().lower()
     
-    else:
+    # Limpa o campo de entrada após obter o comando para que o usuário possa 
+            # inserir novos comandos sem a necessidade de apagar manualmente o anterior.
+    entry_comando.delete(0, 'end')
+
+    enviar_comando(comando)
+
 
-        messagebox.showerror("Erro", "Comando inválido...")
+# Função que executa um comando em segundo plano e mostra o resultado.
+def enviar_comando(comando):
 
+    # Executa o comando em segundo plano. O trabalho do pandas (groupby, 
+            # ordenação, filtros) acontece fora do mainloop, e o resultado 
+            # só é entregue à Treeview quando estiver pronto.
+    # A medição é criada aqui, no mainloop, porque a opção "Medir memória" 
+            # só pode ser lida fora das threads de trabalho.
+    iniciar_tarefa("Executando comando",
+                   executar_em_segundo_plano, comando, Medicao(comando, medir_memoria.get()),
+                   ao_concluir=comando_concluido,
+                   ao_falhar=comando_falhou)
+
+
+
+# Função chamada pelos atalhos Ctrl+Z e Ctrl+Y. Os atalhos são ignorados 
+        # enquanto outro comando ou o carregamento de um arquivo está em 
+        # andamento, como o botão "Executar Comando".
+def atalho_historico(comando):
+    if str(btn_comando["state"]) == "normal":
+        enviar_comando(comando)
 
 
 # Função para exibir dicas de comandos para o usuário. Esta função cria uma 
@@ -920,12 +632,85 @@ def mostrar_dicas():
 3. filtrar na coluna Meta pelo valor 50000
 4. ordenar o DataFrame pela coluna Meta
 5. preencher valores nulos na coluna Total de Vendas com 100
+   (ou com a média, a mediana, o valor anterior ou o próximo valor,
+   opcionalmente por grupo: ... com a média por Vendedor)
 6. mostrar as primeiras 10 linhas
 7. mostrar as últimas 5 linhas
 8. mostrar o Vendedor que mais vendeu na coluna de Total de Vendas
 9. mostrar o Produto que menos vendeu na coluna de Total de Vendas
 10. mostrar Vendedor ordenados por vendas na coluna de Total de Vendas
 11. mostrar Produto ordenados por vendas na coluna de Total de Vendas
+12. ativar modo lazy
+13. mostrar plano
+14. executar plano
+15. desativar modo lazy
+16. indexar a coluna Vendedor
+17. remover o índice da coluna Vendedor
+18. filtrar na coluna Meta maior que 40000
+19. filtrar na coluna Meta entre 20000 e 50000 e na coluna Cidade em lista Recife, Salvador
+20. filtrar na coluna Data da Venda menor que 15/03/2023 ou na coluna Cidade pelo valor Recife
+21. mostrar os 5 Vendedor que mais venderam na coluna de Total de Vendas
+22. mostrar os 5 Produto que menos venderam na coluna de Total de Vendas
+23. mostrar os 20 primeiros Produto ordenados por vendas na coluna de Total de Vendas
+24. mostrar os 20 últimos Produto ordenados por vendas na coluna de Total de Vendas
+25. desfazer  (ou Ctrl+Z)
+26. refazer  (ou Ctrl+Y)
+27. listar as tabelas
+28. usar a tabela Norte/Janeiro
+29. usar as tabelas Janeiro, Fevereiro e Março
+30. usar todas as tabelas
+31. juntar com a tabela Produtos pela coluna Produto
+32. juntar com a tabela Cadastro pela coluna Vendedor com a coluna Nome
+
+No modo lazy, os comandos 1, 2, 4, 6 e 7 não são executados na hora: 
+eles entram em um plano que é otimizado (ordenações seguidas juntadas 
+em uma só, apenas as colunas usadas) e executado de uma vez com 
+"executar plano" ou antes de qualquer outro comando. O filtro (comando 3) 
+mostra as linhas na hora, como fora do modo lazy, sem entrar no plano 
+nem mudar os dados dos comandos seguintes; ele é aplicado antes das 
+ordenações pendentes, sem ordenar as linhas que ele descarta.
+
+Colunas indexadas (comando 16) respondem a filtros repetidos sem 
+percorrer todas as linhas. O índice é construído no primeiro filtro 
+na coluna e reconstruído quando as linhas mudam de ordem.
+
+Nos filtros combinados, o "e" tem precedência sobre o "ou". "maior que", 
+"menor que" e "entre" aceitam colunas numéricas e de datas (dd/mm/aaaa).
+
+"desfazer" volta ao DataFrame anterior ao último comando que o alterou 
+(até 20 passos), sem reler o arquivo.
+
+Ao carregar vários arquivos, todas as planilhas entram no catálogo 
+(comando 27), mas cada uma só é lida quando um comando a usa. Uma 
+tabela pode ser indicada por "arquivo/planilha", pelo nome do arquivo 
+(todas as planilhas dele) ou pelo nome da planilha (a planilha em 
+todos os arquivos). Várias tabelas são empilhadas, com a coluna 
+"Tabela" indicando a origem de cada linha.
+
+"juntar" acrescenta ao DataFrame atual as colunas de outra tabela do 
+catálogo, pela coluna indicada. Todas as linhas do DataFrame atual são 
+mantidas. Se o resultado for grande, a estimativa de linhas e memória 
+é mostrada antes, para confirmação.
+
+Ao lado de cada comando aparecem o tempo da interpretação, da execução 
+e da exibição, as linhas antes e depois e o pico de memória. As 
+medições também são gravadas, uma por linha, em 
+~/.cache/list_command/comandos.jsonl (ou no caminho da variável 
+LIST_COMMAND_LOG).
+
+Apenas os 3 resultados mais recentes ficam com a grade aberta; os 
+anteriores mostram um resumo (linhas, colunas e memória) e o botão 
+"Mostrar". Quando os resultados recolhidos passam de 512 MB (ou do 
+valor, em MB, da variável LIST_COMMAND_LIMITE_RESULTADOS), os mais 
+antigos são guardados em disco e lidos de volta ao serem mostrados.
+
+Com "Dados em disco" marcado, o arquivo é gravado em partes no disco 
+(no diretório temporário ou no da variável LIST_COMMAND_DISCO) em vez 
+de ficar na memória. Filtros, ordenação, rankings, remoção e 
+renomeação de colunas percorrem as partes uma a uma, e a grade lê do 
+disco apenas as linhas visíveis. "mostrar as primeiras N linhas" e 
+"mostrar as últimas N linhas" trazem as linhas para a memória, onde 
+todos os comandos voltam a funcionar.
 """
 
     # Cria um widget de texto que pode exibir múltiplas linhas de texto. 
@@ -1030,6 +815,18 @@ def on_frame_configure(event):
         # mantendo a área de rolagem do canvas atualizada.
 frame_chat.bind("<Configure>", on_frame_configure)
 
+
+# Função que recalcula a área de rolagem do canvas depois que um resultado 
+        # é recolhido ou mostrado de novo.
+def atualizar_rolagem():
+    canvas.update_idletasks()
+    canvas.configure(scrollregion=canvas.bbox("all"))
+
+# Cria o histórico dos resultados exibidos em 'frame_chat'. Apenas os 
+        # resultados mais recentes ficam com a grade montada; os demais 
+        # mostram um resumo e um botão para mostrá-los de novo.
+resultados_exibidos = HistoricoResultados(montar_grade, ao_mudar=atualizar_rolagem)
+
 # Cria um frame na parte inferior da janela principal para 
         # conter a área de entrada de comandos.
 # 'bg="#333"' define a cor de fundo do frame para um cinza escuro.
@@ -1103,13 +900,110 @@ btn_dicas = tk.Button(frame_inferior,
         # botões e com um espaçamento horizontal de 5 pixels.
 btn_dicas.pack(side="left", padx=5)
 
-# Cria um DataFrame vazio que será usado para manipulação de 
-        # dados dentro da aplicação.
-# 'pd.DataFrame()' é uma construção do pandas que cria 
-        # um novo DataFrame vazio.
-# Este DataFrame pode ser posteriormente preenchido com dados 
-        # de um arquivo, entrada do usuário, ou qualquer outra fonte.
-df = pd.DataFrame()
+# Variável que indica se o arquivo deve ser carregado de forma progressiva, 
+        # mostrando os primeiros blocos enquanto o restante é lido.
+carregamento_progressivo = tk.BooleanVar(value=True)
+
+# Caixa de seleção para ativar ou desativar o carregamento progressivo.
+check_progressivo = tk.Checkbutton(frame_inferior, 
+                                   text="Carregamento progressivo", 
+                                   variable=carregamento_progressivo, 
+                                   font=("Arial", 10), 
+                                   bg="#333", 
+                                   fg="white", 
+                                   selectcolor="#333", 
+                                   activebackground="#333", 
+                                   activeforeground="white")
+check_progressivo.pack(side="left", padx=5)
+
+# Variável que indica se as medições dos comandos incluem o pico de memória. 
+        # Fora do Linux, a memória é medida com o tracemalloc, que deixa 
+        # os comandos mais lentos (ver 'instrumentacao.py').
+medir_memoria = tk.BooleanVar(value=True)
+
+# Caixa de seleção para ativar ou desativar a medição de memória.
+check_memoria = tk.Checkbutton(frame_inferior, 
+                               text="Medir memória", 
+                               variable=medir_memoria, 
+                               font=("Arial", 10), 
+                               bg="#333", 
+                               fg="white", 
+                               selectcolor="#333", 
+                               activebackground="#333", 
+                               activeforeground="white")
+check_memoria.pack(side="left", padx=5)
+
+# Variável que indica se o próximo arquivo deve ser carregado no modo de 
+        # dados em disco, para planilhas que não cabem na memória.
+dados_em_disco = tk.BooleanVar(value=False)
+
+# Caixa de seleção para ativar ou desativar o modo de dados em disco.
+check_disco = tk.Checkbutton(frame_inferior, 
+                             text="Dados em disco", 
+                             variable=dados_em_disco, 
+                             font=("Arial", 10), 
+                             bg="#333", 
+                             fg="white", 
+                             selectcolor="#333", 
+                             activebackground="#333", 
+                             activeforeground="white")
+check_disco.pack(side="left", padx=5)
+
+# Cria a barra de status, que mostra o andamento das tarefas executadas 
+        # em segundo plano (carregamento, comandos e exportação).
+# A barra de progresso fica no modo indeterminado quando a tarefa não 
+        # consegue estimar quanto falta.
+barra_progresso = ttk.Progressbar(frame_inferior, 
+                                  length=150, 
+                                  mode="determinate")
+barra_progresso.pack(side="left", padx=5)
+
+# Rótulo com a descrição da tarefa em andamento.
+label_status = tk.Label(frame_inferior, 
+                        text="", 
+                        font=("Arial", 10), 
+                        bg="#333", 
+                        fg="white")
+label_status.pack(side="left", padx=5)
+
+# Botão para cancelar as tarefas em andamento. Só aparece enquanto 
+        # alguma tarefa está executando.
+btn_cancelar = tk.Button(frame_inferior, 
+                         text="Cancelar", 
+                         command=lambda: gerenciador.cancelar_todas(), 
+                         font=("Arial", 10), 
+                         bg="#9E9E9E", 
+                         fg="white")
+
+# Cria o cache das planilhas lidas, guardado no diretório padrão do usuário.
+cache = CachePlanilhas()
+
+# Cria o registro das medições dos comandos (um JSON por linha).
+registro_medicoes = RegistroMedicoes()
+
+# Cria o gerenciador de tarefas, que executa o trabalho pesado em threads 
+        # de trabalho e entrega os resultados ao mainloop através de 'after()'.
+gerenciador = GerenciadorTarefas(janela_principal)
+
+
+# Função chamada quando o usuário fecha a janela principal. Cancela as 
+        # tarefas em andamento antes de encerrar a aplicação.
+def fechar_janela():
+    gerenciador.encerrar()
+    resultados_exibidos.limpar()
+    janela_principal.destroy()
+
+# Atalhos de teclado para desfazer e refazer o último comando.
+janela_principal.bind("<Control-z>", lambda evento: atalho_historico("desfazer"))
+janela_principal.bind("<Control-y>", lambda evento: atalho_historico("refazer"))
+
+# Associa o fechamento da janela à função 'fechar_janela'.
+janela_principal.protocol("WM_DELETE_WINDOW", fechar_janela)
+
+# Cria a sessão de comandos, que começa com um DataFrame vazio.
+# O DataFrame da sessão é preenchido ao carregar um arquivo e 
+        # substituído a cada comando executado.
+sessao = Sessao()
 
 # Define a geometria da janela principal. "900x600" define a 
         # largura e altura da janela em pixels.
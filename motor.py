@@ -0,0 +1,1044 @@
+# Importa o módulo threading, usado para que a troca do DataFrame pelo
+        # carregamento progressivo não aconteça no meio de um comando.
+import threading
+
+# Importa o módulo numpy e o renomeia para np, usado para combinar as
+        # máscaras dos filtros compostos.
+import numpy as np
+
+# Importa o módulo pandas e o renomeia para pd, usado
+        # para manipulação de dados.
+import pandas as pd
+
+# Importa o interpretador de comandos e os tipos de comando que ele produz.
+from comandos import (Desfazer, ErroSintaxe, ExecutarPlano, Filtrar, FiltrarComposto, IndexarColuna, Juntar, ListarTabelas, MelhoresGrupos, ModoLazy,
+                      MostrarPlano, Ordenar, OrdenadosPorVendas, PreencherNulos, Primeiras, QuemVendeu, Refazer,
+                      RemoverColuna, RemoverIndice, RenomearColuna, Ultimas, UsarTabelas, interpretar)
+
+# Importa o plano de execução adiada, usado no modo lazy.
+from plano import PLANEJAVEIS, ErroPlano, PlanoLazy
+
+# Comandos que apenas consultam os dados, sem alterar o DataFrame, o plano
+        # ou o histórico. São os únicos disponíveis enquanto um arquivo é
+        # carregado de forma progressiva.
+CONSULTAS = (Filtrar, FiltrarComposto, QuemVendeu, OrdenadosPorVendas, MelhoresGrupos, ListarTabelas, MostrarPlano)
+
+# Importa o cache das colunas normalizadas usadas pelos filtros.
+from chaves import ChavesNormalizadas, normalizar_coluna, normalizar_valor
+
+# Importa os índices opcionais das colunas, usados pelos filtros repetidos.
+from indices import Indices, aceita_indice_ordenado
+
+# Importa as agregações por grupo usadas pelos comandos de ranking.
+from agregacoes import CacheAgregacoes, somar_por_grupo
+
+# Importa o histórico de versões, usado por "desfazer" e "refazer".
+from historico import Historico, Versao
+
+# Importa o catálogo das planilhas e arquivos carregados.
+from catalogo import Catalogo
+
+# Importa a junção por hash entre o DataFrame atual e outra tabela.
+from juncao import LIMITE_CONFIRMACAO, Juncao
+
+# Importa a medição das fases dos comandos.
+from instrumentacao import fase
+
+# Importa os dados guardados em disco, usados quando a planilha não cabe na memória.
+from dados_em_disco import DadosEmDisco
+
+# Importa o resolvedor dos nomes das colunas digitados nos comandos.
+from colunas import resolvedor
+
+# Importa as estratégias de preenchimento dos valores nulos.
+from preenchimento import ErroPreenchimento, preencher_nulos
+
+
+# Exceção lançada quando um comando não pode ser executado. Leva o título e a
+        # mensagem que a interface deve mostrar ao usuário.
+# 'aviso=True' indica que a mensagem é apenas um aviso (por exemplo, um filtro
+        # sem resultados), e não um erro.
+class ErroComando(Exception):
+
+    def __init__(self, mensagem, titulo="Erro", aviso=False):
+        super().__init__(mensagem)
+        self.mensagem = mensagem
+        self.titulo = titulo
+        self.aviso = aviso
+
+
+# Exceção lançada quando um comando precisa ser confirmado pelo usuário
+        # antes de executar (por exemplo, uma junção que ocuparia muita
+        # memória). 'confirmacao' é o texto do comando que executa mesmo assim.
+class ConfirmacaoNecessaria(ErroComando):
+
+    def __init__(self, mensagem, confirmacao):
+        super().__init__(mensagem, titulo="Confirmar", aviso=True)
+        self.confirmacao = confirmacao
+
+
+# Resultado da execução de um comando.
+# 'df' é o DataFrame atual depois do comando, 'titulo' é o texto mostrado
+        # acima da Treeview e 'exibir' é o DataFrame que deve ser exibido
+        # (quando não informado, é o próprio 'df').
+class Resultado:
+
+    def __init__(self, df, titulo, exibir=None):
+        self.df = df
+        self.titulo = titulo
+        self.exibir = df if exibir is None else exibir
+
+
+# Função que encontra o nome real da coluna a que 'nome' se refere, sem
+        # diferenciar maiúsculas/minúsculas, acentos e espaços repetidos
+        # (ver 'colunas.py').
+# Se a coluna não existe, o erro sugere as colunas de nome mais parecido.
+        # 'onde' completa a mensagem (por exemplo, "na tabela 'Produtos'").
+def _coluna_real(colunas, nome, onde="no DataFrame"):
+
+    colunas = resolvedor(colunas)
+    coluna_real = colunas.encontrar(nome)
+    if coluna_real is None:
+        raise ErroComando(colunas.mensagem(nome, onde))
+    return coluna_real
+
+
+# delete a coluna Meta
+
+# Tratamento para o comando "delete a coluna".
+def _remover_coluna(cmd, df, comando, sessao=None):
+
+    # Obtém o nome real da coluna (respeitando maiúsculas/minúsculas e
+            # acentos). Se a coluna não existir no DataFrame, informa o
+            # erro ao usuário, com as colunas de nome parecido.
+    coluna_real = _coluna_real(df.columns, cmd.coluna)
+
+    # Remove a coluna do DataFrame. O resultado é um novo DataFrame,
+            # para que o DataFrame anterior (que pode estar sendo exibido
+            # ou exportado em outra thread) não seja alterado.
+    df = df.drop(columns=[coluna_real])
+
+    # Devolve o DataFrame sem a coluna, que também é o que deve ser exibido.
+    return Resultado(df, comando)
+
+
+# renomear a coluna Vendedor para Vendedor_Principal
+
+# Tratamento para o comando "renomear a coluna", que permite ao
+        # usuário mudar o nome de uma coluna existente no DataFrame.
+def _renomear_coluna(cmd, df, comando, sessao=None):
+
+    # Obtém o nome real da coluna atual. Se a coluna não existir no
+            # DataFrame, informa o erro ao usuário.
+    coluna_real = _coluna_real(df.columns, cmd.coluna)
+
+    # Renomeia a coluna no DataFrame. 'columns' recebe um dicionário
+            # onde a chave é o nome antigo da coluna e o valor é o novo nome.
+    # O resultado é um novo DataFrame, sem alterar o anterior.
+    df = df.rename(columns={coluna_real: cmd.novo_nome})
+
+    # Devolve o DataFrame com a coluna renomeada.
+    return Resultado(df, comando)
+
+
+# filtrar na coluna Meta pelo valor 50000
+
+# Tratamento para o comando "filtrar na coluna", que permite ao
+        # usuário filtrar dados em uma coluna específica do DataFrame.
+def _filtrar(cmd, df, comando, sessao=None):
+
+    # Obtém o nome real da coluna mencionada pelo usuário.
+    # Isso é crucial para evitar erros ao tentar acessar uma coluna
+            # que não existe, o que causaria uma exceção.
+    coluna_real = _coluna_real(df.columns, cmd.coluna)
+
+    # A comparação é feita com o texto da coluna sem espaços no começo e no
+            # fim e em minúsculas, para que seja consistente independente
+            # de como os dados foram originalmente formatados ou inseridos.
+    # A coluna original não é alterada: o texto normalizado vem do cache da
+            # sessão (calculado só no primeiro filtro na coluna) ou, sem
+            # sessão, é calculado apenas para esta comparação.
+    # Processa o valor de filtro da mesma maneira, garantindo que a
+            # comparação seja justa e funcional.
+    valor = normalizar_valor(cmd.valor)
+
+    # Se o usuário indexou a coluna, as linhas são encontradas pelo índice
+            # de hash, sem percorrer a coluna inteira.
+    if sessao is not None and sessao.indices.indexada(coluna_real):
+        df_filtrado = df.iloc[sessao.indices.hash(df, coluna_real, sessao.chaves).posicoes(valor)]
+
+    else:
+
+        if sessao is not None:
+            chaves = sessao.chaves.obter(df, coluna_real)
+        else:
+            chaves = normalizar_coluna(df[coluna_real])
+
+        # Filtra o DataFrame para incluir apenas as linhas onde o valor da
+                # coluna especificada corresponde ao valor de filtro.
+        # A máscara é usada por posição ('to_numpy'), pois o cache está
+                # alinhado linha a linha com o DataFrame.
+        df_filtrado = df[(chaves == valor).to_numpy()]
+
+    # Se nenhum dado correspondente foi encontrado, exibe um aviso ao usuário.
+    # Isso informa que, apesar do processo ter sido realizado
+            # corretamente, não existem dados que atendam ao critério de filtro.
+    if df_filtrado.empty:
+        raise ErroComando(f"Nenhum dado encontrado para '{valor}' na coluna '{coluna_real}'.", titulo="Atenção", aviso=True)
+
+    # Se dados correspondentes foram encontrados, devolve o
+            # DataFrame filtrado para ser exibido na Treeview.
+    # O DataFrame atual continua sendo o DataFrame completo, com os
+            # valores e os tipos originais.
+    return Resultado(df, comando, df_filtrado)
+
+
+# Função que converte o valor digitado em um filtro de comparação para o
+        # tipo da coluna: número para colunas numéricas e data para colunas
+        # de datas. Assim a comparação é feita sobre os dados originais.
+def _valor_comparavel(serie, coluna_real, texto):
+
+    if not aceita_indice_ordenado(serie):
+        raise ErroComando(f"A coluna '{coluna_real}' não é numérica nem de datas.")
+
+    try:
+
+        if pd.api.types.is_datetime64_any_dtype(serie):
+            return np.datetime64(pd.to_datetime(texto, dayfirst=True))
+
+        # Aceita também números no formato brasileiro, como "1.234,56".
+        try:
+            return float(texto)
+        except ValueError:
+            return float(texto.replace(".", "").replace(",", "."))
+
+    except ValueError:
+        raise ErroComando(f"O valor '{texto}' não pode ser comparado com a coluna '{coluna_real}'.")
+
+
+# Função que calcula a máscara (um array de booleanos, uma posição por
+        # linha) de uma condição de filtro.
+def _mascara_condicao(condicao, df, sessao):
+
+    coluna_real = _coluna_real(df.columns, condicao.coluna)
+    serie = df[coluna_real]
+    indexada = sessao is not None and sessao.indices.indexada(coluna_real)
+
+    # Igualdade e lista comparam o texto normalizado, como o filtro simples.
+    if condicao.operador in ("igual", "lista"):
+
+        valores = [normalizar_valor(valor) for valor in condicao.valores]
+
+        # Com índice de hash, as posições de cada valor são lidas direto do índice.
+        if indexada:
+            indice = sessao.indices.hash(df, coluna_real, sessao.chaves)
+            mascara = np.zeros(len(df), dtype=bool)
+            for valor in valores:
+                mascara[indice.posicoes(valor)] = True
+            return mascara
+
+        chaves = sessao.chaves.obter(df, coluna_real) if sessao is not None else normalizar_coluna(serie)
+        return chaves.isin(valores).to_numpy()
+
+    # Comparações usam os valores originais da coluna.
+    valores = [_valor_comparavel(serie, coluna_real, valor) for valor in condicao.valores]
+    minimo = maximo = None
+    incluir_minimo = incluir_maximo = True
+
+    if condicao.operador == "maior":
+        minimo, incluir_minimo = valores[0], False
+    elif condicao.operador == "menor":
+        maximo, incluir_maximo = valores[0], False
+    else:
+        minimo, maximo = sorted(valores)
+
+    # Com índice ordenado, a faixa é encontrada por busca binária.
+    if indexada:
+        mascara = np.zeros(len(df), dtype=bool)
+        mascara[sessao.indices.ordenado(df, coluna_real).intervalo(minimo, maximo, incluir_minimo, incluir_maximo)] = True
+        return mascara
+
+    # Sem índice, a comparação é vetorizada sobre o array da coluna. Valores
+            # nulos nunca pertencem à faixa.
+    valores_coluna = serie.to_numpy()
+    mascara = serie.notna().to_numpy()
+    if minimo is not None:
+        mascara = mascara & ((valores_coluna >= minimo) if incluir_minimo else (valores_coluna > minimo))
+    if maximo is not None:
+        mascara = mascara & ((valores_coluna <= maximo) if incluir_maximo else (valores_coluna < maximo))
+    return mascara
+
+
+# Função que calcula a máscara de um filtro composto: as condições de cada
+        # grupo são combinadas com "e", e os grupos, com "ou".
+def _mascara_composta(cmd, df, sessao):
+
+    mascara = np.zeros(len(df), dtype=bool)
+    for grupo in cmd.grupos:
+        mascara_grupo = np.ones(len(df), dtype=bool)
+        for condicao in grupo:
+            mascara_grupo &= _mascara_condicao(condicao, df, sessao)
+        mascara |= mascara_grupo
+    return mascara
+
+
+# filtrar na coluna Meta maior que 40000 e na coluna Cidade em lista Recife, Salvador
+
+# Tratamento para os filtros com comparações, faixas, listas e condições
+        # combinadas com "e" / "ou".
+# Todas as condições são calculadas como máscaras de booleanos e
+        # combinadas em uma única máscara, aplicada ao DataFrame uma só vez.
+def _filtrar_composto(cmd, df, comando, sessao=None):
+
+    df_filtrado = df[_mascara_composta(cmd, df, sessao)]
+
+    if df_filtrado.empty:
+        raise ErroComando("Nenhum dado encontrado para as condições do filtro.", titulo="Atenção", aviso=True)
+
+    # Como no filtro simples, o DataFrame atual continua sendo o completo.
+    return Resultado(df, comando, df_filtrado)
+
+
+# ordenar o DataFrame pela coluna Meta
+
+# Tratamento para o comando que solicita a ordenação do DataFrame
+        # por uma coluna específica.
+def _ordenar(cmd, df, comando, sessao=None):
+
+    # Obtém o nome exato da coluna como está no DataFrame, garantindo que o
+            # usuário possa digitar o nome em qualquer capitalização e com
+            # ou sem acentos.
+    # Se a coluna especificada não existir no DataFrame, uma mensagem de
+            # erro é exibida para o usuário.
+    coluna_real = _coluna_real(df.columns, cmd.coluna)
+
+    # Ordena o DataFrame pela coluna especificada. 'by=coluna_real'
+            # indica a coluna pela qual ordenar.
+    # 'ascending=True' significa que a ordenação será em ordem
+            # crescente. O resultado é um novo DataFrame ordenado.
+    # A ordenação é estável ('kind="stable"'): linhas com o mesmo valor
+            # mantêm a ordem em que estavam, qualquer que seja o tipo da
+            # coluna (texto, categórica, número).
+    df = df.sort_values(by=coluna_real, ascending=True, kind="stable")
+
+    # Devolve o DataFrame ordenado, para que o usuário veja
+            # imediatamente o resultado da operação de ordenação.
+    return Resultado(df, comando)
+
+
+# preencher valores nulos na coluna Total de Vendas com 100
+
+# Tratamento para o comando que solicita preenchimento de valores
+        # nulos em uma coluna específica do DataFrame.
+def _preencher_nulos(cmd, df, comando, sessao=None):
+
+    # Obtém o nome exato da coluna como está no DataFrame. Se a coluna não
+            # existir, uma mensagem de erro é exibida para o usuário.
+    coluna_real = _coluna_real(df.columns, cmd.coluna)
+
+    # Na estratégia por grupo, os grupos vêm de outra coluna.
+    grupos = None
+    if cmd.grupo is not None:
+        grupos = df[_coluna_real(df.columns, cmd.grupo)]
+
+    # Preenche os valores nulos na coluna especificada com o valor
+            # fornecido pelo usuário, convertido para o tipo da coluna, ou
+            # com a estratégia pedida (ver 'preenchimento.py').
+    try:
+        preenchida = preencher_nulos(df[coluna_real], cmd.estrategia, cmd.valor, grupos)
+    except ErroPreenchimento as e:
+        raise ErroComando(str(e))
+
+    # A coluna preenchida é atribuída em uma cópia rasa do DataFrame,
+            # para não alterar o DataFrame anterior.
+    df = df.copy(deep=False)
+    df[coluna_real] = preenchida
+
+    # Devolve o DataFrame após o preenchimento dos valores nulos.
+    return Resultado(df, comando)
+
+
+# mostrar as primeiras 10 linhas
+
+# Tratamento para o comando que solicita mostrar as primeiras
+        # linhas do DataFrame.
+def _primeiras(cmd, df, comando, sessao=None):
+
+    # Utiliza o método 'head' do pandas para obter as primeiras 'n' linhas do DataFrame.
+    # O DataFrame atual passa a ter apenas as primeiras 'n' linhas.
+    return Resultado(df.head(cmd.n), comando)
+
+
+# mostrar as últimas 5 linhas
+
+# Tratamento para o comando que solicita mostrar as últimas linhas do DataFrame.
+def _ultimas(cmd, df, comando, sessao=None):
+
+    # Utiliza o método 'tail' do pandas para obter as últimas 'n' linhas do DataFrame.
+    # O DataFrame atual passa a incluir apenas as últimas 'n' linhas.
+    return Resultado(df.tail(cmd.n), comando)
+
+
+# Função que encontra as colunas de grupo e de vendas de um comando de
+        # ranking, comparando os nomes sem diferenciar maiúsculas/minúsculas
+        # e acentos e ignorando espaços acidentais no nome.
+# Se alguma não existir, a mensagem de erro indica qual e sugere as colunas
+        # de nome parecido, para auxiliar na correção do comando.
+def _colunas_de_ranking(cmd, df):
+
+    # Devolve os nomes reais das colunas.
+    return _coluna_real(df.columns, cmd.coluna_grupo), _coluna_real(df.columns, cmd.coluna_vendas)
+
+
+# Função que devolve a soma das vendas por grupo. Com uma sessão, o
+        # resultado vem do cache de agregações, calculado uma única vez para
+        # as mesmas colunas enquanto o DataFrame não muda.
+# Os dados em disco somam parte por parte.
+def _vendas_por_grupo(df, coluna_grupo_real, coluna_vendas_real, sessao):
+
+    if isinstance(df, DadosEmDisco):
+        return df.somar_por_grupo(coluna_grupo_real, coluna_vendas_real)
+    if sessao is None:
+        return somar_por_grupo(df, coluna_grupo_real, coluna_vendas_real)
+    return sessao.agregacoes.somas(df, coluna_grupo_real, coluna_vendas_real, sessao.versao)
+
+
+# Função que devolve as linhas dos grupos indicados. Nos dados em disco, as
+        # partes são filtradas uma a uma.
+def _linhas_dos_grupos(df, coluna_grupo_real, grupos):
+
+    if isinstance(df, DadosEmDisco):
+        return df.filtrar(lambda bloco: bloco[coluna_grupo_real].isin(grupos).to_numpy())
+    return df[df[coluna_grupo_real].isin(grupos)]
+
+
+# mostrar o Vendedor que mais vendeu na coluna de Total de Vendas
+
+# Tratamento para comandos que envolvem a exibição de quem mais ou
+        # menos vendeu em determinada coluna de quantidade.
+def _quem_vendeu(cmd, df, comando, sessao=None):
+
+    coluna_grupo_real, coluna_vendas_real = _colunas_de_ranking(cmd, df)
+    mais_ou_menos = "mais" if cmd.mais else "menos"
+
+    try:
+
+        # Agrupa o DataFrame pela coluna do grupo e soma os valores
+                # de vendas para cada grupo.
+        # Os valores de vendas que não são números são ignorados na soma,
+                # sem alterar a coluna do DataFrame.
+        grupo_vendas = _vendas_por_grupo(df, coluna_grupo_real, coluna_vendas_real, sessao)
+
+        # Decide se deve pegar o grupo com maior ou menor soma
+                # de vendas baseado no comando.
+        if cmd.mais:
+
+            # 'idxmax()' retorna o índice do maior valor na série, o
+                    # que corresponde ao grupo com as maiores vendas.
+            grupo_selecionado = grupo_vendas.idxmax()
+            vendas = grupo_vendas.max()
+
+            # Cria um DataFrame filtrado que inclui apenas os registros do grupo selecionado.
+            df_grupo = _linhas_dos_grupos(df, coluna_grupo_real, [grupo_selecionado])
+            descricao = grupo_selecionado
+
+        else:
+
+            # 'grupo_vendas == grupo_vendas.min()' encontra todos os
+                    # índices onde o valor é igual ao menor valor na série,
+                    # que pode ser útil se múltiplos grupos tiverem vendas mínimas iguais.
+            grupo_selecionado = grupo_vendas[grupo_vendas == grupo_vendas.min()]
+            vendas = grupo_vendas.min()
+
+            # Inclui todos os grupos com as menores vendas.
+            df_grupo = _linhas_dos_grupos(df, coluna_grupo_real, grupo_selecionado.index)
+            descricao = ', '.join(grupo_selecionado.index)
+
+    except Exception as e:
+
+        # Captura e reporta qualquer outro erro que ocorra
+                # durante a execução do comando.
+        raise ErroComando(f"Erro ao mostrar o {coluna_grupo_real} que {mais_ou_menos} vendeu: {e}")
+
+    # Monta uma string que descreve o resultado, permitindo ao usuário
+            # visualizar facilmente qual grupo vendeu mais ou menos e
+            # qual foi o total de vendas.
+    return Resultado(df, f"{coluna_grupo_real} que {mais_ou_menos} vendeu: {descricao} (Total de vendas: {vendas})", df_grupo)
+
+
+# mostrar Vendedor ordenados por vendas na coluna de Total de Vendas
+
+# Tratamento para o comando que solicita exibir elementos de uma
+    # coluna, ordenados por vendas em outra coluna.
+def _ordenados_por_vendas(cmd, df, comando, sessao=None):
+
+    coluna_grupo_real, coluna_vendas_real = _colunas_de_ranking(cmd, df)
+
+    try:
+
+        # Agrupa o DataFrame pela coluna do grupo (ex: Vendedor, Produto) e
+                # calcula a soma dos valores de vendas para cada grupo.
+        # Os valores de vendas que não são números são ignorados na soma,
+                # sem alterar a coluna do DataFrame.
+        # 'reset_index()' é usado para transformar o índice de agrupamento em
+                # uma coluna novamente, facilitando operações subsequentes.
+        grupo_vendas = _vendas_por_grupo(df, coluna_grupo_real, coluna_vendas_real, sessao).reset_index()
+
+        # Ordena os grupos resultantes de acordo com o total de
+                # vendas em ordem decrescente.
+        grupo_vendas = grupo_vendas.sort_values(by=coluna_vendas_real, ascending=False)
+
+    except Exception as e:
+
+        # Captura qualquer outra exceção durante o processamento e
+                # exibe uma mensagem de erro, indicando a natureza do problema.
+        raise ErroComando(f"Erro ao mostrar {coluna_grupo_real} ordenados por vendas: {e}")
+
+    # Devolve os grupos ordenados por vendas, o que ajuda o usuário a
+            # entender claramente qual grupo teve o maior volume de vendas.
+    return Resultado(df, f"{coluna_grupo_real.capitalize()} ordenados por vendas na coluna {coluna_vendas_real}", grupo_vendas)
+
+
+# mostrar os 20 Vendedor que mais venderam na coluna de Total de Vendas
+
+# Tratamento para os comandos que mostram apenas os N grupos com as maiores
+        # ou menores vendas.
+# Em vez de ordenar todos os grupos, 'nlargest'/'nsmallest' fazem uma
+        # seleção parcial dos N primeiros, e só esses N são exibidos. Assim o
+        # comando continua rápido mesmo com centenas de milhares de grupos.
+def _melhores_grupos(cmd, df, comando, sessao=None):
+
+    coluna_grupo_real, coluna_vendas_real = _colunas_de_ranking(cmd, df)
+    mais_ou_menos = "mais" if cmd.maiores else "menos"
+
+    try:
+
+        grupo_vendas = _vendas_por_grupo(df, coluna_grupo_real, coluna_vendas_real, sessao)
+
+        # 'keep="first"' desempata pela ordem dos grupos, como a ordenação.
+        if cmd.maiores:
+            selecionados = grupo_vendas.nlargest(cmd.n, keep="first")
+        else:
+            selecionados = grupo_vendas.nsmallest(cmd.n, keep="first")
+
+    except Exception as e:
+        raise ErroComando(f"Erro ao mostrar os {cmd.n} {coluna_grupo_real} que {mais_ou_menos} venderam: {e}")
+
+    return Resultado(df, f"{cmd.n} {coluna_grupo_real} que {mais_ou_menos} venderam na coluna {coluna_vendas_real}", selecionados.reset_index())
+
+
+# juntar com a tabela Produtos pela coluna Produto
+
+# Tratamento para o comando "juntar com a tabela".
+# A outra tabela vem do catálogo da sessão e é lida se ainda não foi. Antes
+        # de montar o resultado, a junção calcula quantas linhas ele terá:
+        # se ocuparia mais memória que 'LIMITE_CONFIRMACAO', o comando pede
+        # confirmação mostrando a estimativa.
+def _juntar(cmd, df, comando, sessao=None):
+
+    if sessao is None or not sessao.catalogo.tabelas:
+        raise ErroComando("Nenhuma tabela foi carregada para a junção.", aviso=True)
+
+    try:
+        outra = sessao.catalogo.combinar((cmd.tabela,))
+    except KeyError:
+        raise ErroComando(f"A tabela '{cmd.tabela}' não existe no catálogo. Use 'listar as tabelas' para ver os nomes.")
+
+    coluna_real = _coluna_real(df.columns, cmd.coluna)
+    coluna_outra = _coluna_real(outra.columns, cmd.coluna_outra, f"na tabela '{cmd.tabela}'")
+
+    try:
+        juncao = Juncao(df, outra, coluna_real, coluna_outra, cmd.tabela)
+    except Exception as e:
+        raise ErroComando(f"Erro ao juntar com a tabela '{cmd.tabela}': {e}")
+
+    mb = juncao.estimar_bytes() / (1024 * 1024)
+    estimativa = f"{juncao.linhas} linhas, cerca de {mb:.0f} MB"
+
+    if not cmd.confirmado and juncao.estimar_bytes() > LIMITE_CONFIRMACAO:
+        raise ConfirmacaoNecessaria(f"A junção com a tabela '{cmd.tabela}' vai gerar {estimativa}. Deseja continuar?",
+                                    f"{comando} mesmo assim")
+
+    df = juncao.executar()
+    return Resultado(df, f"{comando} ({juncao.correspondidas} linhas com correspondência; {estimativa})")
+
+
+# Tabela de despacho: associa cada tipo de comando à função que o executa.
+# Encontrar a função custa uma consulta ao dicionário, não importa
+        # quantos comandos existam.
+EXECUTORES = {
+    RemoverColuna: _remover_coluna,
+    RenomearColuna: _renomear_coluna,
+    Filtrar: _filtrar,
+    FiltrarComposto: _filtrar_composto,
+    Ordenar: _ordenar,
+    PreencherNulos: _preencher_nulos,
+    Primeiras: _primeiras,
+    Ultimas: _ultimas,
+    QuemVendeu: _quem_vendeu,
+    OrdenadosPorVendas: _ordenados_por_vendas,
+    MelhoresGrupos: _melhores_grupos,
+    Juntar: _juntar,
+}
+
+
+# Filtros sobre os dados em disco (ver 'dados_em_disco.py'). A máscara é
+        # calculada em cada parte, com as mesmas regras dos filtros na
+        # memória, e as linhas encontradas são gravadas em novas partes.
+def _filtrar_em_disco(cmd, dados, comando, sessao=None):
+
+    coluna_real = _coluna_real(dados.columns, cmd.coluna)
+    valor = normalizar_valor(cmd.valor)
+
+    filtrado = dados.filtrar(lambda bloco: (normalizar_coluna(bloco[coluna_real]) == valor).to_numpy())
+
+    if filtrado.empty:
+        raise ErroComando(f"Nenhum dado encontrado para '{valor}' na coluna '{coluna_real}'.", titulo="Atenção", aviso=True)
+    return Resultado(dados, comando, filtrado)
+
+
+def _filtrar_composto_em_disco(cmd, dados, comando, sessao=None):
+
+    filtrado = dados.filtrar(lambda bloco: _mascara_composta(cmd, bloco, None))
+
+    if filtrado.empty:
+        raise ErroComando("Nenhum dado encontrado para as condições do filtro.", titulo="Atenção", aviso=True)
+    return Resultado(dados, comando, filtrado)
+
+
+# Comandos disponíveis quando os dados estão em disco. A remoção e a
+        # renomeação de colunas, a ordenação (externa), as primeiras e
+        # últimas linhas e os rankings usam os mesmos tratamentos da
+        # memória, pois 'DadosEmDisco' oferece as operações do DataFrame
+        # que eles usam. As primeiras e últimas linhas trazem o resultado
+        # para a memória, e os comandos seguintes voltam a usar o pandas.
+EXECUTORES_DISCO = {
+    RemoverColuna: _remover_coluna,
+    RenomearColuna: _renomear_coluna,
+    Filtrar: _filtrar_em_disco,
+    FiltrarComposto: _filtrar_composto_em_disco,
+    Ordenar: _ordenar,
+    Primeiras: _primeiras,
+    Ultimas: _ultimas,
+    QuemVendeu: _quem_vendeu,
+    OrdenadosPorVendas: _ordenados_por_vendas,
+    MelhoresGrupos: _melhores_grupos,
+}
+
+
+# Função que executa um comando sobre o DataFrame e devolve um 'Resultado'.
+# Não usa o Tkinter: pode ser executada em uma thread de trabalho, fora do
+        # mainloop, sem travar a interface. O DataFrame recebido nunca é
+        # alterado; os comandos que o modificam devolvem um novo DataFrame.
+def executar_comando(comando, df):
+
+    # Interpreta o texto do comando. Erros de sintaxe viram 'ErroComando',
+            # com a mesma mensagem, para a interface mostrar ao usuário.
+    try:
+        cmd = interpretar(comando)
+    except ErroSintaxe as e:
+        raise ErroComando(e.mensagem, aviso=e.aviso)
+
+    # Executa o comando com a função correspondente ao seu tipo.
+    return EXECUTORES[type(cmd)](cmd, df, comando)
+
+
+# Sessão de trabalho: guarda o DataFrame atual entre um comando e outro.
+# É usada pela janela principal e pelo modo de lote. No modo lazy, a sessão
+        # guarda também o plano com os comandos adiados, que só é executado
+        # quando as linhas são necessárias.
+class Sessao:
+
+    def __init__(self, df=None, catalogo=None):
+
+        # DataFrame atual da sessão.
+        self.df = pd.DataFrame() if df is None else df
+
+        # Plano de execução adiada; None quando o modo lazy está desativado.
+        self.plano = None
+
+        # Colunas normalizadas usadas pelos filtros, reaproveitadas entre
+                # um comando e outro enquanto a coluna não muda.
+        self.chaves = ChavesNormalizadas()
+
+        # Índices das colunas que o usuário pediu para indexar.
+        self.indices = Indices()
+
+        # Versão dos dados: incrementada sempre que o DataFrame atual muda.
+        self.versao = 0
+
+        # Agregações por grupo dos comandos de ranking, por versão dos dados.
+        self.agregacoes = CacheAgregacoes()
+
+        # Versões anteriores da sessão, para desfazer e refazer comandos.
+        self.historico = Historico()
+
+        # Planilhas e arquivos registrados, lidos apenas quando um comando
+                # os usa.
+        self.catalogo = Catalogo() if catalogo is None else catalogo
+
+        # Indica que o DataFrame atual é parte de um arquivo que ainda está
+                # sendo carregado: só as consultas ficam disponíveis, para que
+                # nenhum comando seja perdido quando o DataFrame for trocado
+                # pelo próximo bloco.
+        self.carregando = False
+
+        # Trava que impede a troca do DataFrame enquanto um comando executa
+                # em uma thread de trabalho. É reentrante porque
+                # 'tentar_carregar' chama 'carregar' com a trava já obtida.
+        self.trava = threading.RLock()
+
+
+    # Indica se o modo lazy está ativo.
+    @property
+    def lazy(self):
+        return self.plano is not None
+
+
+    # Indica se há comandos adiados ainda não executados.
+    @property
+    def pendente(self):
+        return self.lazy and not self.plano.vazio()
+
+
+    # Substitui o DataFrame atual (por exemplo, ao carregar um arquivo).
+    # Comandos adiados sobre o DataFrame anterior são descartados.
+    # Os dados em disco não usam o modo lazy, que é desativado.
+    # 'parcial' indica que o DataFrame é um bloco de um arquivo que ainda
+            # está sendo carregado (ver 'carregando').
+    def carregar(self, df, parcial=False):
+
+        with self.trava:
+            self.df = df
+            self.carregando = parcial
+            self.historico.limpar()
+            self.chaves.limpar()
+            self.indices.descartar_todos()
+            self._nova_versao()
+            self.agregacoes.limpar()
+            if isinstance(df, DadosEmDisco):
+                self.plano = None
+            elif self.lazy:
+                self.plano = PlanoLazy(df)
+
+
+    # Como 'carregar', mas sem esperar: se um comando está executando,
+            # devolve False e o DataFrame não é trocado. Usada no mainloop,
+            # que não pode ficar parado até o fim do comando.
+    def tentar_carregar(self, df, parcial=False):
+
+        if not self.trava.acquire(blocking=False):
+            return False
+        try:
+            self.carregar(df, parcial)
+        finally:
+            self.trava.release()
+        return True
+
+
+    # Executa os comandos adiados, se houver, e devolve o DataFrame atual.
+    def materializar(self):
+
+        # Os filtros do plano usam o cache das colunas normalizadas; depois
+                # da execução, as linhas e os nomes das colunas podem ter
+                # mudado, então o cache é descartado.
+        if self.pendente:
+            self.df = self.plano.executar(self.chaves)
+            self.plano = PlanoLazy(self.df)
+            self.chaves.limpar()
+            self.indices.descartar_todos()
+            self._nova_versao()
+            self.agregacoes.limpar()
+        return self.df
+
+
+    # Executa um comando e devolve o 'Resultado'.
+    # Se o comando altera o DataFrame ou o plano do modo lazy, o estado
+            # anterior é guardado no histórico para o "desfazer".
+    # 'medicao', se informada (ver 'instrumentacao.py'), recebe o tempo e a
+            # memória da interpretação e da execução e as linhas antes e
+            # depois do comando.
+    def executar(self, comando, medicao=None):
+
+        with self.trava:
+            return self._executar_travado(comando, medicao)
+
+
+    # Corpo de 'executar', chamado com a trava da sessão.
+    def _executar_travado(self, comando, medicao):
+
+        if medicao is not None:
+            medicao.linhas_entrada = len(self.df)
+
+        try:
+            with fase(medicao, "análise"):
+                cmd = interpretar(comando)
+        except ErroSintaxe as e:
+            raise ErroComando(e.mensagem, aviso=e.aviso)
+
+        if medicao is not None:
+            medicao.tipo = type(cmd).__name__
+
+        if self.carregando and not isinstance(cmd, CONSULTAS):
+            raise ErroComando("Este comando fica disponível quando o arquivo terminar de carregar. "
+                              "Enquanto isso, filtros e rankings podem ser usados sobre as linhas já lidas.",
+                              titulo="Atenção", aviso=True)
+
+        with fase(medicao, "execução"):
+            if isinstance(cmd, (Desfazer, Refazer)):
+                resultado = self._voltar(cmd, comando)
+            else:
+                antes = self._versao(comando)
+                resultado = self._executar(cmd, comando)
+                if self.df is not antes.df or self._plano_mudou(antes.plano):
+                    self.historico.registrar(antes)
+
+        if medicao is not None:
+            medicao.linhas_saida = len(resultado.exibir)
+        return resultado
+
+
+    # Estado atual da sessão, para o histórico. O plano é copiado porque
+            # continua recebendo etapas depois.
+    def _versao(self, comando):
+        return Versao(self.df, None if self.plano is None else self.plano.copiar(), comando)
+
+
+    # Indica se o plano do modo lazy mudou em relação a 'anterior'.
+    def _plano_mudou(self, anterior):
+
+        if anterior is None or self.plano is None:
+            return anterior is not self.plano
+        return anterior.base is not self.plano.base or len(anterior.etapas) != len(self.plano.etapas)
+
+
+    # Restaura a versão anterior ("desfazer") ou a seguinte ("refazer").
+    def _voltar(self, cmd, comando):
+
+        atual = self._versao(None)
+        versao = self.historico.desfazer(atual) if isinstance(cmd, Desfazer) else self.historico.refazer(atual)
+
+        if versao is None:
+            acao = "desfazer" if isinstance(cmd, Desfazer) else "refazer"
+            raise ErroComando(f"Não há comandos para {acao}.", titulo="Atenção", aviso=True)
+
+        # O DataFrame restaurado é o mesmo objeto guardado no histórico, sem
+                # cópia. Os caches pertencem ao DataFrame que sai e são
+                # descartados.
+        self.df = versao.df
+        self.plano = versao.plano
+        self.chaves.limpar()
+        self.indices.descartar_todos()
+        self._nova_versao()
+        self.agregacoes.limpar()
+
+        return Resultado(self.df, f"{comando}: {atual.comando}")
+
+
+    # Executa um comando já interpretado.
+    def _executar(self, cmd, comando):
+
+        # Com os dados em disco, só os comandos de 'EXECUTORES_DISCO' estão
+                # disponíveis. O catálogo continua acessível, e "usar a
+                # tabela" volta a trabalhar na memória.
+        if isinstance(self.df, DadosEmDisco) and not isinstance(cmd, (ListarTabelas, UsarTabelas)):
+            return self._executar_em_disco(cmd, comando)
+
+        # Ativa ou desativa o modo lazy. Ao desativar, os comandos adiados
+                # são executados para que nenhum deles se perca.
+        if isinstance(cmd, ModoLazy):
+            if cmd.ativo and not self.lazy:
+                self.plano = PlanoLazy(self.df)
+            elif not cmd.ativo:
+                self.materializar()
+                self.plano = None
+            return Resultado(self.df, comando)
+
+        if isinstance(cmd, MostrarPlano):
+            if not self.lazy:
+                raise ErroComando("O modo lazy não está ativo.", aviso=True)
+            return Resultado(self.df, comando, self.plano.descrever())
+
+        if isinstance(cmd, ExecutarPlano):
+            return Resultado(self.materializar(), comando)
+
+        # Marca ou desmarca uma coluna para indexação. O índice é construído
+                # no primeiro filtro na coluna.
+        if isinstance(cmd, (IndexarColuna, RemoverIndice)):
+            df = self.materializar()
+            coluna_real = _coluna_real(df.columns, cmd.coluna)
+            if isinstance(cmd, IndexarColuna):
+                self.indices.marcar(coluna_real)
+            else:
+                self.indices.desmarcar(coluna_real)
+            return Resultado(df, comando)
+
+        if isinstance(cmd, ListarTabelas):
+            return Resultado(self.df, comando, self.catalogo.descrever())
+
+        # Troca o DataFrame atual pelas tabelas do catálogo. Os comandos
+                # adiados sobre o DataFrame anterior não precisam ser
+                # executados: continuam no histórico, para o "desfazer".
+        if isinstance(cmd, UsarTabelas):
+            return self._usar_tabelas(cmd, comando)
+
+        # No modo lazy, o filtro continua apenas exibindo as linhas, como
+                # no modo imediato: não entra no plano nem muda os dados dos
+                # comandos seguintes. Uma cópia do plano com o filtro é
+                # otimizada (o filtro vem antes das ordenações pendentes) e
+                # executada só para a exibição.
+        if self.lazy and isinstance(cmd, Filtrar):
+            return self._filtrar_no_plano(cmd, comando)
+
+        # No modo lazy, os comandos que podem ser adiados entram no plano e
+                # a interface mostra o plano otimizado, sem executar nada.
+        if self.lazy and isinstance(cmd, PLANEJAVEIS):
+            try:
+                self.plano.adicionar(cmd)
+            except ErroPlano as e:
+                raise ErroComando(str(e))
+            return Resultado(self.df, f"{comando} (adiado)", self.plano.descrever())
+
+        # Os demais comandos precisam das linhas: o plano é executado antes.
+        anterior = self.materializar()
+        resultado = EXECUTORES[type(cmd)](cmd, anterior, comando, self)
+        self._atualizar_caches(cmd, anterior, resultado.df)
+        self.df = resultado.df
+        if self.lazy:
+            self.plano = PlanoLazy(self.df)
+        return resultado
+
+
+    # Filtro no modo lazy: executa o plano atual com o filtro no fim e
+            # devolve as linhas encontradas, sem alterar o plano da sessão.
+    # O cache das colunas normalizadas corresponde ao DataFrame base do
+            # plano, que é o DataFrame atual da sessão.
+    def _filtrar_no_plano(self, cmd, comando):
+
+        consulta = self.plano.copiar()
+        try:
+            consulta.adicionar(cmd)
+        except ErroPlano as e:
+            raise ErroComando(str(e))
+
+        df_filtrado = consulta.executar(self.chaves)
+
+        if df_filtrado.empty:
+            coluna_real, valor = consulta.etapas[-1].condicoes[0]
+            raise ErroComando(f"Nenhum dado encontrado para '{valor}' na coluna '{coluna_real}'.", titulo="Atenção", aviso=True)
+        return Resultado(self.df, comando, df_filtrado)
+
+
+    # Executa um comando sobre os dados em disco. Os caches da sessão
+            # (colunas normalizadas, índices e agregações) valem apenas para
+            # DataFrames na memória e são descartados quando os dados mudam.
+    def _executar_em_disco(self, cmd, comando):
+
+        executor = EXECUTORES_DISCO.get(type(cmd))
+        if executor is None:
+            raise ErroComando("Este comando não está disponível com os dados em disco.\n"
+                              "Use 'mostrar as primeiras N linhas' ou 'mostrar as últimas N linhas' "
+                              "para trazer parte dos dados para a memória.", titulo="Atenção", aviso=True)
+
+        anterior = self.df
+        resultado = executor(cmd, anterior, comando)
+        if resultado.df is not anterior:
+            self.chaves.limpar()
+            self.indices.descartar_todos()
+            self._nova_versao()
+            self.agregacoes.limpar()
+        self.df = resultado.df
+        return resultado
+
+
+    # Passa a usar como DataFrame atual as tabelas indicadas, lendo as que
+            # ainda não foram lidas.
+    def _usar_tabelas(self, cmd, comando):
+
+        if not self.catalogo.tabelas:
+            raise ErroComando("Nenhuma tabela foi carregada.", aviso=True)
+
+        try:
+            df = self.catalogo.combinar(cmd.nomes)
+        except KeyError as e:
+            raise ErroComando(f"A tabela '{e.args[0]}' não existe no catálogo. Use 'listar as tabelas' para ver os nomes.")
+
+        self.df = df
+        self.chaves.limpar()
+        self.indices.descartar_todos()
+        self._nova_versao()
+        self.agregacoes.limpar()
+        if self.lazy:
+            self.plano = PlanoLazy(df)
+
+        return Resultado(df, comando)
+
+
+    # Atualiza o cache das colunas normalizadas e os índices depois de um
+            # comando que transformou 'anterior' em 'novo'.
+    def _atualizar_caches(self, cmd, anterior, novo):
+
+        # Filtros e rankings não alteram o DataFrame atual: os caches
+                # continuam válidos.
+        if novo is anterior:
+            return
+
+        self._nova_versao()
+
+        # Comandos que só reordenam ou recortam as linhas. Os índices
+                # guardam posições, então precisam ser reconstruídos.
+        # A ordenação não muda o conjunto de linhas, então as agregações
+                # por grupo continuam valendo. Nas primeiras/últimas linhas,
+                # as agregações perdem apenas as linhas removidas; quando
+                # sobram menos linhas do que foram removidas, é mais barato
+                # recalcular sobre as que sobraram.
+        if isinstance(cmd, (Ordenar, Primeiras, Ultimas)):
+            self.chaves.realinhar(novo.index)
+            self.indices.descartar_todos()
+            removidas = len(anterior) - len(novo)
+            if removidas > len(novo):
+                self.agregacoes.limpar()
+                return
+            if isinstance(cmd, Primeiras):
+                self.agregacoes.aplicar(anterior.iloc[len(novo):], anterior.iloc[:0])
+            elif isinstance(cmd, Ultimas):
+                self.agregacoes.aplicar(anterior.iloc[:removidas], anterior.iloc[:0])
+
+        # As colunas renomeadas mantêm os valores; muda apenas a chave.
+        elif isinstance(cmd, RenomearColuna):
+            for antigo, atual in zip(anterior.columns, novo.columns):
+                if antigo != atual:
+                    self.chaves.renomear(antigo, atual)
+                    self.indices.renomear(antigo, atual)
+                    self.agregacoes.renomear(antigo, atual)
+
+        elif isinstance(cmd, RemoverColuna):
+            for coluna in anterior.columns.difference(novo.columns):
+                self.chaves.remover(coluna)
+                self.indices.remover(coluna)
+                self.agregacoes.remover(coluna)
+
+        # O preenchimento altera os valores de uma coluna: descarta apenas
+                # as entradas dessa coluna. As agregações trocam os valores
+                # antigos (nulos) das linhas preenchidas pelos novos.
+        elif isinstance(cmd, PreencherNulos):
+            coluna = resolvedor(anterior.columns).encontrar(cmd.coluna)
+            self.chaves.remover(coluna)
+            self.indices.descartar(coluna)
+            preenchidas = np.flatnonzero(anterior[coluna].isna().to_numpy())
+            self.agregacoes.aplicar(anterior.iloc[preenchidas], novo.iloc[preenchidas], coluna)
+
+        else:
+            self.chaves.limpar()
+            self.indices.descartar_todos()
+            self.agregacoes.limpar()
+            return
+
+        # As agregações foram atualizadas e valem para a nova versão.
+        self.agregacoes.confirmar(self.versao)
+
+
+    # Marca que o DataFrame atual mudou. As agregações da versão anterior
+            # só continuam valendo se forem atualizadas e confirmadas.
+    def _nova_versao(self):
+        self.versao += 1
@@ -0,0 +1,385 @@
+# Importa o numpy, usado para ordenar posições de linhas.
+import numpy as np
+
+# Importa o módulo pandas e o renomeia para pd, usado
+        # para manipulação de dados.
+import pandas as pd
+
+# Importa os tipos de comando que podem fazer parte de um plano.
+from comandos import Filtrar, Ordenar, Primeiras, RemoverColuna, RenomearColuna, Ultimas
+
+# Importa a normalização do texto usada pelos filtros.
+from chaves import normalizar_coluna, normalizar_valor
+
+# Importa o resolvedor dos nomes das colunas digitados nos comandos.
+from colunas import resolvedor
+
+
+# Plano de execução adiada ("modo lazy").
+# Em vez de alterar o DataFrame a cada comando, os comandos de filtro,
+        # ordenação, remoção e renomeação de colunas e primeiras/últimas linhas
+        # são acumulados em um plano lógico. Nada é executado até que alguém
+        # precise das linhas; nesse momento o plano é otimizado e executado
+        # de uma vez sobre o DataFrame original:
+        # - filtros consecutivos viram uma única máscara e são aplicados antes
+        #   das ordenações;
+        # - colunas removidas que não são usadas por nenhuma etapa nem chegam
+        #   a ser copiadas;
+        # - ordenações consecutivas viram uma única ordenação com várias chaves;
+        # - "primeiras n linhas" depois de uma ordenação vira uma seleção parcial
+        #   (nsmallest) em vez de ordenar o DataFrame inteiro.
+# Na sessão, o filtro só exibe as linhas, como no modo imediato: ele entra
+        # em uma cópia do plano, executada para a exibição, e o plano da
+        # sessão continua sem ele (ver 'Sessao._filtrar_no_plano').
+
+
+# Tipos de comando aceitos pelo plano.
+PLANEJAVEIS = (Filtrar, Ordenar, Primeiras, RemoverColuna, RenomearColuna, Ultimas)
+
+
+# Exceção lançada quando um comando não pode entrar no plano (por exemplo,
+        # quando a coluna não existe no resultado das etapas anteriores).
+class ErroPlano(ValueError):
+    pass
+
+
+# Etapa de filtro: mantém as linhas em que o valor da coluna, convertido para
+        # texto, sem espaços nas pontas e em minúsculas, é igual a 'valor'.
+# 'condicoes' é uma lista de pares (coluna, valor), combinados com "e".
+class Selecao:
+
+    def __init__(self, condicoes):
+        self.condicoes = list(condicoes)
+
+    def colunas(self):
+        return {coluna for coluna, _ in self.condicoes}
+
+    def descrever(self):
+        return "Filtro: " + " e ".join(f"{coluna} = '{valor}'" for coluna, valor in self.condicoes)
+
+
+# Etapa de ordenação crescente e estável. 'chaves' é a lista de colunas, da
+        # chave principal para a menos importante.
+class Ordenacao:
+
+    def __init__(self, chaves):
+        self.chaves = list(chaves)
+
+    def colunas(self):
+        return set(self.chaves)
+
+    def descrever(self):
+        return "Ordenação por " + ", ".join(self.chaves)
+
+
+# Etapa que mantém as primeiras (ou as últimas) 'n' linhas.
+class Limite:
+
+    def __init__(self, n, do_fim=False):
+        self.n = n
+        self.do_fim = do_fim
+
+    def colunas(self):
+        return set()
+
+    def descrever(self):
+        return f"{'Últimas' if self.do_fim else 'Primeiras'} {self.n} linhas"
+
+
+# Etapa de seleção parcial: equivale a uma ordenação seguida de "primeiras n
+        # linhas", mas só ordena as 'n' menores linhas.
+class PrimeirasOrdenadas:
+
+    def __init__(self, n, chaves):
+        self.n = n
+        self.chaves = list(chaves)
+
+    def colunas(self):
+        return set(self.chaves)
+
+    def descrever(self):
+        return f"Primeiras {self.n} linhas por " + ", ".join(self.chaves) + " (seleção parcial)"
+
+
+# Etapa que remove colunas.
+class Projecao:
+
+    def __init__(self, remover):
+        self.remover = list(remover)
+
+    def colunas(self):
+        return set()
+
+    def descrever(self):
+        return "Remover colunas: " + ", ".join(self.remover)
+
+
+# Etapa que renomeia colunas. 'mapa' associa o nome antigo ao novo.
+class Renomeacao:
+
+    def __init__(self, mapa):
+        self.mapa = dict(mapa)
+
+    def colunas(self):
+        return set()
+
+    def descrever(self):
+        return "Renomear: " + ", ".join(f"{antigo} -> {novo}" for antigo, novo in self.mapa.items())
+
+
+# Função que calcula a máscara de um filtro, sem alterar a coluna filtrada.
+# 'chaves' é o cache das colunas normalizadas da sessão, que só pode ser
+        # usado enquanto 'df' tem as mesmas linhas do DataFrame da sessão.
+def mascara_filtro(df, coluna, valor, chaves=None):
+    normalizada = normalizar_coluna(df[coluna]) if chaves is None else chaves.obter(df, coluna)
+    return (normalizada == valor).to_numpy()
+
+
+# Função que verifica se a seleção parcial pode substituir a ordenação:
+        # 'nsmallest' só aceita colunas numéricas ou de datas e descarta os
+        # valores nulos, que a ordenação completa colocaria no fim.
+def _aceita_selecao_parcial(df, chaves):
+
+    for chave in chaves:
+        serie = df[chave]
+        if not (pd.api.types.is_numeric_dtype(serie) or pd.api.types.is_datetime64_any_dtype(serie)):
+            return False
+        if pd.api.types.is_bool_dtype(serie) or serie.isna().any():
+            return False
+    return True
+
+
+class PlanoLazy:
+
+    def __init__(self, df):
+
+        # DataFrame original, sobre o qual o plano será executado.
+        self.base = df
+
+        # Etapas lógicas, na ordem em que os comandos foram dados.
+        self.etapas = []
+
+        # Colunas do resultado depois das etapas já adicionadas. Usadas para
+                # validar os comandos seguintes sem executar nada.
+        self.colunas = list(df.columns)
+
+
+    # Devolve uma cópia do plano, usada pelo histórico de desfazer. As
+            # etapas não são alteradas depois de criadas, então basta copiar
+            # as listas.
+    def copiar(self):
+
+        copia = PlanoLazy(self.base)
+        copia.etapas = list(self.etapas)
+        copia.colunas = list(self.colunas)
+        return copia
+
+
+    # Indica se o plano tem alguma etapa pendente.
+    def vazio(self):
+        return not self.etapas
+
+
+    # Encontra o nome real de uma coluna do resultado atual, sem diferenciar
+            # maiúsculas/minúsculas e acentos, como nos comandos executados
+            # imediatamente (ver 'colunas.py').
+    def _coluna_real(self, coluna):
+
+        colunas = resolvedor(self.colunas)
+        coluna_real = colunas.encontrar(coluna)
+        if coluna_real is None:
+            raise ErroPlano(colunas.mensagem(coluna))
+        return coluna_real
+
+
+    # Adiciona um comando ao plano, convertendo-o em uma etapa lógica.
+    def adicionar(self, cmd):
+
+        if isinstance(cmd, Filtrar):
+            self.etapas.append(Selecao([(self._coluna_real(cmd.coluna), normalizar_valor(cmd.valor))]))
+
+        elif isinstance(cmd, Ordenar):
+            self.etapas.append(Ordenacao([self._coluna_real(cmd.coluna)]))
+
+        elif isinstance(cmd, (Primeiras, Ultimas)):
+            self.etapas.append(Limite(cmd.n, do_fim=isinstance(cmd, Ultimas)))
+
+        elif isinstance(cmd, RemoverColuna):
+            coluna = self._coluna_real(cmd.coluna)
+            self.etapas.append(Projecao([coluna]))
+            self.colunas.remove(coluna)
+
+        elif isinstance(cmd, RenomearColuna):
+            coluna = self._coluna_real(cmd.coluna)
+            self.etapas.append(Renomeacao({coluna: cmd.novo_nome}))
+            self.colunas = [cmd.novo_nome if col == coluna else col for col in self.colunas]
+
+        else:
+            raise ErroPlano(f"O comando {type(cmd).__name__} não pode ser adiado.")
+
+
+    # Reescreve as etapas para que todas usem os nomes originais das colunas.
+    # Devolve as etapas sem as renomeações e o mapa final de renomeação
+            # (nome original -> nome final), aplicado só no fim da execução.
+    def _sem_renomeacoes(self):
+
+        # 'atual' associa o nome atual de cada coluna ao seu nome original.
+        atual = {col: col for col in self.base.columns}
+        etapas = []
+
+        for etapa in self.etapas:
+
+            if isinstance(etapa, Renomeacao):
+                for antigo, novo in etapa.mapa.items():
+                    atual[novo] = atual.pop(antigo)
+
+            elif isinstance(etapa, Selecao):
+                etapas.append(Selecao([(atual[coluna], valor) for coluna, valor in etapa.condicoes]))
+
+            elif isinstance(etapa, Ordenacao):
+                etapas.append(Ordenacao([atual[chave] for chave in etapa.chaves]))
+
+            elif isinstance(etapa, Projecao):
+                etapas.append(Projecao([atual.pop(coluna) for coluna in etapa.remover]))
+
+            else:
+                etapas.append(etapa)
+
+        mapa_final = {original: nome for nome, original in atual.items() if nome != original}
+        return etapas, mapa_final
+
+
+    # Otimiza o plano e devolve (colunas lidas, etapas, colunas removidas no
+            # fim, mapa de renomeação final).
+    def otimizar(self):
+
+        etapas, mapa_final = self._sem_renomeacoes()
+
+        # Poda de projeções: colunas removidas que nenhuma etapa usa não
+                # são nem lidas do DataFrame original; as que são usadas (por
+                # exemplo, filtradas e depois removidas) só saem no fim.
+        removidas = set()
+        usadas = set()
+        for etapa in etapas:
+            usadas |= etapa.colunas()
+            if isinstance(etapa, Projecao):
+                removidas.update(etapa.remover)
+
+        lidas = [col for col in self.base.columns if col not in removidas or col in usadas]
+        remover_no_fim = [col for col in lidas if col in removidas]
+
+        # Divide as etapas em segmentos separados pelos limites (primeiras/
+                # últimas linhas): filtros e ordenações não podem atravessar um
+                # limite sem mudar o resultado.
+        otimizadas = []
+        filtros, chaves = [], []
+
+        # Fecha o segmento atual: um único filtro com todas as condições,
+                # seguido de uma única ordenação com todas as chaves.
+        # Uma ordenação estável por 'a' seguida de outra por 'b' equivale a
+                # uma ordenação por ['b', 'a'].
+        def fechar_segmento():
+            if filtros:
+                otimizadas.append(Selecao(filtros))
+            if chaves:
+                otimizadas.append(Ordenacao(chaves))
+
+        for etapa in etapas:
+
+            if isinstance(etapa, Selecao):
+                filtros.extend(etapa.condicoes)
+
+            elif isinstance(etapa, Ordenacao):
+                chaves = etapa.chaves + [chave for chave in chaves if chave not in etapa.chaves]
+
+            elif isinstance(etapa, Limite):
+                fechar_segmento()
+
+                # Primeiras linhas logo depois de uma ordenação: seleção parcial.
+                if chaves and not etapa.do_fim:
+                    otimizadas[-1] = PrimeirasOrdenadas(etapa.n, chaves)
+                else:
+                    otimizadas.append(etapa)
+
+                filtros, chaves = [], []
+
+        fechar_segmento()
+
+        # Limites consecutivos do mesmo tipo se reduzem ao menor deles.
+        # As etapas são compartilhadas com as cópias do plano (histórico do
+                # "desfazer") e não podem ser alteradas: o limite combinado
+                # é uma etapa nova.
+        compactadas = []
+        for etapa in otimizadas:
+            anterior = compactadas[-1] if compactadas else None
+            if isinstance(etapa, Limite) and isinstance(anterior, Limite) and anterior.do_fim == etapa.do_fim:
+                compactadas[-1] = Limite(min(anterior.n, etapa.n), anterior.do_fim)
+            else:
+                compactadas.append(etapa)
+
+        return lidas, compactadas, remover_no_fim, mapa_final
+
+
+    # Executa o plano otimizado e devolve o DataFrame resultante.
+    # 'chaves' é o cache opcional das colunas normalizadas do DataFrame base.
+    def executar(self, chaves=None):
+
+        lidas, etapas, remover_no_fim, mapa_final = self.otimizar()
+
+        # Lê apenas as colunas necessárias.
+        df = self.base if len(lidas) == len(self.base.columns) else self.base[lidas]
+
+        for numero, etapa in enumerate(etapas):
+
+            if isinstance(etapa, Selecao):
+
+                # Todas as condições são combinadas em uma única máscara, e o
+                        # DataFrame é copiado uma única vez.
+                # Só a primeira etapa vê as linhas do DataFrame base e pode
+                        # usar o cache das colunas normalizadas.
+                cache = chaves if numero == 0 else None
+                mascara = None
+                for coluna, valor in etapa.condicoes:
+                    atual = mascara_filtro(df, coluna, valor, cache)
+                    mascara = atual if mascara is None else mascara & atual
+                df = df[mascara]
+
+            elif isinstance(etapa, Ordenacao):
+                df = df.sort_values(by=etapa.chaves, kind="stable")
+
+            elif isinstance(etapa, PrimeirasOrdenadas):
+
+                if _aceita_selecao_parcial(df, etapa.chaves):
+
+                    # 'nsmallest' devolve as posições das 'n' menores linhas;
+                            # elas são reordenadas pela posição original para que
+                            # a ordenação estável desempate como a ordenação completa.
+                    posicoes = df.reset_index(drop=True).nsmallest(etapa.n, etapa.chaves, keep="first").index
+                    df = df.iloc[np.sort(posicoes)].sort_values(by=etapa.chaves, kind="stable")
+
+                else:
+                    df = df.sort_values(by=etapa.chaves, kind="stable").head(etapa.n)
+
+            elif isinstance(etapa, Limite):
+                df = df.tail(etapa.n) if etapa.do_fim else df.head(etapa.n)
+
+        if remover_no_fim:
+            df = df.drop(columns=remover_no_fim)
+        if mapa_final:
+            df = df.rename(columns=mapa_final)
+        return df
+
+
+    # Devolve um DataFrame que descreve o plano otimizado, uma etapa por linha.
+    def descrever(self):
+
+        lidas, etapas, remover_no_fim, mapa_final = self.otimizar()
+
+        descricoes = [f"Ler colunas: {', '.join(map(str, lidas))}"]
+        descricoes += [etapa.descrever() for etapa in etapas]
+        if remover_no_fim:
+            descricoes.append(Projecao(remover_no_fim).descrever())
+        if mapa_final:
+            descricoes.append(Renomeacao(mapa_final).descrever())
+
+        return pd.DataFrame({"Etapa": range(1, len(descricoes) + 1), "Operação": descricoes})
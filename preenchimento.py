@@ -0,0 +1,180 @@
+# Importa o módulo numpy e o renomeia para np, usado para verificar os tipos
+        # das colunas e os valores de preenchimento.
+import numpy as np
+
+# Importa o módulo pandas e o renomeia para pd, usado
+        # para manipulação de dados.
+import pandas as pd
+
+
+# Este módulo preenche os valores nulos de uma coluna ("preencher valores
+        # nulos na coluna ...").
+# O valor digitado é convertido para o tipo da coluna antes do
+        # preenchimento: "100" vira número em uma coluna numérica e
+        # "15/03/2023" vira data em uma coluna de datas. Preencher com o
+        # texto digitado transformaria a coluna em 'object', e todos os
+        # comandos numéricos seguintes ficariam mais lentos.
+# Além do valor fixo, as estratégias "media", "mediana", "anterior" (o
+        # último valor não nulo acima) e "seguinte" (o próximo valor não
+        # nulo abaixo) podem ser aplicadas à coluna inteira ou a cada grupo
+        # de outra coluna. Cada estratégia é uma única operação vetorizada
+        # do pandas (fillna, ffill/bfill ou groupby com transform) e mantém
+        # o tipo da coluna, inclusive categórico e de 32 bits.
+
+
+# Estratégias que calculam uma estatística da coluna (ou do grupo), com a
+        # função do pandas e o nome mostrado nas mensagens.
+ESTATISTICAS = {"media": ("mean", "média"), "mediana": ("median", "mediana")}
+
+# Estratégias que repetem o valor de outra linha.
+PROPAGACOES = {"anterior": "ffill", "seguinte": "bfill"}
+
+# Textos aceitos como verdadeiro e falso em colunas booleanas.
+VERDADEIROS = {"sim", "s", "verdadeiro", "true", "1"}
+FALSOS = {"não", "nao", "n", "falso", "false", "0"}
+
+
+# Exceção lançada quando o preenchimento não pode ser feito (por exemplo,
+        # média de uma coluna de texto ou valor que não é uma data).
+class ErroPreenchimento(ValueError):
+    pass
+
+
+# Converte o texto para número, aceitando também o formato brasileiro, como
+        # "1.234,56".
+def _numero(texto):
+
+    try:
+        return float(texto)
+    except ValueError:
+        return float(texto.replace(".", "").replace(",", "."))
+
+
+# Converte o texto digitado para um valor do tipo 'tipo'. Colunas de texto
+        # (e 'object') recebem o texto como foi digitado.
+def _converter(tipo, texto, coluna):
+
+    try:
+
+        if isinstance(tipo, pd.CategoricalDtype):
+            return _converter(tipo.categories.dtype, texto, coluna)
+
+        if pd.api.types.is_bool_dtype(tipo):
+            if texto.strip().casefold() in VERDADEIROS:
+                return True
+            if texto.strip().casefold() in FALSOS:
+                return False
+            raise ValueError(texto)
+
+        # Números inteiros ficam inteiros, para não mudar o tipo das
+                # categorias numéricas.
+        if pd.api.types.is_numeric_dtype(tipo):
+            numero = _numero(texto.strip())
+            return int(numero) if numero.is_integer() else numero
+
+        if pd.api.types.is_datetime64_any_dtype(tipo):
+            data = pd.to_datetime(texto, dayfirst=True)
+            fuso = getattr(tipo, "tz", None)
+            if fuso is not None and data.tzinfo is None:
+                data = data.tz_localize(fuso)
+            return data
+
+        if pd.api.types.is_timedelta64_dtype(tipo):
+            return pd.to_timedelta(texto)
+
+    except ValueError:
+        raise ErroPreenchimento(f"O valor '{texto}' não é compatível com o tipo da coluna '{coluna}' ({tipo}).")
+
+    return texto
+
+
+# Indica se a coluna aceita média e mediana: números (exceto booleanos),
+        # datas e durações.
+def _aceita_estatistica(serie):
+
+    tipo = serie.dtype
+    if pd.api.types.is_bool_dtype(tipo) or isinstance(tipo, pd.CategoricalDtype):
+        return False
+    return (pd.api.types.is_numeric_dtype(tipo) or pd.api.types.is_datetime64_any_dtype(tipo)
+            or pd.api.types.is_timedelta64_dtype(tipo))
+
+
+# Ajusta o tipo dos valores de preenchimento ('valores', um número ou uma
+        # Series) ao da coluna, para que o fillna não mude o tipo: colunas
+        # de 32 bits continuam de 32 bits e colunas inteiras continuam
+        # inteiras quando os valores são inteiros.
+# Valores com casas decimais em uma coluna inteira passam a coluna para
+        # números com casas decimais (o tipo anulável 'Float64' para os
+        # inteiros anuláveis), em vez de arredondar os valores.
+def _ajustar_tipos(serie, valores):
+
+    tipo = serie.dtype
+    if isinstance(tipo, pd.CategoricalDtype) or getattr(tipo, "kind", None) not in ("i", "u", "f"):
+        return serie, valores
+
+    numeros = pd.Series(valores, copy=False) if isinstance(valores, pd.Series) else pd.Series([valores])
+    numeros = numeros.to_numpy(dtype="float64", na_value=np.nan)
+    if tipo.kind in "iu" and not np.all(np.isnan(numeros) | (numeros == np.round(numeros))):
+        tipo = np.dtype("float64") if isinstance(tipo, np.dtype) else pd.Float64Dtype()
+        serie = serie.astype(tipo)
+
+    if isinstance(valores, pd.Series):
+        return serie, valores.astype(tipo)
+    return serie, pd.Series([valores]).astype(tipo).iloc[0]
+
+
+# Preenche os valores nulos de 'serie' com a estratégia indicada e devolve a
+        # nova Series (a original não é alterada).
+# 'valor' é o texto digitado, usado pela estratégia "valor"; 'grupos' é uma
+        # Series alinhada com 'serie', cujos valores dividem as linhas em
+        # grupos preenchidos separadamente, ou None. Linhas sem grupo (nulo)
+        # não são preenchidas pelas estratégias por grupo.
+def preencher_nulos(serie, estrategia="valor", valor=None, grupos=None):
+
+    # Sem valores nulos, não há o que preencher nem tipo a ajustar.
+    if not serie.hasnans:
+        return serie
+
+    if estrategia == "valor":
+
+        valor = _converter(serie.dtype, valor, serie.name)
+        serie, valor = _ajustar_tipos(serie, valor)
+
+        # Em colunas categóricas (ver 'compactacao.py'), um valor que ainda
+                # não existe na coluna precisa ser incluído entre as
+                # categorias antes.
+        # As categorias continuam em ordem crescente, como as criadas pela
+                # compactação: a ordenação e a ordem dos grupos nos rankings
+                # seguem a ordem das categorias, e precisam coincidir com as
+                # da coluna de texto original.
+        if isinstance(serie.dtype, pd.CategoricalDtype) and valor not in serie.cat.categories:
+            serie = serie.cat.set_categories(serie.cat.categories.append(pd.Index([valor])).sort_values())
+
+        return serie.fillna(value=valor)
+
+    if estrategia in PROPAGACOES:
+        metodo = PROPAGACOES[estrategia]
+        if grupos is None:
+            return getattr(serie, metodo)()
+
+        # O groupby devolve nulo nas linhas sem grupo, mesmo nas que já
+                # tinham valor: só os valores nulos são trocados.
+        return serie.fillna(getattr(serie.groupby(grupos, observed=True, sort=False), metodo)())
+
+    if estrategia in ESTATISTICAS:
+
+        funcao, nome = ESTATISTICAS[estrategia]
+        if not _aceita_estatistica(serie):
+            raise ErroPreenchimento(f"A coluna '{serie.name}' não é numérica nem de datas: não é possível calcular a {nome}.")
+
+        if grupos is None:
+            valores = getattr(serie, funcao)()
+            if pd.isna(valores):
+                return serie
+        else:
+            valores = serie.groupby(grupos, observed=True, sort=False).transform(funcao)
+
+        serie, valores = _ajustar_tipos(serie, valores)
+        return serie.fillna(value=valores)
+
+    raise ErroPreenchimento(f"Estratégia de preenchimento desconhecida: '{estrategia}'.")
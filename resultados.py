@@ -0,0 +1,304 @@
+# Importa o módulo os para manipular caminhos e arquivos.
+import os
+
+# Importa o módulo shutil, usado para apagar o diretório temporário.
+import shutil
+
+# Importa o módulo tempfile, usado para criar o diretório onde os
+        # resultados antigos são guardados em disco.
+import tempfile
+
+# Importa o módulo tkinter e o renomeia para tk, facilitando o
+        # acesso às suas funcionalidades.
+import tkinter as tk
+
+# Importa os dados guardados em disco, que não ocupam memória nos resultados.
+from dados_em_disco import DadosEmDisco
+
+# O pyarrow é opcional: sem ele, os resultados antigos que passam do
+        # limite de memória são descartados em vez de guardados em disco.
+try:
+    import pyarrow as pa
+    from pyarrow import feather
+except ImportError:
+    pa = None
+    feather = None
+
+
+# Este módulo limita o histórico de resultados mostrado na janela principal.
+# Cada comando acrescenta um resultado (título, grade e botão de exportar).
+        # Sem limite, a janela acumularia dezenas de grades, cada uma
+        # segurando o seu DataFrame, e o layout ficaria mais lento a cada
+        # comando. Aqui, apenas os resultados mais recentes ficam abertos:
+        # os mais antigos viram um resumo de uma linha, com um botão que
+        # monta a grade de novo a partir do DataFrame guardado.
+# Os DataFrames dos resultados recolhidos continuam na memória até o
+        # limite de memória. Acima dele, os mais antigos são gravados em
+        # disco (Feather) e lidos de volta ao serem mostrados; sem o pyarrow,
+        # são descartados e o resumo continua visível.
+
+
+# Limite padrão, em bytes, dos DataFrames guardados pelos resultados
+        # recolhidos. Pode ser alterado pela variável de ambiente
+        # 'LIST_COMMAND_LIMITE_RESULTADOS', em megabytes.
+LIMITE_PADRAO = int(os.environ.get("LIST_COMMAND_LIMITE_RESULTADOS", 512)) * 1024 * 1024
+
+# Quantidade de resultados abertos (com a grade montada) ao mesmo tempo.
+MAXIMO_ABERTOS = 3
+
+# Quantidade máxima de resultados na janela. Acima dela, os mais antigos
+        # são removidos por completo.
+MAXIMO_RESULTADOS = 100
+
+
+# Memória ocupada pelo DataFrame, em bytes.
+# 'deep=False' não percorre os textos um a um, o que seria lento em
+        # resultados grandes; colunas categóricas (ver 'compactacao.py') são
+        # contadas corretamente, e os textos costumam ser compartilhados com
+        # o DataFrame da sessão.
+# Dados em disco (ver 'dados_em_disco.py') não contam: só a parte exibida é lida.
+def memoria(df):
+
+    if isinstance(df, DadosEmDisco):
+        return 0
+    return int(df.memory_usage(index=True, deep=False).sum())
+
+
+# Um resultado mostrado na janela.
+class ResultadoExibido:
+
+    def __init__(self, frame, titulo, df):
+
+        # Frame do resultado, com o título; o conteúdo (a grade ou o resumo)
+                # fica em 'conteudo', que é trocado ao abrir ou recolher.
+        self.frame = frame
+        self.conteudo = None
+        self.titulo = titulo
+
+        # DataFrame do resultado. Fica None quando foi gravado em disco
+                # ('arquivo') ou descartado.
+        self.df = df
+        self.linhas = len(df)
+        self.colunas = df.shape[1]
+        self.bytes = memoria(df)
+        self.arquivo = None
+
+        # Grade virtual, enquanto o resultado está aberto, e rótulo do
+                # resumo, enquanto está recolhido.
+        self.grade = None
+        self.label_resumo = None
+
+
+    @property
+    def aberto(self):
+        return self.grade is not None
+
+
+    # Indica se o DataFrame ainda pode ser mostrado (em memória ou em disco).
+    @property
+    def disponivel(self):
+        return self.df is not None or self.arquivo is not None
+
+
+    # Troca o DataFrame do resultado (por exemplo, a cada bloco do
+            # carregamento progressivo).
+    def atualizar_fonte(self, df):
+
+        self.df = df
+        self.linhas = len(df)
+        self.colunas = df.shape[1]
+        self.bytes = memoria(df)
+        self.arquivo = None
+        if self.grade is not None:
+            self.grade.atualizar_fonte(df)
+        elif self.label_resumo is not None:
+            self.label_resumo.config(text=self.resumo())
+
+
+    # Resumo de uma linha do resultado recolhido.
+    def resumo(self):
+
+        texto = f"{self.linhas} linhas × {self.colunas} colunas, {self.bytes / (1024 * 1024):.1f} MB"
+        if isinstance(self.df, DadosEmDisco):
+            texto = f"{self.linhas} linhas × {self.colunas} colunas (dados em disco)"
+        elif self.df is None and self.arquivo is not None:
+            texto += " (guardado em disco)"
+        elif not self.disponivel:
+            texto += " (descartado para liberar memória)"
+        return texto
+
+
+# Histórico dos resultados mostrados em um frame.
+# 'montar(conteudo, titulo, df)' monta a grade de um resultado dentro do
+        # frame 'conteudo' e devolve a grade; 'ao_mudar()' é chamada quando
+        # o tamanho dos resultados muda (para atualizar a rolagem).
+class HistoricoResultados:
+
+    def __init__(self, montar, ao_mudar=None, limite_bytes=LIMITE_PADRAO,
+                 maximo_abertos=MAXIMO_ABERTOS, maximo_resultados=MAXIMO_RESULTADOS):
+
+        self.montar = montar
+        self.ao_mudar = ao_mudar
+        self.limite_bytes = limite_bytes
+        self.maximo_abertos = maximo_abertos
+        self.maximo_resultados = maximo_resultados
+
+        # Resultados na ordem em que foram mostrados pela primeira vez.
+        self.resultados = []
+
+        # Resultados abertos, do usado há mais tempo para o mais recente.
+        self._abertos = []
+
+        # Diretório dos resultados gravados em disco, criado no primeiro uso.
+        self._diretorio = None
+        self._contador = 0
+
+
+    # Acrescenta um resultado no frame 'frame' (que já tem o título) e o
+            # mostra aberto. Devolve o 'ResultadoExibido'.
+    def adicionar(self, frame, titulo, df):
+
+        resultado = ResultadoExibido(frame, titulo, df)
+        self.resultados.append(resultado)
+        self._abrir(resultado)
+        self._aplicar_limites()
+        return resultado
+
+
+    # Mostra de novo a grade de um resultado recolhido.
+    def abrir(self, resultado):
+
+        if resultado.aberto or not resultado.disponivel:
+            return
+
+        # Um resultado gravado em disco é lido de volta. O arquivo é mantido:
+                # se o resultado sair da memória de novo, não precisa ser
+                # gravado outra vez.
+        if resultado.df is None:
+            resultado.df = feather.read_table(resultado.arquivo, memory_map=True).to_pandas()
+
+        self._abrir(resultado)
+        self._aplicar_limites(manter=resultado)
+        if self.ao_mudar:
+            self.ao_mudar()
+
+
+    def _abrir(self, resultado):
+
+        self._trocar_conteudo(resultado)
+        resultado.label_resumo = None
+        resultado.grade = self.montar(resultado.conteudo, resultado.titulo, resultado.df)
+        self._abertos.append(resultado)
+
+
+    # Troca a grade de um resultado pelo resumo, liberando os widgets.
+    def recolher(self, resultado):
+
+        if not resultado.aberto:
+            return
+
+        self._abertos.remove(resultado)
+        resultado.grade = None
+        self._trocar_conteudo(resultado)
+        self._mostrar_resumo(resultado)
+
+
+    # Apaga o conteúdo atual do resultado e cria um frame vazio no lugar.
+    def _trocar_conteudo(self, resultado):
+
+        if resultado.conteudo is not None:
+            resultado.conteudo.destroy()
+        resultado.conteudo = tk.Frame(resultado.frame, bg=resultado.frame.cget("bg"))
+        resultado.conteudo.pack(fill="both", expand=True)
+
+
+    # Mostra o resumo e o botão que abre o resultado de novo.
+    def _mostrar_resumo(self, resultado):
+
+        resultado.label_resumo = tk.Label(resultado.conteudo,
+                                          text=resultado.resumo(),
+                                          font=("Arial", 9),
+                                          bg=resultado.conteudo.cget("bg"),
+                                          fg="#666")
+        resultado.label_resumo.pack(side="left", padx=5)
+
+        if resultado.disponivel:
+            tk.Button(resultado.conteudo,
+                      text="Mostrar",
+                      command=lambda: self.abrir(resultado),
+                      font=("Arial", 9)).pack(side="left", padx=5)
+
+
+    # Recolhe, grava em disco e remove resultados até que os limites sejam
+            # respeitados. 'manter' é um resultado que acabou de ser aberto
+            # e não deve ser recolhido.
+    def _aplicar_limites(self, manter=None):
+
+        # Apenas os resultados usados mais recentemente ficam abertos.
+        while len(self._abertos) > self.maximo_abertos:
+            antigo = next(r for r in self._abertos if r is not manter)
+            self.recolher(antigo)
+
+        # Os DataFrames dos resultados recolhidos mais antigos saem da
+                # memória enquanto o total passa do limite. Os abertos
+                # continuam, pois a grade lê as linhas deles.
+        total = sum(r.bytes for r in self.resultados if r.df is not None)
+        for resultado in self.resultados:
+            if total <= self.limite_bytes:
+                break
+            if resultado.df is not None and not resultado.aberto and resultado.bytes:
+                total -= resultado.bytes
+                self._liberar(resultado)
+
+        # Os resultados mais antigos saem da janela por completo.
+        while len(self.resultados) > self.maximo_resultados:
+            antigo = self.resultados.pop(0)
+            if antigo.aberto:
+                self._abertos.remove(antigo)
+            self._apagar_arquivo(antigo)
+            antigo.frame.destroy()
+
+
+    # Tira o DataFrame de um resultado recolhido da memória: grava-o em
+            # disco quando possível ou o descarta.
+    def _liberar(self, resultado):
+
+        if feather is not None and resultado.arquivo is None:
+            try:
+                if self._diretorio is None:
+                    self._diretorio = tempfile.mkdtemp(prefix="list_command_resultados_")
+                self._contador += 1
+                caminho = os.path.join(self._diretorio, f"{self._contador}.feather")
+                tabela = pa.Table.from_pandas(resultado.df.rename(columns=str), preserve_index=False)
+                feather.write_feather(tabela, caminho, compression="uncompressed")
+                resultado.arquivo = caminho
+
+            # Resultados que o Feather não aceita (colunas com tipos
+                    # misturados) são descartados.
+            except (OSError, pa.ArrowException, TypeError, ValueError):
+                pass
+
+        resultado.df = None
+
+        # Atualiza o resumo para indicar onde o resultado está.
+        if not resultado.aberto:
+            self._trocar_conteudo(resultado)
+            self._mostrar_resumo(resultado)
+
+
+    def _apagar_arquivo(self, resultado):
+
+        if resultado.arquivo is not None:
+            try:
+                os.remove(resultado.arquivo)
+            except OSError:
+                pass
+            resultado.arquivo = None
+
+
+    # Apaga os resultados gravados em disco (ao fechar a janela).
+    def limpar(self):
+
+        if self._diretorio is not None:
+            shutil.rmtree(self._diretorio, ignore_errors=True)
+            self._diretorio = None
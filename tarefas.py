@@ -0,0 +1,221 @@
+# Importa o módulo queue, usado para que as threads de trabalho enviem
+        # mensagens de progresso para a thread da interface.
+import queue
+
+# Importa o módulo threading para sinalizar o cancelamento das tarefas.
+import threading
+
+# Importa o ThreadPoolExecutor, que executa funções em threads de
+        # trabalho fora do mainloop do Tkinter.
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Intervalo, em milissegundos, entre as verificações das tarefas
+        # feitas pelo mainloop através de 'after()'.
+INTERVALO_VERIFICACAO = 100
+
+
+# Exceção lançada dentro de uma tarefa quando o usuário pede o
+        # cancelamento. A função de trabalho pode lançá-la chamando
+        # 'tarefa.verificar_cancelamento()' entre etapas demoradas.
+class TarefaCancelada(Exception):
+    pass
+
+
+# Representa um trabalho pesado (leitura de arquivo, comando ou exportação)
+        # em execução fora da thread da interface.
+# A função de trabalho recebe a própria tarefa como primeiro argumento,
+        # para poder informar o progresso e verificar o cancelamento.
+class Tarefa:
+
+    def __init__(self, descricao, ao_concluir=None, ao_falhar=None, ao_progresso=None, ao_finalizar=None, ao_parcial=None):
+
+        # Texto exibido na barra de status enquanto a tarefa executa.
+        self.descricao = descricao
+
+        # Funções chamadas na thread da interface quando a tarefa termina,
+                # falha ou informa progresso.
+        self.ao_concluir = ao_concluir
+        self.ao_falhar = ao_falhar
+        self.ao_progresso = ao_progresso
+
+        # Função chamada na thread da interface com cada resultado parcial
+                # entregue pela tarefa (por exemplo, os blocos de uma leitura progressiva).
+        self.ao_parcial = ao_parcial
+
+        # Função chamada na thread da interface sempre que a tarefa sai de
+                # execução, seja por conclusão, falha ou cancelamento.
+        self.ao_finalizar = ao_finalizar
+
+        # Evento que sinaliza o pedido de cancelamento.
+        self._cancelamento = threading.Event()
+
+        # Fila de mensagens de progresso enviadas pela thread de trabalho.
+        self._progresso = queue.Queue()
+
+        # Fila de resultados parciais enviados pela thread de trabalho.
+        self._parciais = queue.Queue()
+
+        # 'Future' do executor, definido quando a tarefa é submetida.
+        self.future = None
+
+
+    # Indica se o cancelamento foi pedido.
+    @property
+    def cancelada(self):
+        return self._cancelamento.is_set()
+
+
+    # Pede o cancelamento da tarefa. Se ela ainda não começou, nem chega a
+            # executar; se já começou, o resultado é descartado e a função de
+            # trabalho pode parar antes ao verificar o cancelamento.
+    def cancelar(self):
+        self._cancelamento.set()
+        if self.future is not None:
+            self.future.cancel()
+
+
+    # Lança 'TarefaCancelada' se o cancelamento foi pedido. Deve ser chamada
+            # pela função de trabalho entre etapas demoradas.
+    def verificar_cancelamento(self):
+        if self.cancelada:
+            raise TarefaCancelada()
+
+
+    # Informa o progresso da tarefa. 'fracao' vai de 0 a 1, ou é None
+            # quando não é possível estimar quanto falta.
+    # Pode ser chamada de qualquer thread: a mensagem só é entregue à
+            # interface na próxima verificação do mainloop.
+    def progresso(self, fracao=None, mensagem=None):
+        self._progresso.put((fracao, mensagem))
+
+
+    # Entrega um resultado parcial à interface, antes do fim da tarefa.
+    # Assim como 'progresso', pode ser chamada de qualquer thread.
+    def parcial(self, valor):
+        self._parciais.put(valor)
+
+
+# Gerencia as tarefas em segundo plano e entrega seus resultados para a
+        # thread da interface.
+# O Tkinter não pode ser usado fora da thread do mainloop, então as threads
+        # de trabalho nunca tocam nos widgets: o gerenciador verifica as
+        # tarefas periodicamente com 'after()' e chama os callbacks no mainloop.
+class GerenciadorTarefas:
+
+    def __init__(self, raiz, max_workers=4, intervalo=INTERVALO_VERIFICACAO):
+
+        # Janela do Tkinter usada para agendar as verificações.
+        self.raiz = raiz
+        self.intervalo = intervalo
+
+        # Executor com as threads de trabalho.
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tarefa")
+
+        # Tarefas submetidas que ainda não foram finalizadas na interface.
+        self.ativas = []
+
+        # Indica se a verificação periódica está agendada.
+        self._verificando = False
+
+
+    # Submete 'funcao(tarefa, *args, **kwargs)' para execução em segundo plano
+            # e devolve a Tarefa correspondente.
+    def submeter(self, descricao, funcao, *args, ao_concluir=None, ao_falhar=None, ao_progresso=None, ao_finalizar=None, ao_parcial=None, **kwargs):
+
+        tarefa = Tarefa(descricao, ao_concluir=ao_concluir, ao_falhar=ao_falhar, ao_progresso=ao_progresso,
+                        ao_finalizar=ao_finalizar, ao_parcial=ao_parcial)
+        tarefa.future = self.executor.submit(funcao, tarefa, *args, **kwargs)
+        self.ativas.append(tarefa)
+
+        # Agenda a verificação periódica, caso ainda não esteja agendada.
+        if not self._verificando:
+            self._verificando = True
+            self.raiz.after(self.intervalo, self._verificar)
+
+        return tarefa
+
+
+    # Indica se existe alguma tarefa em andamento.
+    def ocupado(self):
+        return bool(self.ativas)
+
+
+    # Cancela todas as tarefas em andamento.
+    def cancelar_todas(self):
+        for tarefa in self.ativas:
+            tarefa.cancelar()
+
+
+    # Encerra o executor, cancelando as tarefas pendentes. Usado ao fechar a janela.
+    def encerrar(self):
+        self.cancelar_todas()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+    # Executada no mainloop: entrega as mensagens de progresso e os
+            # resultados das tarefas concluídas aos seus callbacks.
+    def _verificar(self):
+
+        try:
+
+            for tarefa in list(self.ativas):
+
+                # Entrega todas as mensagens de progresso acumuladas.
+                while True:
+                    try:
+                        fracao, mensagem = tarefa._progresso.get_nowait()
+                    except queue.Empty:
+                        break
+                    if tarefa.ao_progresso and not tarefa.cancelada:
+                        tarefa.ao_progresso(tarefa, fracao, mensagem)
+
+                # Entrega os resultados parciais acumulados, na ordem em que chegaram.
+                while True:
+                    try:
+                        valor = tarefa._parciais.get_nowait()
+                    except queue.Empty:
+                        break
+                    if tarefa.ao_parcial and not tarefa.cancelada:
+                        tarefa.ao_parcial(tarefa, valor)
+
+                # Tarefas ainda em execução são verificadas novamente depois.
+                # Uma tarefa cancelada é liberada imediatamente: a thread pode
+                        # continuar até o fim da operação do pandas em andamento,
+                        # mas o resultado é descartado e a interface não espera por ele.
+                if not tarefa.future.done() and not tarefa.cancelada:
+                    continue
+
+                self.ativas.remove(tarefa)
+
+                try:
+
+                    # O resultado de uma tarefa cancelada é descartado.
+                    if tarefa.cancelada or tarefa.future.cancelled():
+                        continue
+
+                    erro = tarefa.future.exception()
+
+                    if erro is None:
+                        if tarefa.ao_concluir:
+                            tarefa.ao_concluir(tarefa, tarefa.future.result())
+
+                    elif not isinstance(erro, TarefaCancelada) and tarefa.ao_falhar:
+                        tarefa.ao_falhar(tarefa, erro)
+
+                finally:
+
+                    # Avisa a interface que a tarefa saiu de execução, mesmo
+                            # que um dos callbacks acima tenha falhado.
+                    if tarefa.ao_finalizar:
+                        tarefa.ao_finalizar(tarefa)
+
+        finally:
+
+            # Continua verificando enquanto houver tarefas ativas. Fica em um
+                    # 'finally' para que um erro em um callback não interrompa
+                    # a verificação das demais tarefas.
+            if self.ativas:
+                self.raiz.after(self.intervalo, self._verificar)
+            else:
+                self._verificando = False
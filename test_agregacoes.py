@@ -0,0 +1,30 @@
+# Importa o módulo numpy e o renomeia para np, usado para gerar os valores.
+import numpy as np
+
+# Importa o módulo pandas e o renomeia para pd, usado
+        # para montar o DataFrame dos testes.
+import pandas as pd
+
+# Importa a sessão de comandos, que guarda o cache das agregações.
+from motor import Sessao
+
+
+# Depois de recortar as linhas e preencher nulos, as somas com casas
+        # decimais do cache coincidem no último bit com as de um groupby
+        # novo, para que os empates dos rankings sejam os mesmos.
+def test_somas_decimais_iguais_ao_groupby():
+
+    gerador = np.random.default_rng(0)
+    df = pd.DataFrame({"Grupo": gerador.choice(list("ABCDE"), 2000),
+                       "Vendas": gerador.choice([0.1, 0.2, 0.3, 0.7], 2000)})
+    df.loc[gerador.choice(2000, 300, replace=False), "Vendas"] = np.nan
+
+    sessao = Sessao(df)
+    sessao.executar("mostrar o Grupo que mais vendeu na coluna de Vendas")
+    sessao.executar("mostrar as primeiras 1500 linhas")
+    sessao.executar("preencher valores nulos na coluna Vendas com 0,3")
+
+    somas = sessao.agregacoes.somas(sessao.df, "Grupo", "Vendas", sessao.versao)
+    esperadas = sessao.df.groupby("Grupo")["Vendas"].sum()
+    assert len(sessao.agregacoes) == 1
+    assert somas.to_dict() == esperadas.to_dict()
@@ -0,0 +1,59 @@
+# Importa o módulo threading, usado para simular um comando executando
+        # em uma thread de trabalho.
+import threading
+
+# Importa o módulo pandas e o renomeia para pd, usado
+        # para montar os blocos do arquivo carregado.
+import pandas as pd
+
+# Importa o pytest, usado para verificar o aviso dos comandos bloqueados.
+import pytest
+
+# Importa a sessão de comandos e o erro mostrado ao usuário.
+from motor import ErroComando, Sessao
+
+
+# Enquanto o arquivo carrega, as consultas usam as linhas já lidas, e os
+        # comandos que alteram os dados são recusados em vez de serem
+        # descartados pela troca do bloco seguinte.
+def test_comandos_durante_o_carregamento():
+
+    df = pd.DataFrame({"Vendedor": ["Ana", "Bruno", "Ana", "Caio"], "Meta": [30, 10, 20, 40]})
+    sessao = Sessao()
+    sessao.carregar(df.head(2), parcial=True)
+
+    assert list(sessao.executar("filtrar na coluna Vendedor pelo valor ana").exibir["Meta"]) == [30]
+    with pytest.raises(ErroComando):
+        sessao.executar("delete a coluna Meta")
+    with pytest.raises(ErroComando):
+        sessao.executar("desfazer")
+
+    sessao.carregar(df)
+    sessao.executar("delete a coluna Meta")
+    assert list(sessao.df.columns) == ["Vendedor"]
+
+
+# A troca do bloco não acontece no meio de um comando: o mainloop recebe
+        # False e tenta de novo depois.
+def test_troca_espera_o_comando():
+
+    sessao = Sessao(pd.DataFrame({"Meta": [1]}))
+    novo = pd.DataFrame({"Meta": [1, 2]})
+
+    obtida = threading.Event()
+    liberar = threading.Event()
+
+    def comando():
+        with sessao.trava:
+            obtida.set()
+            liberar.wait()
+
+    thread = threading.Thread(target=comando)
+    thread.start()
+    obtida.wait()
+    assert not sessao.tentar_carregar(novo, parcial=True)
+    liberar.set()
+    thread.join()
+
+    assert sessao.tentar_carregar(novo, parcial=True)
+    assert sessao.df is novo and sessao.carregando
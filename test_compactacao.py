@@ -0,0 +1,41 @@
+# Importa o módulo pandas e o renomeia para pd, usado
+        # para montar o DataFrame dos testes.
+import pandas as pd
+
+# Importa a compactação das colunas.
+from compactacao import compactar
+
+# Importa a sessão de comandos.
+from motor import Sessao
+
+
+# Executa os comandos em uma sessão e devolve o que o último exibe.
+def _executar(df, comandos):
+
+    sessao = Sessao(df)
+    for comando in comandos:
+        resultado = sessao.executar(comando)
+    return resultado.exibir
+
+
+# Preencher uma coluna categórica com um valor novo e ordenar dá o mesmo
+        # resultado que na coluna de texto original; o mesmo vale para a
+        # ordem dos empates nos rankings.
+def test_compactada_igual_a_original():
+
+    df = pd.DataFrame({"Cidade": ["Natal", "Recife", None, "Natal", "Recife", None] * 3,
+                       "Vendas": [10, 20, 30, 20, 10, 30] * 3})
+    compacto, _, _ = compactar(df)
+    assert isinstance(compacto["Cidade"].dtype, pd.CategoricalDtype)
+
+    for comandos in (["preencher valores nulos na coluna Cidade com Maceio", "ordenar o DataFrame pela coluna Cidade"],
+                     ["preencher valores nulos na coluna Cidade com Maceio",
+                      "mostrar Cidade ordenados por vendas na coluna de Vendas"],
+                     ["preencher valores nulos na coluna Cidade com Maceio",
+                      "mostrar os 2 Cidade que mais venderam na coluna de Vendas"]):
+        original = _executar(df, comandos)
+        compactado = _executar(compacto, comandos)
+        # Os tipos diferem de propósito (categórica, int8); as linhas, a
+                # ordem e os valores não.
+        assert compactado.astype(object).values.tolist() == original.astype(object).values.tolist(), comandos
+        assert list(compactado.index) == list(original.index), comandos
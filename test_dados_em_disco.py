@@ -0,0 +1,77 @@
+# Importa o módulo pandas e o renomeia para pd, usado
+        # para montar os blocos gravados em disco.
+import pandas as pd
+
+# Importa o pytest, usado para pular os testes sem o pyarrow.
+import pytest
+
+# Importa o módulo dos dados em disco, cujo tamanho das partes é reduzido
+        # nos testes para que poucas linhas ocupem várias partes.
+import dados_em_disco
+
+# Importa a exportação, que grava os dados em disco bloco a bloco.
+from exportacao import exportar
+
+# Importa a sessão de comandos, que executa os comandos sobre os dados em disco.
+from motor import Sessao
+
+
+pytestmark = pytest.mark.skipif(not dados_em_disco.disponivel(), reason="requer o pyarrow")
+
+
+# Todas as linhas de um conjunto em disco, como DataFrame na memória.
+def _linhas(dados):
+    return dados.iloc[0:len(dados)]
+
+
+# Uma parte sem valores na coluna numérica, ou com números de tipos
+        # misturados, recebe o mesmo tipo das outras partes: o filtro
+        # "maior que" e a ordenação funcionam como na memória.
+def test_tipos_uniformes_entre_as_partes(monkeypatch):
+
+    monkeypatch.setattr(dados_em_disco, "TAMANHO_PARTE", 3)
+    blocos = [pd.DataFrame({"Vendedor": ["Ana", "Bruno", "Caio"], "Meta": [30, 10, 20]}),
+              pd.DataFrame({"Vendedor": ["Davi", "Eva", "Fabio"], "Meta": [None, None, None]}, dtype=object),
+              pd.DataFrame({"Vendedor": ["Gil", "Hugo", "Ivo"], "Meta": pd.Series([5, 2.5, None], dtype=object)})]
+
+    dados = dados_em_disco.gravar_em_disco(iter(blocos))
+    assert len({str(dados._ler(i)["Meta"].dtype) for i in range(len(dados.partes))}) == 1
+
+    sessao = Sessao(dados)
+    filtrado = sessao.executar("filtrar na coluna Meta maior que 15").exibir
+    assert list(_linhas(filtrado)["Vendedor"]) == ["Ana", "Caio"]
+
+    ordenado = _linhas(sessao.executar("ordenar o DataFrame pela coluna Meta").df)
+    assert list(ordenado["Vendedor"]) == ["Hugo", "Gil", "Bruno", "Caio", "Ana", "Davi", "Eva", "Fabio", "Ivo"]
+
+
+# A intercalação das corridas mantém a ordem original das linhas com a
+        # mesma chave, em corridas diferentes e em lotes diferentes da mesma
+        # corrida, como a ordenação estável do pandas.
+def test_intercalacao_com_chaves_iguais(monkeypatch):
+
+    monkeypatch.setattr(dados_em_disco, "TAMANHO_PARTE", 1_500)
+    df = pd.DataFrame({"Meta": [(i * 7) % 20 if i % 50 else None for i in range(4_500)], "Ordem": range(4_500)})
+
+    dados = dados_em_disco.gravar_em_disco(iter([df]))
+    ordenado = _linhas(dados.sort_values("Meta"))
+
+    esperado = df.sort_values(by="Meta", kind="stable")
+    assert list(ordenado["Ordem"]) == list(esperado["Ordem"])
+
+
+# Um conjunto em disco exportado para CSV e xlsx e lido de novo tem as
+        # mesmas linhas, na mesma ordem.
+@pytest.mark.parametrize("extensao", [".csv", ".xlsx"])
+def test_exportacao_ida_e_volta(monkeypatch, tmp_path, extensao):
+
+    monkeypatch.setattr(dados_em_disco, "TAMANHO_PARTE", 4)
+    df = pd.DataFrame({"Vendedor": [f"Vendedor {i}" for i in range(10)], "Meta": [i * 1.5 for i in range(10)]})
+    dados = dados_em_disco.gravar_em_disco(iter([df.iloc[:6], df.iloc[6:]]))
+
+    caminho = str(tmp_path / f"dados{extensao}")
+    exportar(dados, caminho)
+    lido = pd.read_csv(caminho) if extensao == ".csv" else pd.read_excel(caminho)
+
+    assert lido["Vendedor"].tolist() == df["Vendedor"].tolist()
+    assert lido["Meta"].tolist() == df["Meta"].tolist()
@@ -0,0 +1,36 @@
+# Importa o load_workbook do openpyxl, usado para ler as planilhas gravadas.
+from openpyxl import load_workbook
+
+# Importa o módulo pandas e o renomeia para pd, usado
+        # para montar o DataFrame exportado.
+import pandas as pd
+
+# Importa o módulo de exportação, cujo limite de linhas por planilha é
+        # reduzido no teste.
+import exportacao
+
+
+# Uma planilha com mais linhas que o limite continua em planilhas "Nome (2)",
+        # "Nome (3)", ...; com um nome de 31 caracteres, o nome é cortado para
+        # que o sufixo caiba no limite do Excel, inclusive a partir da décima
+        # parte, com sufixo maior.
+def test_nome_das_planilhas_seguintes(monkeypatch, tmp_path):
+
+    monkeypatch.setattr(exportacao, "MAXIMO_LINHAS_XLSX", 3)
+    nome = "V" * exportacao.MAXIMO_NOME_PLANILHA
+    df = pd.DataFrame({"Meta": range(23)})
+
+    caminho = str(tmp_path / "resultado.xlsx")
+    exportacao.gravar_xlsx([(nome, df)], caminho)
+
+    livro = load_workbook(caminho, read_only=True)
+    nomes = livro.sheetnames
+    metas = [linha[0] for folha in livro.worksheets for linha in folha.iter_rows(min_row=2, values_only=True)]
+    livro.close()
+
+    assert len(nomes) == 12
+    assert nomes[0] == nome
+    assert nomes[1] == "V" * 27 + " (2)"
+    assert nomes[11] == "V" * 26 + " (12)"
+    assert all(len(n) <= exportacao.MAXIMO_NOME_PLANILHA for n in nomes)
+    assert metas == list(range(23))
@@ -0,0 +1,42 @@
+# Importa o SimpleNamespace, usado para simular o evento da roda do mouse.
+from types import SimpleNamespace
+
+# Importa a grade virtual.
+from grade_virtual import GradeVirtual
+
+
+# Monta uma grade sem widgets: os testes rodam sem tela, e o desenho apenas
+        # registra a linha do topo.
+def _grade(total=1000, altura=10):
+
+    grade = GradeVirtual.__new__(GradeVirtual)
+    grade.total = total
+    grade.altura = altura
+    grade.primeira = 0
+    grade.desenhadas = []
+    grade._desenhar = lambda: grade.desenhadas.append(grade.primeira)
+    return grade
+
+
+# A barra de rolagem chama '_rolar' com a ação e o valor ("moveto", fração)
+        # ou com a unidade ("scroll", n, "units"/"pages").
+def test_barra_de_rolagem():
+
+    grade = _grade()
+    grade._rolar("moveto", "0.5")
+    assert grade.primeira == 500
+    grade._rolar("scroll", "1", "pages")
+    assert grade.primeira == 510
+    grade._rolar("scroll", "-1", "units")
+    assert grade.primeira == 509
+
+
+# A roda do mouse desloca a janela e devolve "break", para que a Treeview
+        # não role as suas próprias linhas.
+def test_roda_do_mouse():
+
+    grade = _grade()
+    assert grade._roda_mouse(SimpleNamespace(delta=-120)) == "break"
+    assert grade.primeira == 3
+    assert grade._rolar_roda(-3) == "break"
+    assert grade.primeira == 0
@@ -0,0 +1,21 @@
+# Importa o módulo pandas e o renomeia para pd, usado
+        # para montar o DataFrame dos testes.
+import pandas as pd
+
+# Importa a sessão de comandos, que guarda os índices das colunas.
+from motor import Sessao
+
+
+# Valores nulos ficam fora do índice de hash: o filtro na coluna indexada
+        # encontra as mesmas linhas que o filtro sem índice.
+def test_indice_hash_com_chave_nula():
+
+    df = pd.DataFrame({"Vendedor": [None, "Ana", "Bruno", None, "ana"], "Meta": range(5)})
+    sem_indice = Sessao(df).executar("filtrar na coluna vendedor pelo valor ana").exibir
+
+    sessao = Sessao(df)
+    sessao.executar("indexar a coluna vendedor")
+    com_indice = sessao.executar("filtrar na coluna vendedor pelo valor ana").exibir
+
+    assert list(com_indice["Meta"]) == list(sem_indice["Meta"]) == [1, 4]
+    assert list(sessao.executar("filtrar na coluna vendedor pelo valor bruno").exibir["Meta"]) == [2]
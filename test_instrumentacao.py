@@ -0,0 +1,41 @@
+# Importa o módulo pandas e o renomeia para pd, usado
+        # para montar o DataFrame e ler o registro das medições.
+import pandas as pd
+
+# Importa o pytest, usado para verificar o erro do comando medido.
+import pytest
+
+# Importa a medição e o registro das medições.
+from instrumentacao import Medicao, RegistroMedicoes
+
+# Importa a sessão de comandos, que mede as fases de cada comando.
+from motor import ErroComando, Sessao
+
+
+# A sessão mede a interpretação e a execução do comando, o tipo do comando
+        # e as linhas antes e depois; o registro grava uma medição por linha.
+def test_medicao_das_fases(tmp_path):
+
+    sessao = Sessao(pd.DataFrame({"Vendedor": ["Ana", "Bruno", "Ana"], "Meta": [30, 10, 20]}))
+    registro = RegistroMedicoes(str(tmp_path / "comandos.jsonl"))
+
+    medicao = Medicao("filtrar na coluna Vendedor pelo valor ana", medir_memoria=False)
+    sessao.executar(medicao.comando, medicao)
+    registro.gravar(medicao)
+
+    assert [fase.nome for fase in medicao.fases] == ["análise", "execução"]
+    assert (medicao.tipo, medicao.linhas_entrada, medicao.linhas_saida) == ("Filtrar", 3, 2)
+
+    # Uma fase que falha também é medida.
+    falha = Medicao("delete a coluna Cidade", medir_memoria=False)
+    with pytest.raises(ErroComando):
+        sessao.executar(falha.comando, falha)
+    falha.erro = "coluna não encontrada"
+    registro.gravar(falha)
+
+    assert [fase.nome for fase in falha.fases] == ["análise", "execução"]
+
+    lido = pd.read_json(registro.caminho, lines=True)
+    assert lido["tipo"].tolist() == ["Filtrar", "RemoverColuna"]
+    assert lido["linhas_saida"].tolist()[0] == 2
+    assert lido["erro"].tolist()[1] == "coluna não encontrada"
@@ -0,0 +1,46 @@
+# Importa o módulo pandas e o renomeia para pd, usado
+        # para montar o DataFrame dos testes.
+import pandas as pd
+
+# Importa a sessão de comandos, que guarda o plano do modo lazy.
+from motor import Sessao
+
+
+# Limites consecutivos são combinados em uma etapa nova: o "desfazer" volta
+        # ao plano anterior, cujas etapas não podem ter sido alteradas pela
+        # otimização do plano seguinte.
+def test_desfazer_limite_combinado():
+
+    sessao = Sessao(pd.DataFrame({"Meta": range(100)}))
+    sessao.executar("ativar modo lazy")
+    sessao.executar("mostrar as primeiras 10 linhas")
+    sessao.executar("mostrar as primeiras 5 linhas")
+    sessao.executar("desfazer")
+
+    assert len(sessao.executar("executar plano").df) == 10
+
+
+# No modo lazy, o filtro só exibe as linhas, como no modo imediato: o
+        # ranking e o plano executado depois usam todas as linhas.
+def test_filtro_lazy_nao_altera_os_dados():
+
+    df = pd.DataFrame({"Vendedor": ["Ana", "Bruno", "Ana", "Caio"], "Meta": [30, 10, 20, 40]})
+    comandos = ["ordenar o DataFrame pela coluna Meta",
+                "filtrar na coluna Vendedor pelo valor ana",
+                "mostrar o Vendedor que mais vendeu na coluna de Meta"]
+
+    resultados = {}
+    for lazy in (False, True):
+        sessao = Sessao(df)
+        if lazy:
+            sessao.executar("ativar modo lazy")
+        filtro = None
+        for comando in comandos:
+            resultado = sessao.executar(comando)
+            if comando.startswith("filtrar"):
+                filtro = resultado.exibir
+        resultados[lazy] = (list(filtro["Meta"]), resultado.titulo, len(sessao.materializar()))
+
+    assert resultados[True] == resultados[False]
+    assert resultados[True][0] == [20, 30]
+    assert resultados[True][2] == 4
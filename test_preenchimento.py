@@ -0,0 +1,33 @@
+# Importa o módulo numpy e o renomeia para np, usado para os valores nulos.
+import numpy as np
+
+# Importa o módulo pandas e o renomeia para pd, usado
+        # para montar as Series dos testes.
+import pandas as pd
+
+# Importa as estratégias de preenchimento.
+from preenchimento import preencher_nulos
+
+
+# Nas estratégias por grupo, linhas sem grupo mantêm o valor que já tinham
+        # e os nulos delas não são preenchidos.
+def test_propagacao_por_grupo_com_grupo_nulo():
+
+    serie = pd.Series([1.0, 5.0, np.nan, np.nan])
+    grupos = pd.Series(["a", None, "a", None])
+
+    anterior = preencher_nulos(serie, "anterior", grupos=grupos)
+    seguinte = preencher_nulos(pd.Series([np.nan, 5.0, 2.0, np.nan]), "seguinte", grupos=pd.Series(["a", None, "a", None]))
+
+    assert anterior.tolist()[:3] == [1.0, 5.0, 1.0] and np.isnan(anterior.iloc[3])
+    assert seguinte.tolist()[:3] == [2.0, 5.0, 2.0] and np.isnan(seguinte.iloc[3])
+
+
+# A média por grupo também mantém os valores das linhas sem grupo.
+def test_media_por_grupo_com_grupo_nulo():
+
+    serie = pd.Series([1.0, 5.0, np.nan, 3.0], dtype="float32")
+    resultado = preencher_nulos(serie, "media", grupos=pd.Series(["a", None, "a", "a"]))
+
+    assert resultado.dtype == np.float32
+    assert resultado.tolist() == [1.0, 5.0, 2.0, 3.0]
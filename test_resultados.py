@@ -0,0 +1,49 @@
+# Importa o módulo os, usado para verificar os arquivos dos resultados.
+import os
+
+# Importa o módulo pandas e o renomeia para pd, usado
+        # para montar os DataFrames dos resultados.
+import pandas as pd
+
+# Importa o pytest, usado para pular o teste sem o pyarrow.
+import pytest
+
+# Importa o histórico de resultados e o módulo, para saber se o pyarrow
+        # está disponível.
+import resultados
+from resultados import HistoricoResultados
+
+
+# Histórico sem widgets: os testes rodam sem tela, então o conteúdo e o
+        # resumo de cada resultado não são criados, e a grade montada é
+        # apenas o DataFrame mostrado.
+class _HistoricoSemTela(HistoricoResultados):
+
+    def _trocar_conteudo(self, resultado):
+        resultado.conteudo = object()
+
+    def _mostrar_resumo(self, resultado):
+        resultado.label_resumo = resultado.resumo()
+
+
+# Um resultado recolhido que passa do limite de memória é gravado em disco
+        # e, ao ser mostrado de novo, volta com os mesmos dados.
+@pytest.mark.skipif(resultados.feather is None, reason="requer o pyarrow")
+def test_resultado_guardado_em_disco_e_restaurado():
+
+    historico = _HistoricoSemTela(lambda conteudo, titulo, df: df, limite_bytes=1, maximo_abertos=1)
+    df = pd.DataFrame({"Vendedor": ["Ana", "Bruno", "Caio"], "Meta": [30.5, 10.0, 20.25]})
+
+    primeiro = historico.adicionar(None, "ordenar", df)
+    historico.adicionar(None, "filtrar", df.head(1))
+
+    assert not primeiro.aberto
+    assert primeiro.df is None and os.path.exists(primeiro.arquivo)
+    assert primeiro.label_resumo.endswith("(guardado em disco)")
+
+    historico.abrir(primeiro)
+    assert primeiro.aberto
+    pd.testing.assert_frame_equal(primeiro.grade, df, check_dtype=False)
+
+    historico.limpar()
+    assert not os.path.exists(primeiro.arquivo)